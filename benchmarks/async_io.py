@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Compare how many slow send_email requests a sync (gunicorn) and an async
+(uvicorn) deployment can keep in flight.
+
+Start both servers against the same database with a simulated SMTP delay and
+throttling off (every request comes from one account, and send_email costs a
+third of a user's token burst, so most of them would get 429):
+
+    export EMAIL_BACKEND=benchmarks.slow_email_backend.DelayedEmailBackend BENCH_SMTP_DELAY=1.0
+    export QC_THROTTLE_ENABLED=0
+    gunicorn --bind :8001 --workers 2 --threads 4 quality_check.wsgi:application
+    uvicorn --port 8002 quality_check.asgi:application
+
+Then run, for an inspection whose customer has a 'To' address:
+
+    python benchmarks/async_io.py --inspection <uuid> --username qa --password secret \\
+        --concurrency 8 16 32 --output async_io.json
+
+The sync server is hit on /inspections/<id>/send_email/ and the async one on
+/async/inspections/<id>/send_email/. With the gunicorn defaults above the sync
+throughput plateaus at roughly 8 / BENCH_SMTP_DELAY requests per second.
+
+429s are counted apart from errors. The async server answers 503 when its PDF
+pool is full (qc/executor.py); raise QC_CPU_QUEUE to measure without shedding.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import http_request, obtain_token, summarize_outcomes  # noqa: E402
+
+
+def run_level(url, token, concurrency, rounds):
+    """Fire ``concurrency * rounds`` POSTs with ``concurrency`` in flight."""
+
+    def one(_):
+        status, _, seconds = http_request("POST", url, token=token, data={})
+        return status, seconds
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(concurrency * rounds)))
+    return summarize_outcomes(outcomes, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sync-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--async-url", default="http://127.0.0.1:8002")
+    parser.add_argument("--inspection", required=True)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--rounds", type=int, default=3, help="requests per concurrent client")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    token = obtain_token(args.sync_url, args.username, args.password)
+    targets = {
+        "sync": f"{args.sync_url}/inspections/{args.inspection}/send_email/",
+        "async": f"{args.async_url}/async/inspections/{args.inspection}/send_email/",
+    }
+
+    results = {}
+    print(f"{'mode':<6} {'conc':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'429':>5}")
+    for mode, url in targets.items():
+        results[mode] = {}
+        for level in args.concurrency:
+            stats = run_level(url, token, level, args.rounds)
+            results[mode][level] = stats
+            print(f"{mode:<6} {level:>5} {stats['throughput_rps']:>8} {stats['p50_ms']:>9} "
+                  f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7} {stats['throttled']:>5}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/common.py
+"""Small stdlib-only helpers shared by the benchmark scripts."""
+import json
+import time
+import urllib.error
+import urllib.request
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """Latency/throughput summary in milliseconds for one endpoint or run."""
+    count = len(latencies)
+    return {
+        "requests": count + errors,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if count else 0.0,
+    }
+
+
+def summarize_outcomes(outcomes, elapsed):
+    """summarize() of (status, seconds) pairs, with 429s counted apart from errors."""
+    latencies = [seconds for status, seconds in outcomes if 200 <= status < 400]
+    throttled = sum(1 for status, _ in outcomes if status == 429)
+    summary = summarize(latencies, len(outcomes) - len(latencies) - throttled, elapsed)
+    summary["requests"] += throttled
+    summary["throttled"] = throttled
+    return summary
+
+
+def http_request(method, url, token=None, data=None, headers=None, timeout=120):
+    """
+    Issue one request and return (status, body_bytes, seconds).
+
+    ``data`` may be a dict (sent as JSON) or a (bytes, content_type) tuple.
+    HTTP errors are returned as their status instead of raising.
+    """
+    headers = dict(headers or {})
+    body = None
+    if isinstance(data, dict):
+        body = json.dumps(data).encode()
+        headers["Content-Type"] = "application/json"
+    elif data is not None:
+        body, headers["Content-Type"] = data
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    request = urllib.request.Request(url, data=body, method=method, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = response.read()
+            return response.status, payload, time.perf_counter() - started
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read(), time.perf_counter() - started
+    except (urllib.error.URLError, TimeoutError, ConnectionError):
+        return 0, b"", time.perf_counter() - started
+
+
+def obtain_token(base_url, username, password):
+    status, body, _ = http_request(
+        "POST", f"{base_url}/api/token/", data={"username": username, "password": password}
+    )
+    if status != 200:
+        raise SystemExit(f"Login failed ({status}): {body[:200]!r}")
+    return json.loads(body)["access"]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Serialisation time and bytes on the wire for a large inspection list.
+
+Builds ``--rows`` unsaved Inspection objects (no database needed) and
+measures, for InspectionListSerializer:
+
+  * serializer.data          DRF field-by-field conversion
+  * render (DRF json)        rest_framework.renderers.JSONRenderer
+  * render (fast)            qc.renderers.FastJSONRenderer (orjson if installed)
+  * gzip / brotli            size and compression time of the rendered body
+
+    python benchmarks/json_payload.py --rows 10000 --repeat 5 --output json_payload.json
+
+Both renderers must produce identical bytes; the script checks that first.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "quality_check.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from qc.models import Inspection  # noqa: E402
+from qc.renderers import FastJSONRenderer, orjson  # noqa: E402
+from qc.serializers import InspectionListSerializer  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_rows(count, seed=7):
+    rng = random.Random(seed)
+    users = [get_user_model()(id=i, username=f"inspector{i}") for i in range(1, 6)]
+    customers = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(20)]
+    templates = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(40)]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    stages = [c[0] for c in Inspection.STAGE_CHOICES]
+    decisions = [c[0] for c in Inspection.DECISION_CHOICES]
+    rows = []
+    for i in range(count):
+        created = start + timedelta(minutes=rng.randrange(500000), microseconds=rng.randrange(10**6))
+        feedback = rng.random() < 0.4
+        rows.append(Inspection(
+            id=uuid.UUID(int=rng.getrandbits(128)), style=f"ST-{i:06d}", color=rng.choice(["Navy", "Black", "Olive"]),
+            po_number=f"PO-{rng.randrange(10**6)}", stage=rng.choice(stages), template_id=rng.choice(templates),
+            customer_id=rng.choice(customers), remarks="Measurements within tolerance. " * rng.randrange(4),
+            decision=rng.choice(decisions), created_at=created, created_by=rng.choice(users),
+            customer_decision="Accepted" if feedback else None,
+            customer_feedback_comments="Approved for bulk." if feedback else None,
+            customer_feedback_date=created + timedelta(days=3) if feedback else None,
+        ))
+    return rows
+
+
+def best_of(repeat, func):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="report the best of N runs")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    serialize_s, data = best_of(args.repeat, lambda: InspectionListSerializer(rows, many=True).data)
+    drf_s, drf_body = best_of(args.repeat, lambda: JSONRenderer().render(data))
+    fast_s, fast_body = best_of(args.repeat, lambda: FastJSONRenderer().render(data))
+    if drf_body != fast_body:
+        sys.exit("FastJSONRenderer output differs from JSONRenderer")
+
+    gzip_s, gzipped = best_of(args.repeat, lambda: gzip.compress(fast_body, compresslevel=6, mtime=0))
+    results = {
+        "rows": args.rows,
+        "orjson": orjson is not None,
+        "serializer_ms": round(serialize_s * 1000, 1),
+        "render_drf_ms": round(drf_s * 1000, 1),
+        "render_fast_ms": round(fast_s * 1000, 1),
+        "identity_bytes": len(fast_body),
+        "gzip_bytes": len(gzipped),
+        "gzip_ms": round(gzip_s * 1000, 1),
+    }
+    if brotli is not None:
+        br_s, br_body = best_of(args.repeat, lambda: brotli.compress(fast_body, quality=5))
+        results.update(brotli_bytes=len(br_body), brotli_ms=round(br_s * 1000, 1))
+
+    width = max(len(k) for k in results)
+    for key, value in results.items():
+        print(f"{key:<{width}}  {value}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
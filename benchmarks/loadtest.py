@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+"""
+HTTP load test for the QC API.
+
+Simulates concurrent inspectors against a running server (runserver, gunicorn
+or uvicorn). Every virtual user logs in through /api/token/ and then loops over
+weighted scenarios until the run ends. Latency percentiles and throughput are
+reported per endpoint and saved as JSON, so two builds can be compared:
+
+    python manage.py generate_scale_data --inspections 50000      # realistic data
+    QC_THROTTLE_ENABLED=0 gunicorn --bind :8000 --workers 2 --threads 4 quality_check.wsgi:application
+
+    python benchmarks/loadtest.py --username qa --password secret \\
+        --profile mixed --users 20 --duration 60 --output build-a.json
+    python benchmarks/loadtest.py ... --output build-b.json --compare build-a.json
+
+Profiles (override with --weights "list=5,pdf=1"):
+    browse     list/retrieve/dashboard heavy, like the office
+    inspector  create + image upload heavy, like the QA floor
+    reports    PDF generation heavy
+    mixed      a bit of everything
+
+All virtual users share one account, so with throttling on (qc/throttling.py)
+they drain a single user bucket and PDFs/uploads mostly come back 429. Start
+the server with QC_THROTTLE_ENABLED=0 to measure the endpoints themselves.
+429s are reported in their own column, apart from errors and latencies.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import http_request, summarize_outcomes  # noqa: E402
+
+PROFILES = {
+    "browse": {"list": 40, "retrieve": 30, "dashboard": 20, "pdf": 5, "login": 5},
+    "inspector": {"list": 20, "retrieve": 15, "create": 30, "upload_image": 25, "login": 5, "dashboard": 5},
+    "reports": {"list": 20, "retrieve": 15, "pdf": 60, "login": 5},
+    "mixed": {"list": 30, "retrieve": 20, "dashboard": 10, "create": 12, "upload_image": 10, "pdf": 13, "login": 5},
+}
+
+STAGES = ["Proto", "Fit", "SMS", "Size Set", "PPS", "Shipment Sample"]
+DECISIONS = ["Accepted", "Rejected", "Represent"]
+SEARCH_TERMS = ["PO-1", "SCALE-10", "Customer 000", "inspector"]
+
+
+def parse_weights(text):
+    weights = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight)
+    return weights
+
+
+def sample_image_bytes():
+    """A photo-sized JPEG (PIL is a project dependency); falls back to a 1x1 PNG."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f"
+                b"\x15\xc4\x89\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00"
+                b"IEND\xaeB`\x82"), "image/png", "sample.png"
+    rng = random.Random(1)
+    image = Image.new("RGB", (2400, 1800))
+    image.putdata([(rng.randrange(256), 90, 140) for _ in range(2400 * 1800 // 64)] * 64)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=88)
+    return buffer.getvalue(), "image/jpeg", "sample.jpg"
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                   f"Content-Type: {content_type}\r\n\r\n".encode())
+        body.write(content)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+class Shared:
+    """State shared by the virtual users: ids to hit and the sample upload."""
+
+    def __init__(self, base_url, username, password):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.inspection_ids = []
+        self.lock = threading.Lock()
+        self.image = sample_image_bytes()
+
+    def random_id(self, rng):
+        with self.lock:
+            return rng.choice(self.inspection_ids) if self.inspection_ids else None
+
+    def remember(self, inspection_id):
+        with self.lock:
+            self.inspection_ids.append(inspection_id)
+
+
+# --- scenarios -----------------------------------------------------------------
+# Each returns (endpoint label, status, seconds) or None when it can't run yet.
+
+def scenario_login(user):
+    status, body, seconds = http_request(
+        "POST", f"{user.shared.base_url}/api/token/",
+        data={"username": user.shared.username, "password": user.shared.password})
+    if status == 200:
+        user.token = json.loads(body)["access"]
+    return "POST /api/token/", status, seconds
+
+
+def scenario_list(user):
+    rng = user.rng
+    params = [("stage", rng.choice(STAGES)) for _ in range(rng.randint(0, 2))]
+    params += [("decision", rng.choice(DECISIONS)) for _ in range(rng.randint(0, 1))]
+    if rng.random() < 0.3:
+        params.append(("search", rng.choice(SEARCH_TERMS)))
+    if rng.random() < 0.3:
+        params.append(("created_at_after", "2025-01-01"))
+    if rng.random() < 0.3:
+        params.append(("ordering", "style"))
+    query = urlencode(params)
+    status, _, seconds = http_request("GET", f"{user.shared.base_url}/inspections/?{query}", token=user.token)
+    return "GET /inspections/ (filtered)", status, seconds
+
+
+def scenario_retrieve(user):
+    inspection_id = user.shared.random_id(user.rng)
+    if not inspection_id:
+        return None
+    status, _, seconds = http_request(
+        "GET", f"{user.shared.base_url}/inspections/{inspection_id}/", token=user.token)
+    return "GET /inspections/{id}/", status, seconds
+
+
+def scenario_create(user):
+    rng = user.rng
+    payload = {
+        "style": f"LOAD-{rng.randint(1, 99999):05d}",
+        "color": "Navy",
+        "po_number": f"PO-{rng.randint(100000, 999999)}",
+        "stage": rng.choice(STAGES),
+        "decision": rng.choice(DECISIONS),
+        "remarks": "Created by load test",
+        "measurements": [
+            {"pom_name": f"POM {i}", "tol": 0.5, "std": 20.0,
+             **{f"s{s}": round(rng.gauss(20, 0.4), 2) for s in range(1, 7)}, "status": "OK"}
+            for i in range(rng.randint(8, 25))
+        ],
+    }
+    status, body, seconds = http_request("POST", f"{user.shared.base_url}/inspections/", token=user.token, data=payload)
+    if status == 201:
+        user.shared.remember(json.loads(body)["id"])
+    return "POST /inspections/", status, seconds
+
+
+def scenario_upload_image(user):
+    inspection_id = user.shared.random_id(user.rng)
+    if not inspection_id:
+        return None
+    content, content_type, filename = user.shared.image
+    body = multipart({"caption": "Load test"}, {"image": (filename, content, content_type)})
+    status, _, seconds = http_request(
+        "POST", f"{user.shared.base_url}/inspections/{inspection_id}/upload_image/", token=user.token, data=body)
+    return "POST /inspections/{id}/upload_image/", status, seconds
+
+
+def scenario_pdf(user):
+    inspection_id = user.shared.random_id(user.rng)
+    if not inspection_id:
+        return None
+    status, _, seconds = http_request(
+        "GET", f"{user.shared.base_url}/inspections/{inspection_id}/pdf/", token=user.token)
+    return "GET /inspections/{id}/pdf/", status, seconds
+
+
+def scenario_dashboard(user):
+    status, _, seconds = http_request("GET", f"{user.shared.base_url}/dashboard/", token=user.token)
+    return "GET /dashboard/", status, seconds
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "list": scenario_list,
+    "retrieve": scenario_retrieve,
+    "create": scenario_create,
+    "upload_image": scenario_upload_image,
+    "pdf": scenario_pdf,
+    "dashboard": scenario_dashboard,
+}
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, shared, weights, deadline, record_after, results, seed):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.shared = shared
+        self.rng = random.Random(seed * 1000 + index)
+        self.names = list(weights)
+        self.cum_weights = []
+        total = 0.0
+        for name in self.names:
+            total += weights[name]
+            self.cum_weights.append(total)
+        self.deadline = deadline
+        self.record_after = record_after
+        self.results = results
+        self.token = None
+
+    def run(self):
+        self.record(scenario_login(self))
+        while time.monotonic() < self.deadline:
+            name = self.rng.choices(self.names, cum_weights=self.cum_weights)[0]
+            try:
+                self.record(SCENARIOS[name](self))
+            except Exception:
+                # A broken scenario shouldn't silently shrink the load; count it and go on.
+                traceback.print_exc(limit=1)
+                self.record((f"{name} (client error)", 0, 0.0))
+
+    def record(self, outcome):
+        if outcome is None or time.monotonic() < self.record_after:
+            return
+        label, status, seconds = outcome
+        self.results.append((label, status, seconds))
+
+
+def seed_ids(shared, limit=500):
+    status, body, _ = http_request("POST", f"{shared.base_url}/api/token/",
+                                   data={"username": shared.username, "password": shared.password})
+    if status != 200:
+        raise SystemExit(f"Login failed ({status}): {body[:200]!r}")
+    token = json.loads(body)["access"]
+    status, body, _ = http_request("GET", f"{shared.base_url}/inspections/?ordering=-created_at", token=token)
+    if status == 200:
+        rows = json.loads(body)
+        rows = rows.get("results", rows) if isinstance(rows, dict) else rows
+        for row in rows[:limit]:
+            shared.remember(row["id"])
+
+
+def build_info():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def report(results, elapsed):
+    by_endpoint = defaultdict(list)
+    for label, status, seconds in results:
+        by_endpoint[label].append((status, seconds))
+    endpoints = {label: summarize_outcomes(outcomes, elapsed) for label, outcomes in sorted(by_endpoint.items())}
+    overall = summarize_outcomes([(status, seconds) for _, status, seconds in results], elapsed)
+    return endpoints, overall
+
+
+def print_table(endpoints, overall, baseline=None):
+    header = f"{'endpoint':<40} {'reqs':>6} {'err':>5} {'429':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if baseline:
+        header += f" {'Δp95':>8}"
+    print(header)
+    rows = list(endpoints.items()) + [("TOTAL", overall)]
+    for label, s in rows:
+        line = (f"{label:<40} {s['requests']:>6} {s['errors']:>5} {s['throttled']:>5} {s['throughput_rps']:>8} "
+                f"{s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8}")
+        if baseline:
+            old = baseline["overall"] if label == "TOTAL" else baseline["endpoints"].get(label)
+            if old and old["p95_ms"]:
+                line += f" {(s['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:>+7.1f}%"
+        print(line)
+    print("(latencies in ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--weights", help='override scenario weights, e.g. "list=5,pdf=1"')
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds excluded from the results")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    args = parser.parse_args()
+
+    weights = parse_weights(args.weights) if args.weights else PROFILES[args.profile]
+    shared = Shared(args.base_url, args.username, args.password)
+    seed_ids(shared)
+
+    results = []  # list.append is atomic, so threads can share it
+    started = time.monotonic()
+    deadline = started + args.warmup + args.duration
+    users = [VirtualUser(i, shared, weights, deadline, started + args.warmup, results, args.seed)
+             for i in range(args.users)]
+    for user in users:
+        user.start()
+        time.sleep(args.ramp / max(1, args.users))
+    for user in users:
+        user.join()
+
+    endpoints, overall = report(results, args.duration)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    print_table(endpoints, overall, baseline)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({
+                "build": build_info(),
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "config": {"base_url": args.base_url, "profile": args.profile, "weights": weights,
+                           "users": args.users, "duration": args.duration, "warmup": args.warmup},
+                "endpoints": endpoints,
+                "overall": overall,
+            }, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# benchmarks/slow_email_backend.py
+"""
+In-memory email backend that sleeps like a slow SMTP server.
+
+    EMAIL_BACKEND=benchmarks.slow_email_backend.DelayedEmailBackend BENCH_SMTP_DELAY=1.5
+"""
+import os
+import time
+
+from django.core.mail.backends.locmem import EmailBackend
+
+
+class DelayedEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        time.sleep(float(os.getenv("BENCH_SMTP_DELAY", "1.0")))
+        return super().send_messages(messages)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark: import time and time-to-first-response.
+
+Each run starts a fresh interpreter that sets Django up, loads the URLconf
+(which imports qc.views), then serves one request through the WSGI handler.
+Runs are repeated and summarised so numbers are comparable between builds:
+
+    python benchmarks/startup.py --runs 15 --path /customers/ --output startup.json
+    python benchmarks/startup.py --importtime      # top modules by import cost
+
+Run it against a migrated database (the default settings use db.sqlite3).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+imported = time.perf_counter()
+from django.test import Client
+response = Client(HTTP_HOST="localhost", raise_request_exception=False).get(sys.argv[1])
+responded = time.perf_counter()
+print(json.dumps({
+    "setup_s": imported - started,
+    "first_response_s": responded - imported,
+    "status": response.status_code,
+    "heavy_loaded": [m for m in ("reportlab", "PIL", "django.core.mail", "google.cloud.storage") if m in sys.modules],
+}))
+"""
+
+
+def run_once(path, settings):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings, PYTHONPATH=ROOT)
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD, path], cwd=ROOT, env=env, capture_output=True, text=True)
+    if out.returncode:
+        raise SystemExit(out.stderr)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_total_s"] = time.perf_counter() - started
+    return result
+
+
+def importtime_report(settings, top):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings, PYTHONPATH=ROOT)
+    code = "import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns"
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    for cumulative, own, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:9.1f} ms  {own / 1000:8.1f} ms  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/customers/")
+    parser.add_argument("--settings", default="quality_check.settings")
+    parser.add_argument("--importtime", action="store_true", help="print the slowest imports and exit")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    if args.importtime:
+        importtime_report(args.settings, args.top)
+        return
+
+    run_once(args.path, args.settings)  # prime the OS file cache; not counted
+    runs = [run_once(args.path, args.settings) for _ in range(args.runs)]
+    summary = {}
+    for metric in ("setup_s", "first_response_s", "process_total_s"):
+        values = [r[metric] for r in runs]
+        summary[metric] = {
+            "median_ms": round(statistics.median(values) * 1000, 1),
+            "min_ms": round(min(values) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1),
+        }
+        print(f"{metric:<18} median {summary[metric]['median_ms']:8.1f} ms   "
+              f"min {summary[metric]['min_ms']:8.1f} ms   max {summary[metric]['max_ms']:8.1f} ms")
+    print(f"status {runs[-1]['status']}, heavy modules loaded: {runs[-1]['heavy_loaded'] or 'none'}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"path": args.path, "runs": runs, "summary": summary}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
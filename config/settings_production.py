@@ -27,6 +27,15 @@ DATABASES = {
         }
     }
 }
+# Optional read replica (qc/routing.py): same credentials, different host.
+# Requires QC_CACHE_BACKEND=db or redis so read-your-writes holds across instances.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        HOST=os.environ['DB_REPLICA_HOST'],
+        PORT=os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        TEST={'MIRROR': 'default'},
+    )
 
 # Static files with WhiteNoise
 MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
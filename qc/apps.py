@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class QcConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qc'
+
+    def ready(self):
+        # Register model signal receivers (live events, etc.)
+        from . import signals  # noqa: F401
@@ -0,0 +1,195 @@
+# qc/archive.py
+"""
+Hot/cold archival of old inspections.
+
+archive_inspections() moves inspections older than a cutoff, with their
+measurements and image rows, out of the hot tables into ArchivedInspection:
+one row per inspection whose list/search columns stay queryable and whose
+full content is a compressed JSON payload. restore_inspections() reverses
+it, keeping ids and timestamps. Image files are left where they are, so a
+restored inspection gets its photos back.
+
+Both work in batches, one transaction each, with raw deletes and bulk
+inserts that bypass model signals, so they invalidate the cache and publish
+one event per batch themselves.
+
+    python manage.py archive_inspections --older-than-days 730
+    GET  /inspections/?include_archived=1         hot and archived rows
+    GET  /archived-inspections/?search=ST-12      archive only
+    POST /archived-inspections/<id>/restore/      (admin)
+"""
+import json
+import zlib
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Value
+from django.utils import timezone
+
+from . import cache
+from .fastpath import values_serializer
+from .filters import ArchivedInspectionFilter
+from .models import ArchivedInspection, Customer, Inspection, InspectionImage, Measurement, Template, User
+from .savedsearch import MEMBERSHIP
+from .signals import publish_on_commit
+
+PAYLOAD_VERSION = 1
+# ArchivedInspection columns copied straight from the Inspection row.
+INDEXED_FIELDS = [
+    f.attname for f in ArchivedInspection._meta.concrete_fields if f.name not in ("archived_at", "payload")
+]
+ARCHIVE_PARAM = "include_archived"
+
+
+def include_archived(request):
+    return request.query_params.get(ARCHIVE_PARAM, "").lower() in ("1", "true", "yes")
+
+
+class PayloadEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates to milliseconds; restores must be exact.
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _row(model, values):
+    return {f.attname: values[f.attname] for f in model._meta.concrete_fields}
+
+
+def encode_payload(inspection, measurements, images):
+    document = {"v": PAYLOAD_VERSION, "inspection": inspection, "measurements": measurements, "images": images}
+    return zlib.compress(json.dumps(document, cls=PayloadEncoder, separators=(",", ":")).encode(), 6)
+
+
+def decode_payload(payload):
+    return json.loads(zlib.decompress(bytes(payload)))
+
+
+def _instance(model, values, valid_fks):
+    """Rebuild an unsaved model instance from payload values."""
+    kwargs = {}
+    for field in model._meta.concrete_fields:
+        value = values.get(field.attname)
+        if field.is_relation:
+            # The customer/template/user may have been deleted since archiving.
+            allowed = valid_fks.get(field.attname)
+            if allowed is not None and value is not None and field.target_field.to_python(value) not in allowed:
+                value = None
+        kwargs[field.attname] = field.to_python(value) if value is not None else None
+    return model(**kwargs)
+
+
+def _announce(action, ids):
+    models = (Inspection, Measurement, InspectionImage, ArchivedInspection, MEMBERSHIP)
+    cache.invalidate(*models)
+    transaction.on_commit(lambda: cache.invalidate(*models))
+    publish_on_commit("inspection", action, {"ids": [str(pk) for pk in ids]})
+
+
+def archive_batch(ids):
+    """Move the given inspections into the archive; returns how many were moved."""
+    with transaction.atomic():
+        inspections = list(Inspection.objects.filter(pk__in=ids).values())
+        if not inspections:
+            return 0
+        ids = [row["id"] for row in inspections]
+        children = {pk: ([], []) for pk in ids}
+        for row in Measurement.objects.filter(inspection__in=ids).values():
+            children[row["inspection_id"]][0].append(_row(Measurement, row))
+        for row in InspectionImage.objects.filter(inspection__in=ids).order_by("uploaded_at").values():
+            children[row["inspection_id"]][1].append(_row(InspectionImage, row))
+
+        ArchivedInspection.objects.bulk_create([
+            ArchivedInspection(
+                payload=encode_payload(_row(Inspection, row), *children[row["id"]]),
+                **{name: row[name] for name in INDEXED_FIELDS},
+            )
+            for row in inspections
+        ])
+        Measurement.objects.filter(inspection__in=ids)._raw_delete(Measurement.objects.db)
+        InspectionImage.objects.filter(inspection__in=ids)._raw_delete(InspectionImage.objects.db)
+        Inspection.objects.filter(pk__in=ids)._raw_delete(Inspection.objects.db)
+        _announce("archived", ids)
+    return len(ids)
+
+
+def archive_inspections(older_than_days, batch_size=500, limit=None):
+    """Archive inspections created more than ``older_than_days`` ago, oldest first."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    candidates = Inspection.objects.filter(created_at__lt=cutoff).order_by("created_at").values_list("id", flat=True)
+    if limit:
+        candidates = candidates[:limit]
+    ids = list(candidates)
+    moved = 0
+    for offset in range(0, len(ids), batch_size):
+        moved += archive_batch(ids[offset:offset + batch_size])
+    return moved
+
+
+def restore_inspections(ids):
+    """Move archived inspections back into the hot tables; returns how many were restored."""
+    with transaction.atomic():
+        archived = list(ArchivedInspection.objects.filter(pk__in=ids).only("id", "payload"))
+        if not archived:
+            return 0
+        documents = [decode_payload(a.payload) for a in archived]
+        fks = {field: set() for field in ("customer_id", "template_id", "created_by_id")}
+        for doc in documents:
+            for field in fks:
+                if doc["inspection"].get(field):
+                    fks[field].add(doc["inspection"][field])
+        valid_fks = {
+            "customer_id": set(Customer.objects.filter(pk__in=fks["customer_id"]).values_list("pk", flat=True)),
+            "template_id": set(Template.objects.filter(pk__in=fks["template_id"]).values_list("pk", flat=True)),
+            "created_by_id": set(User.objects.filter(pk__in=fks["created_by_id"]).values_list("pk", flat=True)),
+        }
+
+        inspections, measurements, images = [], [], []
+        for doc in documents:
+            inspections.append(_instance(Inspection, doc["inspection"], valid_fks))
+            measurements.extend(_instance(Measurement, row, {}) for row in doc["measurements"])
+            images.extend(_instance(InspectionImage, row, {}) for row in doc["images"])
+
+        # bulk_create stamps auto_now_add fields with now(); put the originals back.
+        created = [i.created_at for i in inspections]
+        uploaded = [i.uploaded_at for i in images]
+        Inspection.objects.bulk_create(inspections)
+        Measurement.objects.bulk_create(measurements)
+        InspectionImage.objects.bulk_create(images)
+        for inspection, value in zip(inspections, created):
+            inspection.created_at = value
+        for image, value in zip(images, uploaded):
+            image.uploaded_at = value
+        Inspection.objects.bulk_update(inspections, ["created_at"])
+        InspectionImage.objects.bulk_update(images, ["uploaded_at"])
+
+        restored = [a.pk for a in archived]
+        ArchivedInspection.objects.filter(pk__in=restored)._raw_delete(ArchivedInspection.objects.db)
+        _announce("restored", restored)
+    return len(restored)
+
+
+def list_with_archived(view, request):
+    """
+    The inspection list plus matching archived rows, in one ordered UNION
+    query. Rows carry ``"archived": true/false``.
+    """
+    serializer = values_serializer(view.get_serializer_class())
+    hot = view.filter_queryset(view.get_queryset())
+    ordering = hot.query.order_by or ("-created_at",)
+    cold = ArchivedInspectionFilter(request.query_params, queryset=ArchivedInspection.objects.all()).qs
+
+    columns = [*serializer.lookups, "is_archived"]
+    union = (
+        hot.order_by().annotate(is_archived=Value(False)).values_list(*columns)
+        .union(cold.order_by().annotate(is_archived=Value(True)).values_list(*columns), all=True)
+        .order_by(*ordering)
+    )
+    rows = []
+    for row in union:
+        data = serializer.to_representation(row[:-1])
+        data["archived"] = bool(row[-1])
+        rows.append(data)
+    return rows
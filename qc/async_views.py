@@ -0,0 +1,129 @@
+# qc/async_views.py
+"""
+Async variants of the slow inspection actions, for the ASGI server.
+
+The synchronous DRF actions (pdf, upload_image, send_email) hold a gunicorn
+thread for the whole SMTP round-trip or storage write. These views await that
+I/O instead, and push CPU-bound rendering/compression onto the bounded pool in
+qc/executor.py, so one uvicorn process can keep many slow requests in flight.
+
+Responses match the DRF actions. Serve them with:
+
+    uvicorn quality_check.asgi:application --host 0.0.0.0 --port 8000
+"""
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from . import metrics, throttling
+from .authentication import InvalidCredentials, aauthenticate
+from .executor import ExecutorBusy, get_io_executor, run_cpu_bound
+from .models import Inspection, InspectionImage
+from .views import NO_RECIPIENTS_ERROR, build_inspection_email, compress_image, generate_pdf_buffer
+
+
+def async_inspection_action(method):
+    """
+    Method check, optional JWT auth, throttling and inspection lookup shared by the views below.
+
+    Like the DRF actions these authenticate by Bearer token only, never by
+    session cookie, so they are exempt from CSRF just as APIView is.
+    """
+    def decorator(view):
+        action = view.__name__.removeprefix("inspection_")
+
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, pk):
+            if request.method != method:
+                return HttpResponseNotAllowed([method])
+            try:
+                request.user = await aauthenticate(request) or AnonymousUser()
+            except InvalidCredentials as exc:
+                return JsonResponse({"detail": str(exc)}, status=401)
+            delay = await sync_to_async(throttling.check)(action, request)
+            if delay:
+                response = JsonResponse({"detail": "Request was throttled."}, status=429)
+                response["Retry-After"] = str(math.ceil(delay))
+                return response
+
+            queryset = Inspection.objects.select_related("customer").prefetch_related(
+                "measurements", Prefetch("images", queryset=InspectionImage.objects.order_by("uploaded_at"))
+            )
+            try:
+                inspection = await queryset.aget(pk=pk)
+            except Inspection.DoesNotExist:
+                return JsonResponse({"detail": "No Inspection matches the given query."}, status=404)
+
+            try:
+                return await view(request, inspection)
+            except ExecutorBusy:
+                response = JsonResponse({"detail": "Server busy, retry shortly."}, status=503)
+                response["Retry-After"] = "2"
+                return response
+        return wrapper
+    return decorator
+
+
+@async_inspection_action("GET")
+async def inspection_pdf(request, inspection):
+    buffer = await run_cpu_bound(generate_pdf_buffer, inspection)
+    response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
+    response["Content-Disposition"] = f'inline; filename="{inspection.style}_Report.pdf"'
+    return response
+
+
+@async_inspection_action("POST")
+async def inspection_upload_image(request, inspection):
+    image_file = request.FILES.get("image")
+    caption = request.POST.get("caption", "Inspection Image")
+    if not image_file:
+        return JsonResponse({"error": "No image provided"}, status=400)
+
+    try:
+        compressed_file = await run_cpu_bound(compress_image, image_file)
+    except ExecutorBusy:
+        raise
+    except Exception as e:
+        metrics.IMAGES_PROCESSED.inc(result="error")
+        return JsonResponse({"error": f"Image processing failed: {str(e)}"}, status=400)
+
+    # Write to storage (local disk or GCS) off the loop, then insert the row.
+    stages = metrics.StageTimer(metrics.IMAGE_STAGE_SECONDS)
+    field = InspectionImage._meta.get_field("image")
+    name = field.generate_filename(None, compressed_file.name)
+    name = await sync_to_async(field.storage.save, thread_sensitive=False, executor=get_io_executor())(
+        name, compressed_file, max_length=field.max_length
+    )
+    await InspectionImage.objects.acreate(inspection=inspection, image=name, caption=caption)
+    stages.mark("store")
+    metrics.IMAGES_PROCESSED.inc(result="ok")
+    return JsonResponse({"status": "Image uploaded and compressed"}, status=201)
+
+
+@async_inspection_action("POST")
+async def inspection_send_email(request, inspection):
+    stages = metrics.StageTimer(metrics.EMAIL_STAGE_SECONDS)
+    email = await sync_to_async(build_inspection_email)(inspection)
+    stages.mark("build")
+    if email is None:
+        metrics.EMAILS_SENT.inc(result="no_recipients")
+        return JsonResponse({"error": NO_RECIPIENTS_ERROR}, status=400)
+
+    buffer = await run_cpu_bound(generate_pdf_buffer, inspection)
+    email.attach(f"{inspection.style}_{inspection.po_number}_Report.pdf", buffer.getvalue(), "application/pdf")
+    stages.mark("pdf")
+    # The SMTP round-trip is pure waiting; don't pin it to the ORM thread.
+    try:
+        await sync_to_async(email.send, thread_sensitive=False, executor=get_io_executor())(fail_silently=False)
+    except Exception:
+        metrics.EMAILS_SENT.inc(result="error")
+        raise
+    stages.mark("smtp")
+    metrics.EMAILS_SENT.inc(result="sent")
+    return JsonResponse({"sent": True, "to": email.to, "cc": email.cc})
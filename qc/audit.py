@@ -0,0 +1,150 @@
+# qc/audit.py
+"""
+Field-level change history for inspections and their measurements.
+
+Writers don't insert audit rows themselves. InspectionSerializer.update and
+the bulk paths (qc/bulk.py: the bulk-update action and feedback imports)
+call apply_changes() / diff_measurements() to work out what changed, using
+the values already loaded for the write, and record() the diffs. Recorded
+entries are held until their transaction commits (rolled-back writes leave
+no history) and then buffered for the rest of the request; AuditMiddleware
+writes the whole buffer with a single bulk_create when the request ends. A
+PATCH therefore costs one extra INSERT however many fields and
+measurements it touches. Outside a request (management commands) each
+commit is flushed with its own bulk_create.
+
+One AuditEntry per inspection per write. Only changed values are stored,
+as ``{"field": [old, new]}``. Measurement changes are keyed by POM name
+under ``"measurements"``: ``{"POM 1": {"s1": [20.1, 20.3]}}`` for an edit,
+and ``[null, {...}]`` or ``[{...}, null]`` for an added or removed POM.
+
+    GET /inspections/<id>/history/            newest first, cursor-paginated
+"""
+import contextvars
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.pagination import CursorPagination
+
+from .models import AuditEntry, Measurement
+
+# Measurement columns tracked in history (ids change on every rewrite).
+MEASUREMENT_FIELDS = [f.attname for f in Measurement._meta.concrete_fields if f.name not in ("id", "inspection")]
+
+_buffer = contextvars.ContextVar("qc_audit_buffer", default=None)
+
+
+def _value(instance, name, value=None, current=False):
+    field = instance._meta.get_field(name)
+    if field.is_relation:
+        if current:
+            return getattr(instance, field.attname)
+        return value.pk if value is not None else None
+    return getattr(instance, name) if current else value
+
+
+def apply_changes(instance, values):
+    """Set ``values`` on ``instance``; returns ``{field: [old, new]}`` for the ones that changed."""
+    changes = {}
+    for name, value in values.items():
+        old = _value(instance, name, current=True)
+        new = _value(instance, name, value)
+        if old != new:
+            changes[name] = [old, new]
+        setattr(instance, name, value)
+    return changes
+
+
+def _measurement_row(measurement):
+    return {name: getattr(measurement, name) for name in MEASUREMENT_FIELDS if name != "pom_name"}
+
+
+def diff_measurements(old, new):
+    """Diff two sets of Measurement instances, matched by pom_name."""
+    before = {m.pom_name: _measurement_row(m) for m in old}
+    after = {m.pom_name: _measurement_row(m) for m in new}
+    changes = {}
+    for pom in before.keys() | after.keys():
+        if pom not in after:
+            changes[pom] = [before[pom], None]
+        elif pom not in before:
+            changes[pom] = [None, after[pom]]
+        else:
+            fields = {k: [before[pom][k], v] for k, v in after[pom].items() if before[pom][k] != v}
+            if fields:
+                changes[pom] = fields
+    return changes
+
+
+def record(action, diffs, user=None):
+    """Queue ``{inspection_id: changes}`` for writing once the current transaction commits."""
+    now = timezone.now()
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    entries = [
+        AuditEntry(inspection_id=pk, action=action, changes=changes, user_id=user_id, created_at=now)
+        for pk, changes in diffs.items() if changes
+    ]
+    if entries:
+        transaction.on_commit(partial(_committed, entries))
+
+
+def _committed(entries):
+    buffer = _buffer.get()
+    if buffer is None:
+        AuditEntry.objects.bulk_create(entries)
+    else:
+        buffer.extend(entries)
+
+
+def flush(entries, user=None):
+    if not entries:
+        return
+    if user is not None and user.is_authenticated:
+        for entry in entries:
+            if entry.user_id is None:
+                entry.user_id = user.pk
+    AuditEntry.objects.bulk_create(entries)
+
+
+class AuditMiddleware:
+    """Buffers committed audit entries for the request and writes them in one bulk_create."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _buffer.set([])
+        try:
+            return self.get_response(request)
+        finally:
+            entries = _buffer.get()
+            _buffer.reset(token)
+            # DRF's authentication sets request.user on the Django request too.
+            flush(entries, getattr(request, "user", None))
+
+    async def __acall__(self, request):
+        # Sync code run for this request sees a copy of the context, but the same list.
+        token = _buffer.set([])
+        try:
+            return await self.get_response(request)
+        finally:
+            entries = _buffer.get()
+            _buffer.reset(token)
+            if entries:
+                await sync_to_async(flush)(entries, getattr(request, "user", None))
+
+
+class HistoryPagination(CursorPagination):
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
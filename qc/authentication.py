@@ -0,0 +1,98 @@
+# qc/authentication.py
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cache, stats
+
+USER_CACHE_TIMEOUT = getattr(settings, "QC_AUTH_USER_CACHE_TIMEOUT", 300)
+# Evictions only reach the worker that saw the write when each process has its own cache.
+LOCAL_USER_CACHE_TIMEOUT = 5
+
+
+class InvalidCredentials(Exception):
+    """Raised by aauthenticate when a token was sent but is not valid."""
+
+
+def user_cache_key(user_id):
+    return f"qc:auth-user:{user_id}"
+
+
+def forget_user(user_id):
+    """Drop a cached user; qc/signals.py calls this whenever a User is saved or deleted."""
+    get_cache().delete(user_cache_key(user_id))
+
+
+def user_cache_timeout():
+    """QC_AUTH_USER_CACHE_TIMEOUT, capped to a few seconds on a per-process (locmem) cache."""
+    if isinstance(get_cache(), LocMemCache):
+        return min(USER_CACHE_TIMEOUT, LOCAL_USER_CACHE_TIMEOUT)
+    return USER_CACHE_TIMEOUT
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from the qc cache.
+
+    Saves the ``auth_user`` query on every API call. Any save or delete of a
+    User (deactivation, password change, staff flag) evicts the entry, and
+    entries expire after QC_AUTH_USER_CACHE_TIMEOUT seconds as a backstop for
+    writes that bypass signals (``User.objects.update(...)``). The active
+    and revoke-token checks still run on every request.
+
+    The eviction only reaches every worker with a shared backend (db or
+    redis). With locmem it clears the cache of the process that handled the
+    write; other workers keep their copy until it expires, so entries there
+    live at most LOCAL_USER_CACHE_TIMEOUT seconds.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken("Token contained no recognizable user identification") from exc
+
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        stats.record("auth-user", hit=user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, user_cache_timeout())
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
+
+
+async def aauthenticate(request, allow_query_token=False):
+    """
+    JWT authentication for plain async Django views (DRF views are sync-only).
+
+    Returns the user, or None if no credentials were sent. Raises
+    InvalidCredentials for a bad/expired token, mirroring DRF's 401.
+    ``allow_query_token`` accepts ?token= for clients like EventSource
+    that cannot set headers.
+    """
+    auth = CachedJWTAuthentication()
+    raw_token = request.GET.get("token") if allow_query_token else None
+    if not raw_token:
+        header = auth.get_header(request)
+        raw_token = auth.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        validated = auth.get_validated_token(raw_token)
+        return await sync_to_async(auth.get_user)(validated)
+    except (InvalidToken, TokenError, AuthenticationFailed) as exc:
+        raise InvalidCredentials(str(exc)) from exc
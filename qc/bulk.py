@@ -0,0 +1,78 @@
+# qc/bulk.py
+"""
+Bulk writes to inspections that skip the per-row save path.
+
+InspectionSerializer.update re-saves the whole row (and rewrites
+measurements when they're sent), one request per inspection. The bulk
+action sets the same fields on many inspections in one transaction with a
+single bulk_update:
+
+    POST /inspections/bulk-update/
+    {"ids": ["<uuid>", ...], "customer_decision": "Accepted", "customer_feedback_comments": "OK for bulk"}
+    -> {"updated": 24, "not_found": [], "customer_feedback_date": "2026-03-02T10:15:00Z"}
+
+Touching customer_decision or customer_feedback_comments stamps every row
+with the same customer_feedback_date, as a single PATCH does. bulk_update
+sends no signals, so save_changes() invalidates the cache and publishes one
+live event per batch itself; spreadsheet imports (qc/feedback_import.py) go
+through it too.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import audit, cache
+from .models import Inspection
+from .savedsearch import MEMBERSHIP
+from .signals import publish_on_commit
+
+BULK_FIELDS = ("customer_decision", "customer_feedback_comments", "decision", "stage")
+FEEDBACK_FIELDS = ("customer_decision", "customer_feedback_comments")
+BATCH_SIZE = 500
+
+
+def save_changes(inspections, fields, diffs=None, action="bulk_update", user=None, batch_size=BATCH_SIZE):
+    """
+    bulk_update ``fields`` on ``inspections`` and announce it (call inside a
+    transaction). ``diffs`` ({pk: changes} from audit.apply_changes) go to the
+    audit trail.
+    """
+    if not inspections:
+        return 0
+    fields = list(fields)
+    # bulk_update skips auto_now; conditional GETs rely on updated_at (qc/conditional.py).
+    now = timezone.now()
+    for inspection in inspections:
+        inspection.updated_at = now
+    Inspection.objects.bulk_update(inspections, [*fields, "updated_at"], batch_size=batch_size)
+    if diffs:
+        audit.record(action, diffs, user)
+    cache.invalidate(Inspection, MEMBERSHIP)
+    transaction.on_commit(lambda: cache.invalidate(Inspection, MEMBERSHIP))
+    event_type = "feedback" if "customer_feedback_date" in fields else "inspection"
+    publish_on_commit(event_type, "bulk_updated", {
+        "ids": [str(i.pk) for i in inspections],
+        "fields": fields,
+    })
+    return len(inspections)
+
+
+def bulk_update_inspections(ids, changes, user=None):
+    """
+    Apply ``changes`` (a subset of BULK_FIELDS) to the inspections in ``ids``.
+
+    Returns ``(updated, not_found, feedback_date)``.
+    """
+    changes = {name: value for name, value in changes.items() if name in BULK_FIELDS}
+    feedback_date = None
+    if any(name in changes for name in FEEDBACK_FIELDS):
+        feedback_date = timezone.now()
+        changes["customer_feedback_date"] = feedback_date
+
+    with transaction.atomic():
+        inspections = list(Inspection.objects.select_for_update().filter(pk__in=ids))
+        diffs = {inspection.pk: audit.apply_changes(inspection, changes) for inspection in inspections}
+        updated = save_changes(inspections, list(changes), diffs, user=user)
+
+    found = {i.pk for i in inspections}
+    not_found = [pk for pk in dict.fromkeys(ids) if pk not in found]
+    return updated, not_found, feedback_date
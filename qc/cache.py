@@ -0,0 +1,176 @@
+# qc/cache.py
+"""
+Application cache for the qc app.
+
+Cached values are keyed on a per-model *version*: every write to a model
+bumps its version (see the receivers in qc/signals.py), which makes every
+key built on the old version unreachable. Nothing ever has to enumerate or
+delete keys, and a missing version is re-seeded from the clock so an evicted
+counter can never resurrect old entries.
+
+The backend is whatever Django cache QC_CACHE_ALIAS points at (local memory
+by default; see CACHES in settings). Local memory is per process, so with
+several gunicorn workers a write only invalidates the worker that handled
+it; keep QC_CACHE_TIMEOUT short there or switch to a shared backend.
+
+Viewsets opt in declaratively with CachedResponseMixin:
+
+    class CustomerViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+        cache_models = (Customer, CustomerEmail)
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import routing
+
+CACHE_ALIAS = getattr(settings, "QC_CACHE_ALIAS", "default")
+DEFAULT_TIMEOUT = getattr(settings, "QC_CACHE_TIMEOUT", 60)
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+class CacheStats:
+    """Process-local hit/miss counters, per namespace."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self.invalidations = 0
+
+    def record(self, namespace, hit):
+        with self._lock:
+            self._counts[namespace]["hits" if hit else "misses"] += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        with self._lock:
+            namespaces = {}
+            for namespace, counts in self._counts.items():
+                total = counts["hits"] + counts["misses"]
+                namespaces[namespace] = dict(counts, hit_rate=round(counts["hits"] / total, 3) if total else 0.0)
+            return {"namespaces": namespaces, "invalidations": self.invalidations}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self.invalidations = 0
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def model_label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def _version_key(label):
+    return f"qc:ver:{label}"
+
+
+def get_versions(models):
+    """Current version of each model, seeding missing ones from the clock."""
+    cache = get_cache()
+    keys = [_version_key(model_label(m)) for m in models]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, int(time.time() * 1000), VERSION_TIMEOUT)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def invalidate(*models):
+    """Bump the version of each model. Call after writes that bypass signals (bulk_update, .update())."""
+    cache = get_cache()
+    for model in models:
+        key = _version_key(model_label(model))
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), VERSION_TIMEOUT)
+        stats.record_invalidation()
+
+
+def make_key(namespace, models, parts=()):
+    versions = ".".join(str(v) for v in get_versions(models))
+    digest = hashlib.md5(repr(tuple(parts)).encode(), usedforsecurity=False).hexdigest()
+    return f"qc:{namespace}:{versions}:{digest}"
+
+
+def get_or_set(namespace, models, parts, compute, timeout=None):
+    """Return the cached value for (namespace, parts) or compute and store it."""
+    cache = get_cache()
+    key = make_key(namespace, models, parts)
+    value = cache.get(key)
+    if value is not None:
+        stats.record(namespace, hit=True)
+        return value
+    stats.record(namespace, hit=False)
+    value = compute()
+    if routing.cacheable():
+        cache.set(key, value, DEFAULT_TIMEOUT if timeout is None else timeout)
+    return value
+
+
+class CachedResponseMixin:
+    """
+    Cache successful ``list``/``retrieve`` payloads of a viewset.
+
+    cache_models:   models whose writes invalidate the cached responses
+    cache_actions:  actions to cache
+    cache_per_user: include the user in the key (for per-user querysets)
+    cache_timeout:  seconds, defaults to QC_CACHE_TIMEOUT
+    """
+    cache_models = ()
+    cache_actions = ("list", "retrieve")
+    cache_per_user = False
+    cache_timeout = None
+
+    def get_cache_namespace(self):
+        return f"{self.basename}-{self.action}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions or not self.cache_models:
+            return handler(request, *args, **kwargs)
+
+        namespace = self.get_cache_namespace()
+        parts = [request.get_full_path(), request.accepted_renderer.format]
+        if self.cache_per_user:
+            parts.append(request.user.pk)
+
+        cache = get_cache()
+        key = make_key(namespace, self.cache_models, parts)
+        data = cache.get(key)
+        if data is not None:
+            stats.record(namespace, hit=True)
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        stats.record(namespace, hit=False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and routing.cacheable():
+            cache.set(key, response.data, DEFAULT_TIMEOUT if self.cache_timeout is None else self.cache_timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,106 @@
+# qc/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for the inspection, template and
+customer endpoints.
+
+Validators come from the rows themselves, not from the rendered body: one
+aggregate over the queryset the action would serve (row count plus the
+newest ``updated_at``, and the newest ``updated_at`` of any
+``conditional_related`` foreign keys), hashed together with the path,
+format and user into a strong ETag. The aggregate is cached under the
+viewset's cache_models versions (qc/cache.py), so a repeat check costs no
+query at all, and a request whose If-None-Match / If-Modified-Since still
+matches gets its 304 before anything is fetched, serialised or rendered.
+The count catches deletes, which leave no newer ``updated_at`` behind.
+
+Children that make up a representation bump their parent's ``updated_at``
+(images, customer emails: qc/signals.py; measurements and template POMs
+are only written through a parent save), and the bulk paths set it
+themselves (qc/bulk.py).
+
+Compressed responses carry the weak form of the tag (qc/compression.py);
+If-None-Match uses the weak comparison, so both forms match.
+
+    class CustomerViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+        conditional_actions = ("list", "retrieve")
+"""
+import calendar
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import exceptions, status
+
+from . import cache
+
+
+class ConditionalGetMixin:
+    """
+    Answer GETs of ``conditional_actions`` with 304 when the client's copy is current.
+
+    conditional_actions: actions to validate; custom detail actions wrap their
+                         handler with conditional_response()
+    conditional_related: foreign keys whose ``updated_at`` also dates the
+                         representation
+    """
+    conditional_actions = ("list", "retrieve")
+    conditional_related = ()
+
+    def get_validator_queryset(self, **kwargs):
+        if self.action == "list":
+            return self.filter_queryset(self.get_queryset())
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return self.get_queryset().filter(**{self.lookup_field: kwargs[lookup]})
+
+    def compute_validators(self, **kwargs):
+        stamps = {"updated_at": Max("updated_at")}
+        for name in self.conditional_related:
+            stamps[name] = Max(f"{name}__updated_at")
+        row = self.get_validator_queryset(**kwargs).order_by().aggregate(count=Count("pk"), **stamps)
+        if not row["count"] and self.action != "list":
+            return None  # let the handler 404
+        dates = [value for key, value in row.items() if key != "count" and value is not None]
+        return row["count"], max(dates) if dates else None
+
+    def get_validators(self, request, **kwargs):
+        """``(etag, last_modified timestamp)`` for this request, or None to skip validation."""
+        parts = [self.action, request.get_full_path(), request.accepted_renderer.format]
+        if getattr(self, "cache_per_user", False):
+            parts.append(request.user.pk)
+        try:
+            found = cache.get_or_set(f"validators-{self.basename}", self.cache_models, parts,
+                                     lambda: self.compute_validators(**kwargs))
+        except (ValidationError, ValueError, exceptions.ValidationError):
+            return None  # a malformed id or filter; the handler reports it
+        if found is None:
+            return None
+        count, updated = found
+        digest = hashlib.md5(repr((*parts, count, updated)).encode(), usedforsecurity=False).hexdigest()
+        last_modified = calendar.timegm(updated.utctimetuple()) if updated is not None else None
+        return f'"{digest}"', last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+        validators = self.get_validators(request, **kwargs)
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
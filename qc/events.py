@@ -0,0 +1,182 @@
+# qc/events.py
+"""
+Live change events for the dashboard and inspection lists.
+
+Model signals (see qc/signals.py) publish compact events into an in-process
+broker once the surrounding transaction commits. ``event_stream`` fans them
+out to connected browsers as Server-Sent Events, so clients can patch their
+lists instead of polling the full payload.
+
+The broker lives in process memory and needs no Redis. Serve the stream from
+the ASGI entry point with a single worker so every connection sees every write:
+
+    uvicorn quality_check.asgi:application --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+
+from .authentication import InvalidCredentials, aauthenticate
+
+EVENT_HISTORY_SIZE = getattr(settings, "QC_EVENT_HISTORY_SIZE", 500)
+EVENT_QUEUE_SIZE = getattr(settings, "QC_EVENT_QUEUE_SIZE", 200)
+HEARTBEAT_SECONDS = getattr(settings, "QC_EVENT_HEARTBEAT_SECONDS", 15)
+
+
+class Subscription:
+    """One connected client: a bounded asyncio queue owned by its event loop."""
+
+    def __init__(self, broker, loop, types=None):
+        self.broker = broker
+        self.loop = loop
+        self.types = types
+        self.queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+
+    def wants(self, event):
+        return self.types is None or event["type"] in self.types
+
+    def offer(self, event):
+        # Called from whichever thread committed the write.
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The client's loop has shut down; forget about it.
+            self.broker.unsubscribe(self)
+
+    def _put(self, event):
+        if self.queue.full():
+            # Slow client: drop what is queued and ask it to refetch once.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {"id": event["id"], "type": "resync", "action": "overflow", "data": {}}
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Thread-safe publish/subscribe with a short replay history."""
+
+    def __init__(self, history_size=EVENT_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history_size)
+        self._next_id = 1
+
+    def publish(self, event_type, action, data):
+        with self._lock:
+            event = {
+                "id": self._next_id,
+                "type": event_type,
+                "action": action,
+                "data": data,
+                "ts": round(time.time(), 3),
+            }
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.wants(event):
+                sub.offer(event)
+        return event
+
+    def subscribe(self, last_event_id=None, types=None):
+        """Register a subscriber on the running loop, replaying missed events."""
+        sub = Subscription(self, asyncio.get_running_loop(), types)
+        with self._lock:
+            backlog = []
+            if last_event_id is not None:
+                oldest = self._history[0]["id"] if self._history else self._next_id
+                if last_event_id + 1 < oldest:
+                    # Gap is older than our history; the client must refetch.
+                    backlog = [{"id": self._next_id - 1, "type": "resync", "action": "expired", "data": {}}]
+                else:
+                    backlog = [e for e in self._history if e["id"] > last_event_id and sub.wants(e)]
+            self._subscribers.add(sub)
+        for event in backlog[-EVENT_QUEUE_SIZE:]:
+            sub.queue.put_nowait(event)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def publish(event_type, action, data):
+    return broker.publish(event_type, action, data)
+
+
+def format_sse(event):
+    payload = json.dumps(event, separators=(",", ":"), default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+def _parse_last_event_id(request):
+    value = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+async def _stream(last_event_id, types):
+    # Subscribe lazily so a response that is never iterated can't leak a queue.
+    sub = broker.subscribe(last_event_id, types)
+    try:
+        # Tell EventSource how long to wait before reconnecting.
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await sub.get(HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies and Cloud Run from closing an idle connection.
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        sub.close()
+
+
+async def event_stream(request):
+    """GET /events/?token=<access>&types=inspection,feedback,image"""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(
+            "Live events require the ASGI server (quality_check.asgi).",
+            status=501, content_type="text/plain",
+        )
+    try:
+        user = await aauthenticate(request, allow_query_token=True)
+    except InvalidCredentials:
+        user = None
+    if user is None:
+        return HttpResponse("Authentication required", status=401, content_type="text/plain")
+
+    types = None
+    if request.GET.get("types"):
+        types = {t.strip() for t in request.GET["types"].split(",") if t.strip()} | {"resync"}
+    response = StreamingHttpResponse(
+        _stream(_parse_last_event_id(request), types), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
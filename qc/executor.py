@@ -0,0 +1,67 @@
+# qc/executor.py
+"""
+Bounded thread pool for CPU-bound work (PDF rendering, image compression)
+requested from async views, so it never runs on the event loop.
+
+Admission is bounded too: once QC_CPU_WORKERS jobs are running and
+QC_CPU_QUEUE more are waiting, new work is refused with ExecutorBusy
+instead of piling up behind a slow queue.
+
+Blocking I/O (SMTP, storage writes) mostly waits, so it gets its own, much
+wider pool of QC_IO_WORKERS threads. asyncio's default executor has only
+cpu_count + 4 threads, which would cap the async views at a handful of
+sends in flight on a small instance.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+CPU_WORKERS = getattr(settings, "QC_CPU_WORKERS", None) or min(4, os.cpu_count() or 1)
+CPU_QUEUE = getattr(settings, "QC_CPU_QUEUE", None) or CPU_WORKERS * 4
+IO_WORKERS = getattr(settings, "QC_IO_WORKERS", None) or 64
+
+_executor = None
+_io_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(CPU_WORKERS + CPU_QUEUE)
+
+
+class ExecutorBusy(Exception):
+    """All CPU workers are busy and the wait queue is full."""
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="qc-cpu")
+    return _executor
+
+
+def get_io_executor():
+    """Pool for blocking I/O; pass as ``sync_to_async(..., thread_sensitive=False, executor=...)``."""
+    global _io_executor
+    if _io_executor is None:
+        with _executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="qc-io")
+    return _io_executor
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Run ``func`` on the bounded pool and await its result."""
+    if not _slots.acquire(blocking=False):
+        raise ExecutorBusy()
+    try:
+        future = get_executor().submit(partial(func, *args, **kwargs))
+    except BaseException:
+        _slots.release()
+        raise
+    # Release on completion, not on cancellation, so a running job keeps its slot.
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wrap_future(future)
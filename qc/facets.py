@@ -0,0 +1,113 @@
+# qc/facets.py
+"""
+Facet counts for the inspection filter UI.
+
+For the current InspectionFilter parameters, counts every decision, stage,
+customer and customer decision in one grouped query. Facets the filter
+selects on are counted *disjunctively*: the decision counts apply every
+filter except ``decision`` itself, so a multi-select keeps showing how many
+rows each other option would add.
+
+The query groups by all four columns at once and runs with only the
+non-facet filters (dates, search). Python then sums the combinations for
+each facet, so the number of distinct combinations stays small (choices x
+customers), however many inspections match. Results are cached briefly per
+normalised filter, behind the Inspection/Customer cache versions.
+
+    GET /inspections/facets/?stage=Fit&search=ST-1
+    {"total": 42, "facets": {"decision": [{"value": "Accepted", "label": "Accepted", "count": 30}, ...],
+                             "stage": [...], "customer": [...], "customer_decision": [...]}}
+"""
+from django.conf import settings
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+from . import cache
+from .filters import InspectionFilter
+from .models import Customer, Inspection
+
+FACETS_TIMEOUT = getattr(settings, "QC_FACETS_TIMEOUT", 15)
+# facet name -> grouped column
+FACET_COLUMNS = {
+    "decision": "decision",
+    "stage": "stage",
+    "customer": "customer_id",
+    "customer_decision": "customer_decision",
+}
+# Facets that are also filter parameters (counted with their own filter lifted).
+SELECTABLE = ("decision", "stage", "customer")
+
+
+def _selected(cleaned):
+    selected = {}
+    for name in SELECTABLE:
+        value = cleaned.get(name)
+        if value:
+            selected[name] = set(value) if isinstance(value, (list, tuple)) else {value}
+    return selected
+
+
+def normalise(cleaned):
+    """Canonical, hashable form of the cleaned filter values (order and repeats don't matter)."""
+    parts = []
+    for name in sorted(cleaned):
+        value = cleaned[name]
+        if value in (None, "", [], ()):
+            continue
+        if isinstance(value, (list, tuple)):
+            value = tuple(sorted(set(value)))
+        parts.append((name, str(value) if not isinstance(value, tuple) else value))
+    return tuple(parts)
+
+
+def _choices(values, counts):
+    rows = [{"value": value, "label": label, "count": counts.pop(value, 0)} for value, label in values]
+    if counts.get(None):
+        rows.append({"value": None, "label": None, "count": counts.pop(None)})
+    return rows
+
+
+def compute_facets(params, cleaned):
+    selected = _selected(cleaned)
+    # Everything but the selectable facets narrows the grouped query.
+    params = params.copy()
+    for name in SELECTABLE:
+        params.pop(name, None)
+    queryset = InspectionFilter(params, queryset=Inspection.objects.all()).qs
+    rows = queryset.order_by().values(*FACET_COLUMNS.values(), "customer__name").annotate(count=Count("pk"))
+
+    counts = {name: {} for name in FACET_COLUMNS}
+    names = {}
+    total = 0
+    for row in rows:
+        values = {name: row[column] for name, column in FACET_COLUMNS.items()}
+        misses = {name for name, allowed in selected.items() if values[name] not in allowed}
+        if not misses:
+            total += row["count"]
+        if row["customer_id"] is not None:
+            names[row["customer_id"]] = row["customer__name"]
+        for name, value in values.items():
+            # A row counts for a facet when every *other* selection matches.
+            if not misses - {name}:
+                counts[name][value] = counts[name].get(value, 0) + row["count"]
+
+    customers = sorted(((pk, names[pk]) for pk in counts["customer"] if pk is not None), key=lambda c: c[1])
+    return {
+        "total": total,
+        "facets": {
+            "decision": _choices(Inspection.DECISION_CHOICES, counts["decision"]),
+            "stage": _choices(Inspection.STAGE_CHOICES, counts["stage"]),
+            "customer": _choices(customers, counts["customer"]),
+            "customer_decision": _choices(Inspection.CUSTOMER_DECISION_CHOICES, counts["customer_decision"]),
+        },
+    }
+
+
+def facet_counts(params):
+    """Facet counts for a QueryDict of InspectionFilter parameters, cached per normalised filter."""
+    filterset = InspectionFilter(params, queryset=Inspection.objects.none())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    cleaned = filterset.form.cleaned_data
+    return cache.get_or_set("inspection-facets", (Inspection, Customer), normalise(cleaned),
+                            lambda: compute_facets(params, cleaned), timeout=FACETS_TIMEOUT)
@@ -0,0 +1,99 @@
+# qc/fastpath.py
+"""
+Serializer-free rendering for flat, read-only list endpoints.
+
+A ModelSerializer builds a dict per row by walking its field objects, which
+dominates the cost of large lists. ValuesSerializer inspects a serializer
+class once, maps each field to a ``values_list()`` lookup
+(``created_by.username`` becomes ``created_by__username``, so no model
+instances or joined objects are built) and keeps the field's own
+``to_representation`` only where it changes the value. Output is identical
+to the serializer's; qc/tests.py checks that.
+
+Only flat serializers qualify: model fields, dotted sources and
+primary-key relations. Nested serializers and SerializerMethodFields raise
+ImproperlyConfigured at compile time.
+
+    class InspectionViewSet(CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
+        ...
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.response import Response
+
+# Fields whose to_representation returns database values unchanged.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.ChoiceField, serializers.BooleanField,
+                      serializers.IntegerField, serializers.PrimaryKeyRelatedField)
+_OMIT = object()
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.names, self.lookups, self.converters, self.missing = [], [], [], []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField,
+                                  serializers.SerializerMethodField)) or field.source == "*":
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.{name} can't be read from .values()")
+            self.names.append(name)
+            self.lookups.append("__".join(field.source_attrs))
+            position = len(self.names) - 1
+            if not isinstance(field, PASSTHROUGH_FIELDS):
+                self.converters.append((position, field.to_representation))
+            if len(field.source_attrs) > 1:
+                # A NULL relation on the way: DRF falls back to default/None or drops the key.
+                if field.default is not empty:
+                    fallback = field.get_default()
+                elif field.allow_null:
+                    fallback = None
+                else:
+                    fallback = _OMIT
+                self.missing.append((position, fallback))
+
+    def to_representation(self, row):
+        row = list(row)
+        for position, convert in self.converters:
+            if row[position] is not None:
+                row[position] = convert(row[position])
+        data = dict(zip(self.names, row))
+        for position, fallback in self.missing:
+            if row[position] is None:
+                name = self.names[position]
+                if fallback is _OMIT:
+                    del data[name]
+                else:
+                    data[name] = fallback
+        return data
+
+    def serialize(self, queryset):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in queryset.values_list(*self.lookups)]
+
+
+_compiled = {}
+
+
+def values_serializer(serializer_class):
+    """The compiled ValuesSerializer for a serializer class (built once per process)."""
+    compiled = _compiled.get(serializer_class)
+    if compiled is None:
+        compiled = _compiled[serializer_class] = ValuesSerializer(serializer_class)
+    return compiled
+
+
+class FastListMixin:
+    """
+    Render ``list`` through ValuesSerializer instead of the list serializer.
+
+    Filtering, ordering and the queryset are unchanged. Paginated pages fall
+    back to the serializer.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(values_serializer(self.get_serializer_class()).serialize(queryset))
@@ -0,0 +1,218 @@
+# qc/feedback_import.py
+"""
+Import customer feedback from the spreadsheets customers send back.
+
+Rows are read in pages (a Google Sheet through gspread, or a local CSV/TSV
+file for testing and one-off imports), matched to inspections on
+``(po_number, style, color, stage)`` through the composite index on
+Inspection, and written with one bulk_update per page via
+qc.bulk.save_changes(), so caches and live clients see the change as with
+the bulk-update endpoint.
+
+Recognised columns (header names are case- and space-insensitive):
+
+    PO / PO Number, Style, Color / Colour, Stage        the match key
+    Customer Decision / Decision                        a CUSTOMER_DECISION_CHOICES value
+    Comments / Customer Feedback Comments / Feedback    optional; a blank cell keeps the current comments
+    Feedback Date / Date                                optional, defaults to the import time
+
+Rows that match no inspection, match several, or carry an unknown decision,
+stage or date are reported and left alone. When the same inspection appears
+twice the later row wins.
+
+    python manage.py import_feedback --file approvals.csv --dry-run
+    python manage.py import_feedback --sheet <key or url> --worksheet "Approvals"
+"""
+import csv
+import itertools
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import audit
+from .bulk import save_changes
+from .models import Inspection
+
+PAGE_SIZE = 500
+KEY = ("po_number", "style", "color", "stage")
+COLUMN_ALIASES = {
+    "po": "po_number", "po_number": "po_number", "po_no": "po_number", "purchase_order": "po_number",
+    "style": "style", "style_no": "style",
+    "color": "color", "colour": "color",
+    "stage": "stage",
+    "customer_decision": "customer_decision", "decision": "customer_decision", "status": "customer_decision",
+    "comments": "customer_feedback_comments", "customer_feedback_comments": "customer_feedback_comments",
+    "feedback": "customer_feedback_comments", "customer_comments": "customer_feedback_comments",
+    "feedback_date": "customer_feedback_date", "date": "customer_feedback_date",
+    "customer_feedback_date": "customer_feedback_date",
+}
+CREDENTIALS = getattr(settings, "QC_GSPREAD_CREDENTIALS", None)
+
+
+def _canonical(choices):
+    return {value.casefold(): value for value, _ in choices}
+
+
+STAGES = _canonical(Inspection.STAGE_CHOICES)
+DECISIONS = _canonical(Inspection.CUSTOMER_DECISION_CHOICES)
+
+
+def column_name(header):
+    return COLUMN_ALIASES.get("_".join(header.strip().lower().replace("#", "").replace(".", " ").split()))
+
+
+# --- readers ---------------------------------------------------------------------
+# Each yields lists of cell strings, header row first.
+
+def read_file(path):
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        sample = fh.read(4096)
+        fh.seek(0)
+        dialect = csv.excel_tab if sample.count("\t") > sample.count(",") else csv.excel
+        yield from csv.reader(fh, dialect)
+
+
+def read_sheet(sheet, worksheet=None, credentials=None, page_size=PAGE_SIZE):
+    """Rows of a Google Sheet; API and auth failures are raised as ValueError with gspread's message."""
+    try:
+        import gspread
+        from google.auth.exceptions import GoogleAuthError
+    except ImportError as exc:
+        raise ValueError(f"Reading Google Sheets needs gspread: {exc}") from exc
+
+    try:
+        credentials = credentials or CREDENTIALS
+        client = gspread.service_account(filename=credentials) if credentials else gspread.service_account()
+        spreadsheet = client.open_by_url(sheet) if sheet.startswith("http") else client.open_by_key(sheet)
+        ws = spreadsheet.worksheet(worksheet) if worksheet else spreadsheet.sheet1
+        # Page through the rows instead of pulling the whole sheet at once.
+        for start in range(1, ws.row_count + 1, page_size):
+            rows = ws.get(f"{start}:{start + page_size - 1}")
+            if not rows:
+                return
+            yield from rows
+    except gspread.exceptions.SpreadsheetNotFound as exc:
+        raise ValueError(f"Spreadsheet {sheet!r} not found, or not shared with the service account.") from exc
+    except gspread.exceptions.WorksheetNotFound as exc:
+        raise ValueError(f"Worksheet {worksheet!r} not found.") from exc
+    except (gspread.exceptions.GSpreadException, GoogleAuthError) as exc:
+        raise ValueError(f"Google Sheets error: {exc}") from exc
+
+
+# --- import ---------------------------------------------------------------------
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    matched: int = 0
+    updated: int = 0
+    unmatched: list = field(default_factory=list)   # (row number, key)
+    ambiguous: list = field(default_factory=list)   # (row number, key, match count)
+    invalid: list = field(default_factory=list)     # (row number, reason)
+
+
+def _parse_row(cells, columns, now):
+    values = {name: (cells[i].strip() if i < len(cells) else "") for name, i in columns.items()}
+    stage = STAGES.get(values["stage"].casefold())
+    if stage is None:
+        raise ValueError(f"unknown stage {values['stage']!r}")
+    decision = values.get("customer_decision", "")
+    if decision:
+        decision = DECISIONS.get(decision.casefold())
+        if decision is None:
+            raise ValueError(f"unknown customer decision {values['customer_decision']!r}")
+    when = now
+    if values.get("customer_feedback_date"):
+        raw = values["customer_feedback_date"]
+        when = parse_datetime(raw)
+        if when is None and parse_date(raw) is not None:
+            when = parse_datetime(f"{raw}T00:00:00")
+        if when is None:
+            raise ValueError(f"unparseable feedback date {raw!r}")
+        if timezone.is_naive(when):
+            when = timezone.make_aware(when)
+    key = (values["po_number"], values["style"], values["color"], stage)
+    changes = {"customer_feedback_date": when}
+    if decision:
+        changes["customer_decision"] = decision
+    if values.get("customer_feedback_comments"):
+        changes["customer_feedback_comments"] = values["customer_feedback_comments"]
+    return key, changes
+
+
+def _apply_page(page, report, dry_run):
+    """Match one page of parsed rows through the (po_number, style, color, stage) index and save it."""
+    matches = {}
+    rows = (
+        Inspection.objects.filter(
+            po_number__in={key[0] for _, key, _ in page}, style__in={key[1] for _, key, _ in page})
+        .only("pk", *KEY, "customer_decision", "customer_feedback_comments", "customer_feedback_date")
+    )
+    for inspection in rows:
+        matches.setdefault(tuple(getattr(inspection, name) for name in KEY), []).append(inspection)
+
+    changed, diffs = {}, {}
+    fields = {"customer_feedback_date"}
+    for number, key, changes in page:
+        found = matches.get(key, [])
+        if not found:
+            report.unmatched.append((number, key))
+            continue
+        if len(found) > 1:
+            report.ambiguous.append((number, key, len(found)))
+            continue
+        report.matched += 1
+        inspection = found[0]
+        # A repeated row keeps the original "old" value in the audit diff.
+        diff = diffs.setdefault(inspection.pk, {})
+        for name, (old, new) in audit.apply_changes(inspection, changes).items():
+            diff[name] = [diff[name][0] if name in diff else old, new]
+        fields.update(changes)
+        changed[inspection.pk] = inspection
+    if dry_run:
+        report.updated += len(changed)
+        return
+    with transaction.atomic():
+        report.updated += save_changes(list(changed.values()), sorted(fields), diffs, action="import")
+
+
+def import_feedback(rows, dry_run=False, page_size=PAGE_SIZE):
+    """Import feedback from an iterable of cell lists (header first); returns an ImportReport."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("The sheet is empty.")
+    columns = {}
+    for index, cell in enumerate(header):
+        name = column_name(cell)
+        if name and name not in columns:
+            columns[name] = index
+    missing = [name for name in KEY if name not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    if "customer_decision" not in columns and "customer_feedback_comments" not in columns:
+        raise ValueError("Need a customer decision or comments column.")
+
+    report = ImportReport()
+    now = timezone.now()
+    numbered = enumerate(rows, start=2)  # spreadsheet row numbers
+    while True:
+        chunk = list(itertools.islice(numbered, page_size))
+        if not chunk:
+            return report
+        page = []
+        for number, cells in chunk:
+            if not any(cell.strip() for cell in cells):
+                continue
+            report.rows += 1
+            try:
+                key, changes = _parse_row(cells, columns, now)
+            except ValueError as exc:
+                report.invalid.append((number, str(exc)))
+                continue
+            page.append((number, key, changes))
+        if page:
+            _apply_page(page, report, dry_run)
@@ -1,7 +1,7 @@
 # qc/filters.py
 import django_filters
 from django.db import models
-from .models import Inspection
+from .models import ArchivedInspection, Inspection
 
 
 class InspectionFilter(django_filters.FilterSet):
@@ -43,3 +43,10 @@ class InspectionFilter(django_filters.FilterSet):
     class Meta:
         model = Inspection
         fields = ['decision', 'stage', 'customer', 'created_at_after', 'created_at_before', 'search']
+
+
+class ArchivedInspectionFilter(InspectionFilter):
+    """The same filters over the archive (its columns share Inspection's names)."""
+
+    class Meta(InspectionFilter.Meta):
+        model = ArchivedInspection
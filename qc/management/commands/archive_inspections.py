@@ -0,0 +1,49 @@
+# qc/management/commands/archive_inspections.py
+"""
+Move old inspections into the archive, or bring them back.
+
+    python manage.py archive_inspections --older-than-days 730
+    python manage.py archive_inspections --older-than-days 365 --limit 10000 --dry-run
+    python manage.py archive_inspections --restore <uuid> [<uuid> ...]
+
+Safe to schedule: each batch is its own transaction, so an interrupted run
+leaves every inspection either hot or archived, and the next run continues.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from qc.archive import archive_inspections, restore_inspections
+from qc.models import Inspection
+
+
+class Command(BaseCommand):
+    help = "Archive inspections older than N days (with measurements and image rows), or restore archived ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, help="archive inspections created before now - N days")
+        parser.add_argument("--batch-size", type=int, default=500, help="inspections per transaction")
+        parser.add_argument("--limit", type=int, help="archive at most N inspections this run")
+        parser.add_argument("--dry-run", action="store_true", help="only report how many would be archived")
+        parser.add_argument("--restore", nargs="+", metavar="ID", help="restore these archived inspections")
+
+    def handle(self, *args, **opts):
+        if opts["restore"]:
+            restored = restore_inspections(opts["restore"])
+            self.stdout.write(self.style.SUCCESS(f"Restored {restored} of {len(opts['restore'])} inspections."))
+            return
+
+        days = opts["older_than_days"]
+        if days is None:
+            raise CommandError("Pass --older-than-days N (or --restore ID ...).")
+        if opts["dry_run"]:
+            cutoff = timezone.now() - timedelta(days=days)
+            count = Inspection.objects.filter(created_at__lt=cutoff).count()
+            if opts["limit"]:
+                count = min(count, opts["limit"])
+            self.stdout.write(f"Would archive {count} inspections created before {cutoff:%Y-%m-%d}.")
+            return
+
+        moved = archive_inspections(days, batch_size=max(1, opts["batch_size"]), limit=opts["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} inspections older than {days} days."))
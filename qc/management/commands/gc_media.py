@@ -0,0 +1,54 @@
+# qc/management/commands/gc_media.py
+"""
+Delete image files that no inspection references any more.
+
+    python manage.py gc_media --dry-run
+    python manage.py gc_media --grace-hours 48 --batch-size 1000 --workers 16
+
+Safe to schedule: the storage listing and the database references are
+streamed in sorted order and merge-joined (see qc/media.py), files younger
+than the grace period are left alone, and every batch is re-checked against
+the database just before it is deleted. Failed deletes are reported and
+retried by the next run.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from qc.media import MEDIA_PREFIX, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Delete orphaned inspection image files from storage (local MEDIA_ROOT or the GCS bucket)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+        parser.add_argument("--grace-hours", type=float, default=24,
+                            help="keep orphans modified within the last N hours (default 24)")
+        parser.add_argument("--batch-size", type=int, default=500, help="files per delete batch")
+        parser.add_argument("--workers", type=int, default=8, help="parallel deletes per batch")
+        parser.add_argument("--prefix", default=MEDIA_PREFIX, help="storage prefix to collect")
+
+    def handle(self, *args, **opts):
+        if opts["grace_hours"] < 0:
+            raise CommandError("--grace-hours can't be negative.")
+        log = (lambda line: self.stdout.write(f"  {line}")) if opts["verbosity"] > 1 else None
+        try:
+            report = collect_garbage(
+                grace=timedelta(hours=opts["grace_hours"]), dry_run=opts["dry_run"],
+                batch_size=max(1, opts["batch_size"]), workers=opts["workers"],
+                prefix=opts["prefix"].strip("/"), log=log,
+            )
+        except ValueError as exc:
+            raise CommandError(f"Aborted, nothing more deleted: {exc}")
+
+        verb = "Would delete" if opts["dry_run"] else "Deleted"
+        self.stdout.write(
+            f"Scanned {report.scanned} files: {report.orphans} orphaned, "
+            f"{report.kept_recent} kept (grace period), {report.kept_referenced} kept (referenced again).")
+        for name, error in report.failed:
+            self.stderr.write(f"  failed to delete {name}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report.deleted} files, {filesizeformat(report.bytes_reclaimed)} "
+            f"({report.bytes_reclaimed} bytes) reclaimed."))
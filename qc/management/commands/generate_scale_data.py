@@ -0,0 +1,306 @@
+# qc/management/commands/generate_scale_data.py
+"""
+Generate production-sized, reproducible QC data for performance work.
+
+    python manage.py generate_scale_data --inspections 1000000 --seed 7
+    python manage.py generate_scale_data --stage-weights "Proto=5,Fit=3,PPS=1" --customer-skew 1.4
+    python manage.py generate_scale_data --clear          # remove previously generated rows
+
+Rows are written with bulk_create in batches (one transaction per batch), so
+the same command populates SQLite or PostgreSQL at tens of thousands of rows
+per second. The same seed and options always produce the same rows, ids and
+timestamps. Generated rows are tagged with --prefix so they can be cleared
+without touching real data; generate again after --clear (or with another
+--prefix). Image rows point at file names that do not exist in storage.
+
+bulk_create and the raw deletes send no signals, so both paths bump the qc
+cache versions (qc/cache.py) themselves when they finish.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from qc import cache
+from qc.models import (
+    Customer, CustomerEmail, Inspection, InspectionImage, Measurement, Template, TemplatePOM,
+)
+from qc.savedsearch import MEMBERSHIP
+
+User = get_user_model()
+
+DEFAULT_STAGE_WEIGHTS = "Dev=5,Proto=25,Fit=25,SMS=15,Size Set=10,PPS=15,Shipment Sample=5"
+DEFAULT_DECISION_WEIGHTS = "Accepted=60,Rejected=20,Represent=12,none=8"
+DEFAULT_CUSTOMER_DECISION_WEIGHTS = (
+    "Accepted=25,Rejected=6,Revision Requested=6,Accepted with Comments=8,Held Internally=2,none=53"
+)
+
+POM_NAMES = [
+    "Chest Width", "Waist Width", "Hip Width", "Front Length", "Back Length", "Shoulder Width",
+    "Sleeve Length", "Armhole Straight", "Bicep Width", "Cuff Opening", "Neck Width", "Front Neck Drop",
+    "Back Neck Drop", "Bottom Opening", "Inseam", "Front Rise", "Back Rise", "Thigh Width", "Knee Width",
+    "Leg Opening", "Collar Length", "Placket Length", "Pocket Width", "Pocket Height", "Hood Height",
+]
+COLORS = ["Black", "White", "Navy", "Heather Grey", "Olive", "Burgundy", "Stone", "Indigo", "Red", "Sky Blue"]
+COMMENTS = [
+    "Measurements within tolerance.", "Shade slightly off standard.", "Loose threads at side seam.",
+    "Fit approved with minor comments.", "Wash shrinkage above limit.", "Fabric hand feel acceptable.",
+    "Label placement incorrect.", "", "", "",
+]
+GENERATED_MODELS = (Customer, CustomerEmail, Template, TemplatePOM, Inspection, Measurement, InspectionImage, MEMBERSHIP)
+
+
+def parse_weights(value, choices, allow_none=False):
+    """Parse "A=3,B=1,none=2" into (values, cumulative weights)."""
+    values, weights = [], []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        name, _, weight = part.rpartition("=")
+        if not name:
+            raise CommandError(f"Bad weight '{part}', expected NAME=WEIGHT")
+        if name == "none" and allow_none:
+            name = None
+        elif name not in choices:
+            raise CommandError(f"Unknown value '{name}'; choose from {', '.join(choices)}")
+        values.append(name)
+        weights.append(float(weight))
+    if not values or sum(weights) <= 0:
+        raise CommandError(f"No positive weights in '{value}'")
+    cumulative, total = [], 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return values, cumulative
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep our generated auto_now_add values instead of now()."""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+class Command(BaseCommand):
+    help = "Generate large, deterministic customers/templates/inspections/measurements/images for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="SCALE", help="tag used in names/styles of generated rows")
+        parser.add_argument("--customers", type=int, default=40)
+        parser.add_argument("--templates", type=int, default=60)
+        parser.add_argument("--poms", type=int, default=20, help="max POMs per template")
+        parser.add_argument("--users", type=int, default=15, help="inspector accounts")
+        parser.add_argument("--inspections", type=int, default=100_000)
+        parser.add_argument("--images", type=float, default=2.0, help="average images per inspection")
+        parser.add_argument("--batch-size", type=int, default=5_000, help="inspections per transaction")
+        parser.add_argument("--days", type=int, default=3 * 365, help="spread created_at over this many days")
+        parser.add_argument("--end-date", default="2025-12-31", help="newest created_at (YYYY-MM-DD)")
+        parser.add_argument("--customer-skew", type=float, default=1.1,
+                            help="Zipf exponent for inspections per customer (0 = uniform)")
+        parser.add_argument("--stage-weights", default=DEFAULT_STAGE_WEIGHTS)
+        parser.add_argument("--decision-weights", default=DEFAULT_DECISION_WEIGHTS)
+        parser.add_argument("--customer-decision-weights", default=DEFAULT_CUSTOMER_DECISION_WEIGHTS)
+        parser.add_argument("--clear", action="store_true", help="delete rows generated with --prefix and exit")
+
+    def handle(self, *args, **opts):
+        self.prefix = opts["prefix"]
+        if opts["clear"]:
+            return self.clear()
+        if (Customer.objects.filter(name__startswith=f"{self.prefix} Customer ").exists()
+                or Inspection.objects.filter(style__startswith=f"{self.prefix}-").exists()):
+            raise CommandError(
+                f"Rows generated with --prefix {self.prefix} already exist; "
+                f"remove them with --clear first, or pass another --prefix.")
+
+        self.rng = random.Random(opts["seed"])
+        self.stages = parse_weights(opts["stage_weights"], [c[0] for c in Inspection.STAGE_CHOICES])
+        self.decisions = parse_weights(
+            opts["decision_weights"], [c[0] for c in Inspection.DECISION_CHOICES], allow_none=True)
+        self.customer_decisions = parse_weights(
+            opts["customer_decision_weights"], [c[0] for c in Inspection.CUSTOMER_DECISION_CHOICES], allow_none=True)
+        end = timezone.make_aware(datetime.combine(datetime.strptime(opts["end_date"], "%Y-%m-%d"), time(18)))
+        self.start = end - timedelta(days=opts["days"])
+        self.span_seconds = opts["days"] * 86400
+
+        users = self.make_users(opts["users"])
+        customers = self.make_customers(opts["customers"], users)
+        templates = self.make_templates(opts["templates"], opts["poms"], customers, users)
+
+        # Zipf-like popularity: a few big customers, a long tail of small ones.
+        weights = [1 / (rank + 1) ** opts["customer_skew"] for rank in range(len(customers))]
+        customer_choice = (customers, self.cumulative(weights))
+        templates_by_customer = {}
+        for template, poms in templates:
+            templates_by_customer.setdefault(template.customer_id, []).append((template, poms))
+
+        total = opts["inspections"]
+        batch_size = max(1, opts["batch_size"])
+        counts = {"inspections": 0, "measurements": 0, "images": 0}
+        for offset in range(0, total, batch_size):
+            size = min(batch_size, total - offset)
+            batch = self.make_inspection_batch(
+                offset, size, users, customer_choice, templates_by_customer, opts["images"])
+            for key, value in batch.items():
+                counts[key] += value
+            self.stdout.write(f"  {offset + size:>10,}/{total:,} inspections "
+                              f"({counts['measurements']:,} measurements, {counts['images']:,} images)")
+        cache.invalidate(*GENERATED_MODELS)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(customers)} customers, {len(templates)} templates, "
+            f"{counts['inspections']:,} inspections, {counts['measurements']:,} measurements, "
+            f"{counts['images']:,} images"))
+
+    # --- helpers -------------------------------------------------------------
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    @staticmethod
+    def cumulative(weights):
+        total, out = 0.0, []
+        for weight in weights:
+            total += weight
+            out.append(total)
+        return out
+
+    def pick(self, choice):
+        values, cum_weights = choice
+        return self.rng.choices(values, cum_weights=cum_weights)[0]
+
+    def timestamp(self):
+        return self.start + timedelta(seconds=self.rng.randrange(self.span_seconds))
+
+    # --- generators ------------------------------------------------------------
+
+    def make_users(self, count):
+        names = [f"{self.prefix.lower()}_inspector_{i:03d}" for i in range(count)]
+        existing = set(User.objects.filter(username__in=names).values_list("username", flat=True))
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in names if name not in existing])
+        return list(User.objects.filter(username__in=names).order_by("username"))
+
+    def make_customers(self, count, users):
+        customers, emails = [], []
+        for i in range(count):
+            customer = Customer(
+                id=self.uuid(), name=f"{self.prefix} Customer {i:04d}",
+                created_at=self.start, created_by=self.rng.choice(users) if users else None)
+            customers.append(customer)
+            for j in range(self.rng.randint(1, 3)):
+                emails.append(CustomerEmail(
+                    id=self.uuid(), customer=customer, contact_name=f"Buyer {j + 1}",
+                    email=f"buyer{j + 1}.{i}@{self.prefix.lower()}-customer.example",
+                    email_type="to" if j == 0 else "cc"))
+        with transaction.atomic(), explicit_timestamps(Customer._meta.get_field("created_at")):
+            Customer.objects.bulk_create(customers)
+            CustomerEmail.objects.bulk_create(emails)
+        return customers
+
+    def make_templates(self, count, max_poms, customers, users):
+        templates, poms, result = [], [], []
+        for i in range(count):
+            template = Template(
+                id=self.uuid(), name=f"{self.prefix} Template {i:04d}", description="Generated template",
+                created_at=self.start, customer=self.rng.choice(customers) if customers else None,
+                created_by=self.rng.choice(users) if users else None)
+            template_poms = []
+            names = self.rng.sample(POM_NAMES, min(len(POM_NAMES), self.rng.randint(max(1, max_poms // 2), max_poms)))
+            for order, name in enumerate(names):
+                std = self.rng.choice([None] + [round(self.rng.uniform(5, 80) * 4) / 4 for _ in range(9)])
+                template_poms.append(TemplatePOM(
+                    id=self.uuid(), template=template, name=name, order=order, default_std=std,
+                    default_tol=self.rng.choice([0.25, 0.5, 0.5, 0.75, 1.0])))
+            templates.append(template)
+            poms.extend(template_poms)
+            result.append((template, template_poms))
+        with transaction.atomic(), explicit_timestamps(Template._meta.get_field("created_at")):
+            Template.objects.bulk_create(templates)
+            TemplatePOM.objects.bulk_create(poms)
+        return result
+
+    def make_measurements(self, inspection, poms):
+        rows = []
+        for pom in poms:
+            samples, failed = [], False
+            for _ in range(6):
+                if pom.default_std is None or self.rng.random() < 0.15:
+                    samples.append(None)
+                    continue
+                value = round(self.rng.gauss(pom.default_std, pom.default_tol * 0.7) * 4) / 4
+                failed = failed or abs(value - pom.default_std) > pom.default_tol
+                samples.append(value)
+            rows.append(Measurement(
+                id=self.uuid(), inspection=inspection, pom_name=pom.name, tol=pom.default_tol,
+                std=pom.default_std, s1=samples[0], s2=samples[1], s3=samples[2],
+                s4=samples[3], s5=samples[4], s6=samples[5], status="FAIL" if failed else "OK"))
+        return rows
+
+    def make_inspection_batch(self, offset, size, users, customer_choice, templates_by_customer, avg_images):
+        inspections, measurements, images = [], [], []
+        for n in range(offset, offset + size):
+            customer = self.pick(customer_choice)
+            options = templates_by_customer.get(customer.pk) or templates_by_customer.get(None) or []
+            template, poms = self.rng.choice(options) if options else (None, [])
+            created_at = self.timestamp()
+            customer_decision = self.pick(self.customer_decisions)
+            inspection = Inspection(
+                id=self.uuid(),
+                style=f"{self.prefix}-{self.rng.randint(1000, 1000 + max(50, size // 4)):05d}",
+                color=self.rng.choice(COLORS),
+                po_number=f"PO-{self.rng.randint(100000, 999999)}",
+                stage=self.pick(self.stages),
+                template=template,
+                customer=customer,
+                decision=self.pick(self.decisions),
+                remarks=self.rng.choice(COMMENTS),
+                qa_fit_comments=self.rng.choice(COMMENTS),
+                qa_workmanship_comments=self.rng.choice(COMMENTS),
+                customer_decision=customer_decision,
+                customer_feedback_comments=self.rng.choice(COMMENTS) if customer_decision else "",
+                customer_feedback_date=(
+                    created_at + timedelta(hours=self.rng.randint(4, 24 * 21)) if customer_decision else None),
+                created_at=created_at,
+                created_by=self.rng.choice(users) if users else None,
+            )
+            inspections.append(inspection)
+            measurements.extend(self.make_measurements(inspection, poms))
+            for i in range(self.rng.randint(0, int(round(avg_images * 2)))):
+                image_id = self.uuid()
+                images.append(InspectionImage(
+                    id=image_id, inspection=inspection, caption=f"Image {i + 1}",
+                    image=f"inspection_images/{self.prefix.lower()}/{image_id.hex}.webp",
+                    uploaded_at=created_at + timedelta(minutes=i)))
+
+        with transaction.atomic(), explicit_timestamps(
+            Inspection._meta.get_field("created_at"), InspectionImage._meta.get_field("uploaded_at")
+        ):
+            Inspection.objects.bulk_create(inspections)
+            Measurement.objects.bulk_create(measurements, batch_size=5_000)
+            InspectionImage.objects.bulk_create(images, batch_size=5_000)
+        return {"inspections": len(inspections), "measurements": len(measurements), "images": len(images)}
+
+    def clear(self):
+        with transaction.atomic():
+            inspections = Inspection.objects.filter(style__startswith=f"{self.prefix}-")
+            # Delete children with plain DELETEs rather than loading millions of rows for cascades.
+            Measurement.objects.filter(inspection__in=inspections)._raw_delete(Measurement.objects.db)
+            InspectionImage.objects.filter(inspection__in=inspections)._raw_delete(InspectionImage.objects.db)
+            deleted = inspections._raw_delete(Inspection.objects.db)
+            Template.objects.filter(name__startswith=f"{self.prefix} Template ").delete()
+            Customer.objects.filter(name__startswith=f"{self.prefix} Customer ").delete()
+            User.objects.filter(username__startswith=f"{self.prefix.lower()}_inspector_").delete()
+        cache.invalidate(*GENERATED_MODELS)
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted:,} generated inspections and their data"))
@@ -0,0 +1,53 @@
+# qc/management/commands/import_feedback.py
+"""
+Apply customer feedback from a spreadsheet to the matching inspections.
+
+    python manage.py import_feedback --file approvals.csv --dry-run
+    python manage.py import_feedback --sheet 1AbC...xyz --worksheet "Approvals"
+    python manage.py import_feedback --sheet https://docs.google.com/spreadsheets/d/... --credentials sa.json
+
+Rows are matched on (po_number, style, color, stage); see qc/feedback_import.py
+for the accepted columns. Google Sheets need a service account that can read
+the sheet (--credentials, QC_GSPREAD_CREDENTIALS, or gspread's default
+location). Each page of rows is its own transaction.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from qc.feedback_import import PAGE_SIZE, import_feedback, read_file, read_sheet
+
+
+class Command(BaseCommand):
+    help = "Import customer decisions/comments from a Google Sheet or a local CSV/TSV file."
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--file", help="local CSV or TSV file")
+        source.add_argument("--sheet", help="Google Sheet key or URL")
+        parser.add_argument("--worksheet", help="worksheet title (default: the first)")
+        parser.add_argument("--credentials", help="service account JSON for Google Sheets")
+        parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="rows per lookup and bulk_update")
+        parser.add_argument("--dry-run", action="store_true", help="match and report without saving")
+        parser.add_argument("--show", type=int, default=20, help="list at most N problem rows of each kind")
+
+    def handle(self, *args, **opts):
+        if opts["file"]:
+            rows = read_file(opts["file"])
+        else:
+            rows = read_sheet(opts["sheet"], opts["worksheet"], opts["credentials"], max(1, opts["page_size"]))
+        try:
+            report = import_feedback(rows, dry_run=opts["dry_run"], page_size=max(1, opts["page_size"]))
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        show = opts["show"]
+        for number, key in report.unmatched[:show]:
+            self.stdout.write(f"  row {number}: no inspection for {' / '.join(key)}")
+        for number, key, count in report.ambiguous[:show]:
+            self.stdout.write(f"  row {number}: {count} inspections match {' / '.join(key)}")
+        for number, reason in report.invalid[:show]:
+            self.stdout.write(f"  row {number}: {reason}")
+        verb = "Would update" if opts["dry_run"] else "Updated"
+        self.stdout.write(
+            f"{report.rows} rows: {report.matched} matched, {len(report.unmatched)} unmatched, "
+            f"{len(report.ambiguous)} ambiguous, {len(report.invalid)} invalid.")
+        self.stdout.write(self.style.SUCCESS(f"{verb} {report.updated} inspections."))
@@ -0,0 +1,93 @@
+# qc/management/commands/slow_query_report.py
+"""
+Summarise the slow-query log written by qc/slowlog.py.
+
+    python manage.py slow_query_report                    # top 20 by total time
+    python manage.py slow_query_report --since 24 --sort max --top 5
+    python manage.py slow_query_report --json > slow.json
+
+Entries are grouped by fingerprint, so one query shape with different
+filter values shows up once, with its count, total/mean/p95/max time, the
+routes that issued it and its most recent EXPLAIN plan.
+"""
+import json
+import math
+import time
+
+from django.core.management.base import BaseCommand
+
+from qc.slowlog import SLOW_QUERY_LOG, normalise, read_entries
+
+SORT_KEYS = ("total_ms", "max_ms", "count", "mean_ms")
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]
+
+
+def aggregate(entries):
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry["fingerprint"], {
+            "fingerprint": entry["fingerprint"], "query": normalise(entry["sql"]), "timings": [],
+            "routes": {}, "plan": None, "last_seen": 0,
+        })
+        group["timings"].append(entry["ms"])
+        route = f"{entry['route']}:{entry['action']}" if entry.get("action") else entry["route"]
+        group["routes"][route] = group["routes"].get(route, 0) + 1
+        group["last_seen"] = max(group["last_seen"], entry["ts"])
+        if entry.get("plan"):
+            group["plan"] = entry["plan"]
+
+    report = []
+    for group in groups.values():
+        timings = group.pop("timings")
+        group.update(
+            count=len(timings), total_ms=round(sum(timings), 1), mean_ms=round(sum(timings) / len(timings), 1),
+            p95_ms=round(p95(timings), 1), max_ms=round(max(timings), 1),
+        )
+        report.append(group)
+    return report
+
+
+class Command(BaseCommand):
+    help = "Top slow queries from the slow-query log, grouped by fingerprint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=SLOW_QUERY_LOG, help="Log file (default QC_SLOW_QUERY_LOG)")
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--since", type=float, help="Only entries from the last N hours")
+        parser.add_argument("--sort", choices=SORT_KEYS, default="total_ms")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+        parser.add_argument("--no-plans", action="store_true", help="Omit EXPLAIN plans")
+
+    def handle(self, *args, **options):
+        since = time.time() - options["since"] * 3600 if options["since"] else None
+        report = aggregate(read_entries(options["log"], since))
+        report.sort(key=lambda g: g[options["sort"]], reverse=True)
+        report = report[:options["top"]]
+        if options["no_plans"]:
+            for group in report:
+                group.pop("plan")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if not report:
+            self.stdout.write(f"No slow queries recorded in {options['log']}.")
+            return
+
+        for rank, group in enumerate(report, 1):
+            routes = ", ".join(f"{r} ({n})" for r, n in sorted(group["routes"].items(), key=lambda i: -i[1]))
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"#{rank} {group['fingerprint']}  total {group['total_ms']}ms  count {group['count']}  "
+                f"mean {group['mean_ms']}ms  p95 {group['p95_ms']}ms  max {group['max_ms']}ms"
+            ))
+            self.stdout.write(f"  routes: {routes}")
+            self.stdout.write(f"  query:  {group['query'][:500]}")
+            if group.get("plan"):
+                self.stdout.write("  plan:")
+                for line in group["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write("")
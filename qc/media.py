@@ -0,0 +1,331 @@
+# qc/media.py
+"""
+Content-addressed, sharded storage for inspection images.
+
+ContentAddressedStorage wraps the configured default storage (local
+MEDIA_ROOT in development, GoogleCloudStorage in config/settings_production.py)
+and names every saved file after the SHA-256 of its bytes, sharded into two
+levels of prefixes:
+
+    inspection_images/3f/a2/3fa2c1...e9.webp
+
+so no directory or GCS prefix grows past a few hundred entries, and an
+identical photo uploaded to several inspections is stored once. MediaBlob
+counts the references to each file: qc/signals.py increments it when an
+InspectionImage is created and decrements it when one is deleted. Archived
+inspections (qc/archive.py) keep their images' references. Files whose
+count drops to zero are removed by ``manage.py gc_media``, never inline,
+so a concurrent upload of the same bytes can't lose its file.
+
+The collector streams the storage listing and the database references, both
+in byte order, and merge-joins them, so memory stays flat however large the
+bucket is. Orphans younger than the grace period are kept (an upload saves
+its file before its row commits), and each batch is re-checked against the
+database right before it is deleted. A deduplicated upload doesn't rewrite
+the file, so it stamps ``MediaBlob.reused_at`` instead, and files reused
+within the grace period are kept as well.
+
+    python manage.py gc_media --dry-run
+    python manage.py gc_media --grace-hours 48 --workers 16
+"""
+import hashlib
+import heapq
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.core.files.base import File
+from django.core.files.storage import Storage, default_storage
+from django.db import connection
+from django.db.models import F
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+CHUNK_SIZE = 1024 * 1024
+MEDIA_PREFIX = "inspection_images"
+# Collations that compare strings byte by byte, like Python and GCS listings do.
+BINARY_COLLATIONS = {"postgresql": "C", "mysql": "utf8mb4_bin"}
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def sharded_name(prefix, digest, extension):
+    return posixpath.join(prefix, digest[:2], digest[2:4], f"{digest}{extension.lower()}")
+
+
+class ContentAddressedStorage(Storage):
+    """Delegates everything to ``base`` but saves files under their content hash."""
+
+    def __init__(self, base=None):
+        self._base = base
+
+    @property
+    def base(self):
+        return self._base or default_storage
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        prefix, filename = posixpath.split(name.replace("\\", "/"))
+        target = sharded_name(prefix, content_hash(content), posixpath.splitext(filename)[1])
+        if self.base.exists(target):
+            # Same bytes already stored: deduplicated. The file may be an old
+            # orphan, so keep gc_media off it until our row commits.
+            mark_reused(target)
+            return target
+        return self.base.save(target, content, max_length=max_length)
+
+    def generate_filename(self, filename):
+        return self.base.generate_filename(filename)
+
+    def _open(self, name, mode="rb"):
+        return self.base.open(name, mode)
+
+    def delete(self, name):
+        return self.base.delete(name)
+
+    def exists(self, name):
+        return self.base.exists(name)
+
+    def listdir(self, path):
+        return self.base.listdir(path)
+
+    def size(self, name):
+        return self.base.size(name)
+
+    def url(self, name):
+        return self.base.url(name)
+
+    def path(self, name):
+        return self.base.path(name)
+
+    def get_modified_time(self, name):
+        return self.base.get_modified_time(name)
+
+    def get_created_time(self, name):
+        return self.base.get_created_time(name)
+
+    def get_accessed_time(self, name):
+        return self.base.get_accessed_time(name)
+
+    def __getattr__(self, attr):
+        # Backend-specific extras (bucket, client, location, ...).
+        return getattr(self.base, attr)
+
+
+_storage = ContentAddressedStorage()
+
+
+def image_storage():
+    """Storage for InspectionImage.image (a callable, so migrations don't freeze the backend)."""
+    return _storage
+
+
+def add_reference(name):
+    from .models import MediaBlob
+
+    if name:
+        # Two statements, no read: create-if-missing, then a race-free increment.
+        MediaBlob.objects.bulk_create([MediaBlob(name=name)], ignore_conflicts=True)
+        MediaBlob.objects.filter(name=name).update(refcount=F("refcount") + 1)
+
+
+def mark_reused(name):
+    from .models import MediaBlob
+
+    now = timezone.now()
+    MediaBlob.objects.bulk_create([MediaBlob(name=name, reused_at=now)], ignore_conflicts=True)
+    MediaBlob.objects.filter(name=name).update(reused_at=now)
+
+
+def drop_reference(name):
+    from .models import MediaBlob
+
+    if name:
+        MediaBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F("refcount") - 1)
+
+
+# --- garbage collection ---------------------------------------------------------
+
+def _listdir_sorted(storage, path):
+    """Walk ``path`` depth-first in full-path byte order (a directory sorts as ``name/``)."""
+    dirs, files = storage.listdir(path)
+    entries = [(name + "/", True) for name in dirs] + [(name, False) for name in files]
+    for name, is_dir in sorted(entries):
+        if is_dir:
+            yield from _listdir_sorted(storage, posixpath.join(path, name[:-1]))
+        else:
+            yield posixpath.join(path, name), None, None
+
+
+def iter_stored(prefix=MEDIA_PREFIX, storage=None):
+    """Yield ``(name, size, modified)`` for every file under ``prefix``, sorted by name.
+
+    Google Cloud Storage lists a whole prefix in sorted pages with sizes and
+    timestamps; other backends are walked with ``listdir`` and report
+    ``None`` for size and time, which the collector looks up for orphans only.
+    """
+    storage = storage or _storage.base
+    bucket = getattr(storage, "bucket", None)
+    if bucket is None:
+        if storage.exists(prefix):
+            yield from _listdir_sorted(storage, prefix)
+        return
+    location = (getattr(storage, "location", "") or "").strip("/")
+    root = f"{location}/" if location else ""
+    for blob in bucket.list_blobs(prefix=f"{root}{prefix}/"):
+        yield blob.name[len(root):], blob.size, blob.updated
+
+
+def _binary_order(queryset, field_name):
+    collation = BINARY_COLLATIONS.get(connection.vendor)
+    if collation is None:
+        # SQLite compares TEXT byte by byte already.
+        return queryset.order_by(field_name)
+    return queryset.order_by(Collate(field_name, collation))
+
+
+def iter_referenced(prefix=MEDIA_PREFIX, chunk_size=2000):
+    """Every stored name the database still points at, sorted and de-duplicated."""
+    from .models import InspectionImage, MediaBlob
+
+    images = _binary_order(
+        InspectionImage.objects.filter(image__startswith=f"{prefix}/").values_list("image", flat=True), "image")
+    blobs = _binary_order(
+        MediaBlob.objects.filter(name__startswith=f"{prefix}/", refcount__gt=0).values_list("name", flat=True),
+        "name")
+    previous = None
+    for name in heapq.merge(images.iterator(chunk_size), blobs.iterator(chunk_size)):
+        if name != previous:
+            yield name
+        previous = name
+
+
+def _ascending(names, label):
+    # A merge-join over an unsorted stream would delete live files.
+    previous = None
+    for item in names:
+        name = item[0] if isinstance(item, tuple) else item
+        if previous is not None and name < previous:
+            raise ValueError(f"{label} is not sorted: {name!r} after {previous!r}")
+        previous = name
+        yield item
+
+
+def find_orphans(stored, referenced):
+    """Merge-join two sorted streams; yields the ``stored`` entries with no reference."""
+    referenced = iter(referenced)
+    current = next(referenced, None)
+    for entry in stored:
+        name = entry[0]
+        while current is not None and current < name:
+            current = next(referenced, None)
+        if current != name:
+            yield entry
+
+
+@dataclass
+class CollectionReport:
+    scanned: int = 0
+    orphans: int = 0
+    kept_recent: int = 0
+    kept_referenced: int = 0
+    deleted: int = 0
+    failed: list = field(default_factory=list)
+    bytes_reclaimed: int = 0
+
+
+def _still_referenced(names):
+    from .models import InspectionImage, MediaBlob
+
+    return set(InspectionImage.objects.filter(image__in=names).values_list("image", flat=True)) | set(
+        MediaBlob.objects.filter(name__in=names, refcount__gt=0).values_list("name", flat=True))
+
+
+def _recently_reused(names, cutoff):
+    from .models import MediaBlob
+
+    return set(MediaBlob.objects.filter(name__in=names, reused_at__gt=cutoff).values_list("name", flat=True))
+
+
+def _stat(storage, entry):
+    name, size, modified = entry
+    try:
+        if size is None:
+            size = storage.size(name)
+        if modified is None:
+            modified = storage.get_modified_time(name)
+    except (OSError, NotImplementedError):
+        pass
+    return name, size or 0, modified
+
+
+def collect_garbage(grace=timedelta(hours=24), dry_run=False, batch_size=500, workers=8,
+                    prefix=MEDIA_PREFIX, storage=None, log=None):
+    """Delete stored image files no row references; returns a CollectionReport."""
+    from .models import MediaBlob
+
+    storage = storage or _storage.base
+    report = CollectionReport()
+    cutoff = timezone.now() - grace
+
+    def counted(entries):
+        for entry in entries:
+            report.scanned += 1
+            yield entry
+
+    def delete(entry):
+        try:
+            storage.delete(entry[0])
+            return entry, None
+        except Exception as exc:  # keep going; the next run retries
+            return entry, exc
+
+    def flush(batch):
+        names = [name for name, _, _ in batch]
+        live = _still_referenced(names)
+        reused = _recently_reused(names, cutoff) - live
+        batch = [entry for entry in batch if entry[0] not in live and entry[0] not in reused]
+        report.kept_referenced += len(live)
+        report.kept_recent += len(reused)
+        if dry_run:
+            report.deleted += len(batch)
+            report.bytes_reclaimed += sum(size for _, size, _ in batch)
+            return
+        gone = []
+        for (name, size, _), error in pool.map(delete, batch):
+            if error is None:
+                gone.append(name)
+                report.deleted += 1
+                report.bytes_reclaimed += size
+            else:
+                report.failed.append((name, str(error)))
+        MediaBlob.objects.filter(name__in=gone, refcount=0).delete()
+        if log:
+            log(f"deleted {len(gone)} files ({report.bytes_reclaimed} bytes so far)")
+
+    stored = _ascending(counted(iter_stored(prefix, storage)), "storage listing")
+    referenced = _ascending(iter_referenced(prefix), "database references")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        batch = []
+        for entry in find_orphans(stored, referenced):
+            report.orphans += 1
+            entry = _stat(storage, entry)
+            if entry[2] is not None and entry[2] > cutoff:
+                report.kept_recent += 1
+                continue
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    return report
@@ -0,0 +1,327 @@
+# qc/metrics.py
+"""
+Prometheus-compatible metrics without extra dependencies.
+
+MetricsMiddleware times every request per route/action and counts its SQL
+queries; the PDF, image and email paths record counters and per-stage
+timings. ``metrics_view`` serves everything at /metrics in the Prometheus
+text format.
+
+Gunicorn runs several worker processes, each with its own counters. When
+QC_METRICS_DIR is set, every process periodically writes its totals to
+``<dir>/qc-<pid>.json`` and /metrics sums all the files, so a scrape sees
+the whole instance whichever worker answers it. Wipe the directory when the
+container starts; without it, /metrics only reports the answering process.
+"""
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+METRICS_DIR = getattr(settings, "QC_METRICS_DIR", None)
+METRICS_TOKEN = getattr(settings, "QC_METRICS_TOKEN", None)
+FLUSH_INTERVAL = getattr(settings, "QC_METRICS_FLUSH_INTERVAL", 5.0)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        with self.lock:
+            return {name: metric.dump() for name, metric in self.metrics.items()}
+
+    # --- multi-process support ---------------------------------------------
+
+    def _path(self, pid=None):
+        return os.path.join(METRICS_DIR, f"qc-{pid or os.getpid()}.json")
+
+    def flush(self):
+        if not METRICS_DIR:
+            return
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=METRICS_DIR, prefix=".qc-", suffix=".tmp")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp, self._path())  # atomic: readers never see a partial file
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if METRICS_DIR and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def collect(self):
+        """This process's live values plus every other process's last flush."""
+        merged = self.snapshot()
+        if not METRICS_DIR:
+            return merged
+        own = self._path()
+        for path in glob.glob(os.path.join(METRICS_DIR, "qc-*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path) as fh:
+                    other = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            for name, dumped in other.items():
+                if name in merged:
+                    self.metrics[name].merge_into(merged[name], dumped)
+        return merged
+
+    def render(self):
+        lines = []
+        for name, dumped in sorted(self.collect().items()):
+            lines.extend(self.metrics[name].render(dumped))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, json.loads(key))) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return json.dumps([str(labels[n]) for n in self.labelnames])
+
+    def dump(self):
+        # Called under the registry lock; copy so callers can merge freely.
+        return {key: list(value) if isinstance(value, list) else value for key, value in self.values.items()}
+
+    def header(self, name=None):
+        name = name or self.name
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.type}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge_into(self, target, other):
+        for key, value in other.items():
+            target[key] = target.get(key, 0) + value
+
+    def render(self, dumped):
+        name = f"{self.name}_total"
+        if not dumped and not self.labelnames:
+            dumped = {"[]": 0}
+        return self.header(name) + [
+            f"{name}{_format_labels(self.labelnames, key)} {value}" for key, value in sorted(dumped.items())
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with registry.lock:
+            # [per-bucket counts..., +Inf count, sum]
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def merge_into(self, target, other):
+        for key, state in other.items():
+            if key not in target:
+                target[key] = list(state)
+            else:
+                target[key] = [a + b for a, b in zip(target[key], state)]
+
+    def render(self, dumped):
+        lines = self.header()
+        for key, state in sorted(dumped.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {state[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    """Record consecutive stages of one operation: ``t.mark("header")`` times since the previous mark."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.histogram.observe(now - self.last, stage=stage)
+        self.last = now
+
+
+# --- QC metrics ------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter("qc_http_requests", "HTTP requests served.", ("route", "action", "method", "status"))
+HTTP_LATENCY = Histogram("qc_http_request_duration_seconds", "Request latency.", ("route", "action", "method"))
+DB_QUERIES = Histogram("qc_db_queries_per_request", "SQL queries per request.", ("route", "action"),
+                       buckets=QUERY_BUCKETS)
+
+PDFS_RENDERED = Counter("qc_pdfs_rendered", "Inspection PDF reports rendered.")
+PDF_STAGE_SECONDS = Histogram("qc_pdf_stage_seconds", "Time per stage of generate_pdf_buffer.", ("stage",))
+EMAILS_SENT = Counter("qc_emails_sent", "Inspection report emails by outcome.", ("result",))
+EMAIL_STAGE_SECONDS = Histogram("qc_email_stage_seconds", "Time per stage of send_email.", ("stage",))
+IMAGES_PROCESSED = Counter("qc_images_processed", "Uploaded images processed by outcome.", ("result",))
+IMAGE_STAGE_SECONDS = Histogram("qc_image_stage_seconds", "Time per stage of upload_image.", ("stage",))
+THROTTLED = Counter("qc_throttled_requests", "Requests refused by the token-bucket throttle.", ("action",))
+
+
+def route_labels(request):
+    """(route, action) for a request: URL name plus the DRF viewset action, if any."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched", ""
+    actions = getattr(match.func, "actions", None) or {}
+    return match.url_name or match.route or "unnamed", actions.get(request.method.lower(), "")
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """Install ``wrapper`` as an execute_wrapper on this thread's database connections."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+@asynccontextmanager
+async def awrap_queries(wrapper):
+    """
+    wrap_queries() for async requests. Connections are per thread, and an ASGI
+    request runs its ORM calls and sync views on one thread-sensitive worker
+    thread, so the wrapper is installed (and removed) there.
+    """
+    context = wrap_queries(wrapper)
+    await sync_to_async(context.__enter__)()
+    try:
+        yield
+    finally:
+        await sync_to_async(context.__exit__)(None, None, None)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        response = None
+        try:
+            with wrap_queries(counter):
+                response = self.get_response(request)
+        finally:
+            self.record(request, response, counter, started)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        response = None
+        try:
+            async with awrap_queries(counter):
+                response = await self.get_response(request)
+        finally:
+            self.record(request, response, counter, started)
+        return response
+
+    def record(self, request, response, counter, started):
+        elapsed = time.perf_counter() - started
+        route, action = route_labels(request)
+        if route != "metrics":
+            status = response.status_code if response is not None else 500
+            HTTP_LATENCY.observe(elapsed, route=route, action=action, method=request.method)
+            HTTP_REQUESTS.inc(route=route, action=action, method=request.method, status=status)
+            DB_QUERIES.observe(counter.count, route=route, action=action)
+        registry.maybe_flush()
+
+
+def metrics_view(request):
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
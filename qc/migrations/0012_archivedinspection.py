@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0011_alter_inspection_customer_feedback_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInspection',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('style', models.CharField(db_index=True, max_length=255)),
+                ('color', models.CharField(blank=True, max_length=255)),
+                ('po_number', models.CharField(blank=True, max_length=255)),
+                ('stage', models.CharField(choices=[('Dev', 'Dev'), ('Proto', 'Proto'), ('Fit', 'Fit'), ('SMS', 'SMS'), ('Size Set', 'Size Set'), ('PPS', 'PPS'), ('Shipment Sample', 'Shipment Sample')], max_length=20)),
+                ('remarks', models.TextField(blank=True)),
+                ('customer_decision', models.CharField(blank=True, choices=[('Accepted', 'Accepted'), ('Rejected', 'Rejected'), ('Revision Requested', 'Revision Requested'), ('Accepted with Comments', 'Accepted with Comments'), ('Held Internally', 'Held Internally')], max_length=50, null=True)),
+                ('customer_feedback_comments', models.TextField(blank=True)),
+                ('customer_feedback_date', models.DateTimeField(blank=True, null=True)),
+                ('decision', models.CharField(blank=True, choices=[('Accepted', 'Accepted'), ('Rejected', 'Rejected'), ('Represent', 'Represent')], max_length=20, null=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('customer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='qc.customer')),
+                ('template', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='qc.template')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:19
+
+import json
+import zlib
+from collections import Counter
+
+import qc.media
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    """Existing files keep their names; give each one its reference count."""
+    InspectionImage = apps.get_model("qc", "InspectionImage")
+    ArchivedInspection = apps.get_model("qc", "ArchivedInspection")
+    MediaBlob = apps.get_model("qc", "MediaBlob")
+    counts = Counter(InspectionImage.objects.exclude(image="").values_list("image", flat=True).iterator())
+    for payload in ArchivedInspection.objects.values_list("payload", flat=True).iterator():
+        document = json.loads(zlib.decompress(bytes(payload)))
+        counts.update(row["image"] for row in document["images"] if row.get("image"))
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=name, refcount=count) for name, count in counts.items()], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0012_archivedinspection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='inspectionimage',
+            name='image',
+            field=models.ImageField(storage=qc.media.image_storage, upload_to='inspection_images/'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
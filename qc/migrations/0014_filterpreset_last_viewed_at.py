@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0013_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filterpreset',
+            name='last_viewed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='inspection',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0014_filterpreset_last_viewed_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['po_number', 'style', 'color', 'stage'], name='qc_inspection_match_idx'),
+        ),
+    ]
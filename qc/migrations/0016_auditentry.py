@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:30
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0015_inspection_match_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('inspection_id', models.UUIDField()),
+                ('user_id', models.IntegerField(blank=True, null=True)),
+                ('action', models.CharField(max_length=20)),
+                ('changes', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['inspection_id', '-id'], name='qc_audit_inspection_idx')],
+            },
+        ),
+    ]
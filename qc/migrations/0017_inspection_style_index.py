@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0016_auditentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['style', 'color'], name='qc_inspection_style_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc', '0018_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='reused_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
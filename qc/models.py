@@ -2,6 +2,10 @@
 import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .media import image_storage
 
 User = get_user_model()
 
@@ -9,6 +13,7 @@ class Customer(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # also touched by email changes (qc/signals.py)
     created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
 
     def __str__(self):
@@ -36,6 +41,7 @@ class Template(models.Model):
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
     customer = models.ForeignKey(Customer, null=True, blank=True, on_delete=models.SET_NULL, related_name="templates")
 
@@ -101,9 +107,18 @@ class Inspection(models.Model):
     customer_feedback_date = models.DateTimeField(null=True, blank=True)
     
     decision = models.CharField(max_length=20, choices=DECISION_CHOICES, null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)  # also touched by image changes (qc/signals.py)
     created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
 
+    class Meta:
+        indexes = [
+            # Feedback imports match spreadsheet rows on this key (qc/feedback_import.py)
+            models.Index(fields=["po_number", "style", "color", "stage"], name="qc_inspection_match_idx"),
+            # Style lifecycle timeline (qc/timeline.py)
+            models.Index(fields=["style", "color"], name="qc_inspection_style_idx"),
+        ]
+
     def __str__(self):
         return f"{self.style} - {self.color} ({self.created_at.date()})"
 
@@ -132,7 +147,7 @@ class InspectionImage(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     inspection = models.ForeignKey(Inspection, related_name="images", on_delete=models.CASCADE)
     caption = models.CharField(max_length=100, default="Inspection Image")
-    image = models.ImageField(upload_to="inspection_images/")
+    image = models.ImageField(upload_to="inspection_images/", storage=image_storage)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -146,10 +161,83 @@ class FilterPreset(models.Model):
     filters = models.JSONField(default=dict)  # Store filter parameters as JSON
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    last_viewed_at = models.DateTimeField(null=True, blank=True)  # set by the execute endpoint
 
     class Meta:
         ordering = ["-created_at"]
         unique_together = [["user", "name"]]  # Prevent duplicate names per user
 
     def __str__(self):
-        return f"{self.user.username} - {self.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.name}"
+
+class ArchivedInspection(models.Model):
+    """
+    Cold storage for old inspections (see qc/archive.py).
+
+    The columns the list, filters and search use are kept as real, indexed
+    columns under the same names as on Inspection; everything else (all
+    comments, measurements, image rows) lives in ``payload``, a
+    zlib-compressed JSON document that restore_inspections() turns back into
+    rows.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    style = models.CharField(max_length=255, db_index=True)
+    color = models.CharField(max_length=255, blank=True)
+    po_number = models.CharField(max_length=255, blank=True)
+    stage = models.CharField(max_length=20, choices=Inspection.STAGE_CHOICES)
+    template = models.ForeignKey(Template, null=True, on_delete=models.SET_NULL, related_name="+")
+    customer = models.ForeignKey(Customer, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    remarks = models.TextField(blank=True)
+    customer_decision = models.CharField(
+        max_length=50, choices=Inspection.CUSTOMER_DECISION_CHOICES, null=True, blank=True)
+    customer_feedback_comments = models.TextField(blank=True)
+    customer_feedback_date = models.DateTimeField(null=True, blank=True)
+    decision = models.CharField(max_length=20, choices=Inspection.DECISION_CHOICES, null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.style} - {self.color} ({self.created_at.date()}) [archived]"
+
+class MediaBlob(models.Model):
+    """
+    Reference count for a content-addressed image file (see qc/media.py).
+
+    ``name`` is the storage path, which embeds the file's SHA-256; one row
+    exists per distinct file however many InspectionImage rows share it.
+    ``reused_at`` is stamped whenever an upload is deduplicated onto the
+    file, so the collector leaves it alone until that row can commit.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    reused_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+class AuditEntry(models.Model):
+    """
+    Field-level diff of one write to an inspection (see qc/audit.py).
+
+    ``inspection_id`` and ``user_id`` are plain columns, not foreign keys, so
+    history outlives deleted or archived inspections and costs no joins or
+    cascades.
+    """
+    id = models.BigAutoField(primary_key=True)
+    inspection_id = models.UUIDField()
+    user_id = models.IntegerField(null=True, blank=True)
+    action = models.CharField(max_length=20)  # "update", "bulk_update", "import"
+    changes = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["inspection_id", "-id"], name="qc_audit_inspection_idx")]
+
+    def __str__(self):
+        return f"{self.inspection_id} {self.action} ({self.created_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,269 @@
+# qc/profiling.py
+"""
+On-demand profiling of a single request, for "it's only slow for this customer".
+
+A staff user adds ``X-QC-Profile: 1`` (or ``?_profile=1``) to a request and
+ProfilingMiddleware runs it under cProfile plus a stack sampler, recording
+every SQL statement with its duration. The result is stored as
+
+    <id>.prof       pstats dump (snakeviz, ``python -m pstats``)
+    <id>.collapsed  collapsed stacks for flamegraph.pl / speedscope
+    <id>.json       request, timings and captured SQL
+
+in QC_PROFILE_DIR, and listed/downloaded through the admin-only /profiles/
+endpoints. ``X-QC-Profile: sample`` skips cProfile and only samples, which
+keeps overhead to a few percent. Off unless QC_PROFILE_ENABLED is set.
+
+Profiles stay on the instance that served the request. QC_PROFILE_DIR
+defaults to the container's temp dir, so behind a load balancer (Cloud Run,
+several containers) /profiles/ answered by another instance lists nothing
+and the files vanish with the instance. Set QC_PROFILE_DIR to storage every
+instance mounts (a Cloud Storage or NFS volume) when running more than one.
+
+Limits: one profiled request at a time per process, one per user every
+QC_PROFILE_COOLDOWN seconds, at most QC_PROFILE_MAX_QUERIES captured
+statements, and profiles older than QC_PROFILE_RETENTION_HOURS or beyond
+the newest QC_PROFILE_MAX_FILES are pruned on every save. Requests without
+the flag pay for one header lookup.
+
+Profiling hooks one thread. Under ASGI a flagged request is handed to the
+request's worker thread, where sync views and ORM calls run too; an async
+view's own coroutine code runs on the event loop and only shows up as
+waiting. Unflagged requests stay fully async.
+"""
+import cProfile
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import CachedJWTAuthentication
+from .cache import get_cache
+from .metrics import wrap_queries
+
+PROFILE_DIR = getattr(settings, "QC_PROFILE_DIR", None) or os.path.join(tempfile.gettempdir(), "qc-profiles")
+PROFILE_ENABLED = getattr(settings, "QC_PROFILE_ENABLED", False)
+COOLDOWN = getattr(settings, "QC_PROFILE_COOLDOWN", 10)
+MAX_QUERIES = getattr(settings, "QC_PROFILE_MAX_QUERIES", 500)
+MAX_FILES = getattr(settings, "QC_PROFILE_MAX_FILES", 50)
+RETENTION_HOURS = getattr(settings, "QC_PROFILE_RETENTION_HOURS", 24)
+SAMPLE_INTERVAL = getattr(settings, "QC_PROFILE_SAMPLE_INTERVAL", 0.005)
+MAX_SAMPLES = 20000
+
+HEADER = "X-QC-Profile"
+QUERY_FLAG = "_profile"
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+ARTIFACTS = {"prof": "application/octet-stream", "collapsed": "text/plain", "json": "application/json"}
+
+_busy = threading.Lock()
+
+
+class QueryRecorder:
+    """execute_wrapper that keeps each statement with its duration."""
+
+    def __init__(self):
+        self.queries = []
+        self.dropped = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({
+                    "sql": sql,
+                    "ms": round((time.perf_counter() - started) * 1000, 3),
+                    "many": many,
+                    "db": context["connection"].alias,
+                })
+            else:
+                self.dropped += 1
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="qc-profile-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval) and self.samples < MAX_SAMPLES:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def requested_mode(request):
+    value = request.headers.get(HEADER) or request.GET.get(QUERY_FLAG)
+    if not value or value in ("0", "false"):
+        return None
+    return "sample" if value == "sample" else "full"
+
+
+def _request_user(request):
+    """The session user, or the JWT user DRF would authenticate later."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+def profile_path(profile_id, kind):
+    if not PROFILE_ID_RE.match(profile_id) or kind not in ARTIFACTS:
+        raise ValueError("invalid profile id")
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{kind}")
+
+
+def list_profiles():
+    """Metadata of stored profiles, newest first (without the captured SQL)."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as fh:
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        meta.pop("queries", None)
+        profiles.append(meta)
+    return sorted(profiles, key=lambda m: m["created"], reverse=True)
+
+
+def load_profile(profile_id):
+    with open(profile_path(profile_id, "json")) as fh:
+        return json.load(fh)
+
+
+def prune():
+    """Enforce QC_PROFILE_RETENTION_HOURS and QC_PROFILE_MAX_FILES."""
+    cutoff = time.time() - RETENTION_HOURS * 3600
+    profiles = list_profiles()
+    for index, meta in enumerate(profiles):
+        if index >= MAX_FILES or meta["created"] < cutoff:
+            for kind in ARTIFACTS:
+                try:
+                    os.remove(profile_path(meta["id"], kind))
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        mode = requested_mode(request) if PROFILE_ENABLED else None
+        if mode is None:
+            return self.get_response(request)
+        return self.maybe_profile(request, mode, self.get_response)
+
+    async def __acall__(self, request):
+        mode = requested_mode(request) if PROFILE_ENABLED else None
+        if mode is None:
+            return await self.get_response(request)
+        # The user lookup may query, and the profilers follow a single thread.
+        return await sync_to_async(self.maybe_profile)(request, mode, async_to_sync(self.get_response))
+
+    def maybe_profile(self, request, mode, get_response):
+        user = _request_user(request)
+        if user is None or not user.is_staff:
+            return get_response(request)
+        # Per-user cooldown (shared through the cache) and one profile per process.
+        if not get_cache().add(f"qc:profile:cooldown:{user.pk}", 1, COOLDOWN) or not _busy.acquire(blocking=False):
+            response = get_response(request)
+            response["X-QC-Profile"] = "skipped"
+            return response
+        try:
+            return self.profile(request, user, mode, get_response)
+        finally:
+            _busy.release()
+
+    def profile(self, request, user, mode, get_response):
+        recorder = QueryRecorder()
+        sampler = StackSampler(threading.get_ident())
+        profiler = cProfile.Profile() if mode == "full" else None
+
+        with wrap_queries(recorder):
+            sampler.start()
+            try:
+                started = time.perf_counter()
+                if profiler is not None:
+                    response = profiler.runcall(get_response, request)
+                else:
+                    response = get_response(request)
+                elapsed = time.perf_counter() - started
+            finally:
+                sampler.stop()
+
+        profile_id = uuid.uuid4().hex
+        meta = {
+            "id": profile_id,
+            "created": time.time(),
+            "mode": mode,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "user": user.get_username(),
+            "status": response.status_code,
+            "ms": round(elapsed * 1000, 1),
+            "samples": sampler.samples,
+            "query_count": len(recorder.queries) + recorder.dropped,
+            "query_ms": round(sum(q["ms"] for q in recorder.queries), 1),
+            "queries_dropped": recorder.dropped,
+            "queries": recorder.queries,
+        }
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if profiler is not None:
+            profiler.dump_stats(profile_path(profile_id, "prof"))
+        with open(profile_path(profile_id, "collapsed"), "w") as fh:
+            fh.write(sampler.collapsed())
+        with open(profile_path(profile_id, "json"), "w") as fh:
+            json.dump(meta, fh)
+        prune()
+
+        response["X-QC-Profile"] = profile_id
+        return response
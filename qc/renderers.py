@@ -0,0 +1,62 @@
+# qc/renderers.py
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+orjson encodes large lists several times faster than the stdlib encoder DRF
+uses. Output matches JSONRenderer's: compact, UTF-8, U+2028/U+2029 escaped,
+and datetimes/Decimals/lazy strings go through DRF's own encoder. Floats are
+where they differ:
+
+- orjson writes the shortest exponent form (``1e16``, ``1e-7``) where the
+  stdlib writes ``1e+16`` and ``1e-07``; both parse to the same value.
+- NaN and infinities are written as ``null``; JSONRenderer (STRICT_JSON)
+  raises ValueError instead.
+
+Without orjson, or when a client asks for indented output, both classes fall
+back to DRF's implementation.
+"""
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder copes.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping JSONRenderer applies for JavaScript embedding.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
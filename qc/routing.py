@@ -0,0 +1,198 @@
+# qc/routing.py
+"""
+Read-replica routing for heavy read-only traffic.
+
+When DATABASES has a ``replica`` alias (QC_DB_REPLICA_ALIAS), views that opt
+in with ReplicaReadMixin serve their safe-method actions (lists, retrieves,
+the dashboard, PDF exports, facets, history) from it; everything else,
+including every write, stays on ``default``. Routing is opt-in per view
+rather than "all reads", so a write request never reads its own
+half-finished work from a lagging copy.
+
+Read-your-writes: ReplicaMiddleware notes when a request wrote to the
+database and makes that user *sticky* to the primary for
+QC_DB_REPLICA_STICKY_SECONDS (longer than the replica's normal lag), via the
+app cache. Responses read from the replica during that window after any
+write aren't stored in the response cache, so a lagging copy can't be cached
+under the new cache version. Stickiness only works if every worker sees the
+same cache, so ReplicaMiddleware refuses to start with a replica configured
+and the per-process locmem backend; use QC_CACHE_BACKEND=db or redis.
+
+Fallback: if the replica can't be reached it is skipped for
+QC_DB_REPLICA_RETRY_SECONDS and reads go to the primary.
+
+Local testing with two SQLite databases:
+
+    cp db.sqlite3 replica.sqlite3
+    python manage.py createcachetable
+    QC_CACHE_BACKEND=db QC_DB_REPLICA_SQLITE=replica.sqlite3 python manage.py runserver
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = getattr(settings, "QC_DB_REPLICA_ALIAS", "replica")
+STICKY_SECONDS = getattr(settings, "QC_DB_REPLICA_STICKY_SECONDS", 15)
+RETRY_SECONDS = getattr(settings, "QC_DB_REPLICA_RETRY_SECONDS", 30)
+# Writes that don't make a user's next reads stale (the cache table, for one).
+IGNORED_WRITE_APPS = {"django_cache"}
+
+_reads = ContextVar("qc_replica_reads", default=False)     # this view may read from the replica
+_wrote = ContextVar("qc_replica_wrote", default=False)     # this request wrote to the primary
+_served = ContextVar("qc_replica_served", default=False)   # a read went to the replica
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class _Health:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.down_until = 0.0
+
+    def available(self):
+        if time.monotonic() < self.down_until:
+            return False
+        try:
+            connections[REPLICA_ALIAS].ensure_connection()
+        except DatabaseError as exc:
+            with self.lock:
+                self.down_until = time.monotonic() + RETRY_SECONDS
+            logger.warning("Read replica %r unavailable, using the primary for %ss: %s",
+                           REPLICA_ALIAS, RETRY_SECONDS, exc)
+            return False
+        return True
+
+
+health = _Health()
+
+
+def _sticky_key(user_pk):
+    return f"qc:replica-sticky:{user_pk}"
+
+
+RECENT_WRITE_KEY = "qc:replica-recent-write"
+
+
+def mark_written(user=None):
+    """Pin ``user`` to the primary for STICKY_SECONDS after a write."""
+    store = cache.get_cache()
+    entries = {RECENT_WRITE_KEY: 1}
+    if user is not None and user.is_authenticated:
+        entries[_sticky_key(user.pk)] = 1
+    store.set_many(entries, STICKY_SECONDS)
+
+
+def is_sticky(user):
+    return user is not None and user.is_authenticated and cache.get_cache().get(_sticky_key(user.pk)) is not None
+
+
+def cacheable():
+    """False when this request read from the replica shortly after some write."""
+    return not (_served.get() and cache.get_cache().get(RECENT_WRITE_KEY) is not None)
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry; a no-op unless a view opened a replica read scope."""
+
+    def db_for_read(self, model, **hints):
+        if _reads.get() and not _wrote.get() and replica_configured() and health.available():
+            _served.set(True)
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in IGNORED_WRITE_APPS:
+            _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False  # replicated from the primary
+        return None
+
+
+class ReplicaMiddleware:
+    """Scopes the routing state to one request and makes writers sticky to the primary."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if replica_configured() and isinstance(cache.get_cache(), LocMemCache):
+            raise ImproperlyConfigured(
+                f"The {REPLICA_ALIAS!r} database needs a cache shared by all workers for read-your-writes; "
+                f"set QC_CACHE_BACKEND to db or redis.")
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        tokens = (_reads.set(False), _wrote.set(False), _served.set(False))
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                # DRF's authentication sets request.user on the Django request too.
+                mark_written(getattr(request, "user", None))
+            return response
+        finally:
+            for var, token in zip((_reads, _wrote, _served), tokens):
+                var.reset(token)
+
+    async def __acall__(self, request):
+        # asgiref copies context changes made in sync code (the router's) back here.
+        tokens = (_reads.set(False), _wrote.set(False), _served.set(False))
+        try:
+            response = await self.get_response(request)
+            if _wrote.get():
+                await sync_to_async(mark_written)(getattr(request, "user", None))
+            return response
+        finally:
+            for var, token in zip((_reads, _wrote, _served), tokens):
+                var.reset(token)
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests for ``replica_actions`` from the read replica.
+
+    replica_actions: viewset actions to route, or None for every safe request (APIViews)
+    """
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, "action", None)
+        if (request.method in SAFE_METHODS and replica_configured()
+                and (self.replica_actions is None or action in self.replica_actions)
+                and not is_sticky(request.user)):
+            self._replica_token = _reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _reads.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,155 @@
+# qc/savedsearch.py
+"""
+FilterPreset as a saved search: server-side execution plus result and
+"new since last viewed" counts for the preset sidebar.
+
+Counts are kept incrementally. Each preset's cache entry holds its counts up
+to a watermark ``as_of``; a refresh fetches only the matching inspections
+created after the watermark (one UNION ALL query for all of a user's
+presets, over the created_at index), adds them, and moves the watermark up
+to ``now - QC_SAVED_SEARCH_LAG`` so rows from still-open transactions are
+picked up by a later refresh instead of being missed. New inspections
+therefore never force a recount. Edits and deletes of existing inspections,
+customer renames, archiving and bulk updates can move rows in or out of any
+preset, so they bump the MEMBERSHIP cache version and the next refresh
+recounts from scratch (one aggregate query per preset).
+
+    GET  /filter-presets/counts/          [{"id", "name", "count", "new"}, ...]
+    GET  /filter-presets/<id>/execute/    {"count", "new", "next", "previous", "results": [...]}
+
+Execute results are cursor-paginated, newest first; fetching the first page
+marks the preset viewed.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Value
+from django.http import QueryDict
+from django.utils import timezone
+from rest_framework.pagination import CursorPagination
+
+from . import cache
+from .fastpath import values_serializer
+from .filters import InspectionFilter
+from .models import Customer, FilterPreset, Inspection
+from .serializers import InspectionListSerializer
+
+# Cache label bumped by writes that can change which existing inspections match a preset.
+MEMBERSHIP = "qc.inspection-membership"
+LAG = timedelta(seconds=getattr(settings, "QC_SAVED_SEARCH_LAG", 60))
+ENTRY_TIMEOUT = getattr(settings, "QC_SAVED_SEARCH_TIMEOUT", 60 * 60 * 24)
+
+
+def preset_queryset(preset, queryset=None):
+    """The inspections a preset matches, or None when its stored filters no longer validate."""
+    data = QueryDict(mutable=True)
+    for name, value in (preset.filters or {}).items():
+        data.setlist(name, [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)])
+    filterset = InspectionFilter(data, queryset=Inspection.objects.all() if queryset is None else queryset)
+    if not filterset.is_valid():
+        return None
+    return filterset.qs.order_by()
+
+
+def _entry_key(preset):
+    return cache.make_key("saved-search", (MEMBERSHIP, Customer), (preset.pk, preset.updated_at.isoformat()))
+
+
+def _recount(queryset, as_of, viewed):
+    upto = Q(created_at__lte=as_of)
+    return queryset.aggregate(
+        count=Count("pk", filter=upto),
+        new=Count("pk", filter=upto & Q(created_at__gt=viewed)) if viewed else Count("pk", filter=upto),
+    )
+
+
+def refresh_counts(presets):
+    """``{preset.pk: {"count": int, "new": int}}`` (None for presets with invalid filters)."""
+    store = cache.get_cache()
+    now = timezone.now()
+    rebase_at = now - LAG
+    keys = {preset.pk: _entry_key(preset) for preset in presets}
+    entries = store.get_many(list(keys.values()))
+
+    results, live = {}, []
+    for preset in presets:
+        queryset = preset_queryset(preset)
+        if queryset is None:
+            results[preset.pk] = None
+            continue
+        viewed = preset.last_viewed_at
+        entry = entries.get(keys[preset.pk])
+        if entry is not None and viewed is not None and viewed < entry["as_of"] and entry["viewed"] != viewed:
+            entry = None  # its "new" base counted from a different view time
+        if entry is None:
+            cache.stats.record("saved-search", hit=False)
+            entry = dict(_recount(queryset, rebase_at, viewed), as_of=rebase_at, viewed=viewed)
+        else:
+            cache.stats.record("saved-search", hit=True)
+        live.append((preset, queryset, entry))
+
+    # Everything created after each preset's watermark, in one query.
+    tails = {preset.pk: [] for preset, _, _ in live}
+    if live:
+        parts = [
+            queryset.filter(created_at__gt=entry["as_of"]).annotate(preset=Value(str(preset.pk)))
+            .values_list("preset", "created_at")
+            for preset, queryset, entry in live
+        ]
+        union = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+        by_text = {str(preset.pk): preset.pk for preset, _, _ in live}
+        for pk, created_at in union:
+            tails[by_text[pk]].append(created_at)
+
+    updated = {}
+    for preset, _, entry in live:
+        viewed, as_of, tail = preset.last_viewed_at, entry["as_of"], tails[preset.pk]
+        fresh = [t for t in tail if viewed is None or t > viewed]
+        base_new = entry["new"] if viewed is None or viewed < as_of else 0
+        results[preset.pk] = {"count": entry["count"] + len(tail), "new": base_new + len(fresh)}
+
+        # Fold rows older than the lag into the base and move the watermark.
+        if rebase_at > as_of:
+            settled = sum(1 for t in tail if t <= rebase_at)
+            settled_new = sum(1 for t in fresh if t <= rebase_at)
+            entry = {"count": entry["count"] + settled, "new": base_new + settled_new,
+                     "as_of": rebase_at, "viewed": viewed}
+        updated[keys[preset.pk]] = entry
+    store.set_many(updated, ENTRY_TIMEOUT)
+    return results
+
+
+def preset_counts(user):
+    presets = list(FilterPreset.objects.filter(user=user))
+    counts = refresh_counts(presets)
+    return [
+        {"id": preset.pk, "name": preset.name, **(counts[preset.pk] or {"count": None, "new": None})}
+        for preset in presets
+    ]
+
+
+class PresetResultsPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+def execute_preset(preset, request, view=None):
+    """
+    Run a preset; returns ``{"count", "new", "next", "previous", "results"}``, or None if its filters are invalid.
+    """
+    queryset = preset_queryset(preset)
+    if queryset is None:
+        return None
+    counts = refresh_counts([preset])[preset.pk]
+    paginator = PresetResultsPagination()
+    page = paginator.paginate_queryset(queryset.only("id", "created_at"), request, view=view)
+    rows = values_serializer(InspectionListSerializer).serialize(
+        Inspection.objects.filter(pk__in=[row.pk for row in page]).order_by(*paginator.ordering))
+    if paginator.cursor_query_param not in request.query_params:
+        # .update(): viewing isn't an edit, so updated_at and the count entries stay put;
+        # only the cached preset list shows last_viewed_at.
+        FilterPreset.objects.filter(pk=preset.pk).update(last_viewed_at=timezone.now())
+        cache.invalidate(FilterPreset)
+    return dict(counts, next=paginator.get_next_link(), previous=paginator.get_previous_link(), results=rows)
@@ -1,6 +1,7 @@
 # qc/serializers.py
 from rest_framework import serializers
-from .models import Customer, CustomerEmail, Template, TemplatePOM, Inspection, Measurement, InspectionImage, FilterPreset
+from . import audit
+from .models import Customer, CustomerEmail, Template, TemplatePOM, Inspection, Measurement, InspectionImage, FilterPreset, ArchivedInspection
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.utils import timezone
 
@@ -77,6 +78,12 @@ class InspectionListSerializer(serializers.ModelSerializer):
             "customer_decision", "customer_feedback_comments", "customer_feedback_date"
         ]
 
+class ArchivedInspectionListSerializer(serializers.ModelSerializer):
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    class Meta:
+        model = ArchivedInspection
+        fields = InspectionListSerializer.Meta.fields + ["archived_at"]
+
 class InspectionCopySerializer(serializers.ModelSerializer):
     measurements = MeasurementSerializer(many=True, read_only=True)
     class Meta:
@@ -117,19 +124,42 @@ class InspectionSerializer(serializers.ModelSerializer):
         
         # Update feedback date if feedback is provided
         if 'customer_decision' in validated_data or 'customer_feedback_comments' in validated_data:
-            instance.customer_feedback_date = timezone.now()
+            validated_data["customer_feedback_date"] = timezone.now()
+            instance._feedback_changed = True  # lets the live event stream tag this as feedback
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+        # Diffs come from values already loaded; qc/audit.py writes them after commit
+        changes = audit.apply_changes(instance, validated_data)
         instance.save()
         if measurements_data is not None:
+            old = list(instance.measurements.all())
+            new = [Measurement(inspection=instance, **m) for m in measurements_data]
             instance.measurements.all().delete()
-            for m in measurements_data:
-                Measurement.objects.create(inspection=instance, **m)
+            for measurement in new:
+                measurement.save()
+            measurement_changes = audit.diff_measurements(old, new)
+            if measurement_changes:
+                changes["measurements"] = measurement_changes
+        request = self.context.get("request")
+        audit.record("update", {instance.pk: changes}, getattr(request, "user", None))
         return instance
 
+class InspectionBulkUpdateSerializer(serializers.Serializer):
+    """Payload of POST /inspections/bulk-update/ (see qc/bulk.py)."""
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=1000)
+    customer_decision = serializers.ChoiceField(
+        choices=Inspection.CUSTOMER_DECISION_CHOICES, allow_null=True, required=False)
+    customer_feedback_comments = serializers.CharField(allow_blank=True, required=False)
+    decision = serializers.ChoiceField(choices=Inspection.DECISION_CHOICES, allow_null=True, required=False)
+    stage = serializers.ChoiceField(choices=Inspection.STAGE_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError(
+                "Send at least one of customer_decision, customer_feedback_comments, decision or stage.")
+        return attrs
+
 class FilterPresetSerializer(serializers.ModelSerializer):
     class Meta:
         model = FilterPreset
-        fields = ["id", "name", "description", "filters", "created_at", "updated_at"]
-        read_only_fields = ["id", "created_at", "updated_at"]
\ No newline at end of file
+        fields = ["id", "name", "description", "filters", "created_at", "updated_at", "last_viewed_at"]
+        read_only_fields = ["id", "created_at", "updated_at", "last_viewed_at"]
\ No newline at end of file
@@ -0,0 +1,127 @@
+# qc/signals.py
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache, events, media
+from .authentication import forget_user
+from .savedsearch import MEMBERSHIP
+from .models import (
+    Customer, CustomerEmail, FilterPreset, Inspection, InspectionImage, Measurement, Template, TemplatePOM,
+)
+
+
+def inspection_event_data(inspection):
+    """Compact row the frontend can patch into its list without refetching."""
+    return {
+        "id": str(inspection.pk),
+        "style": inspection.style,
+        "color": inspection.color,
+        "po_number": inspection.po_number,
+        "stage": inspection.stage,
+        "decision": inspection.decision,
+        "customer": str(inspection.customer_id) if inspection.customer_id else None,
+        "customer_decision": inspection.customer_decision,
+        "customer_feedback_date": (
+            inspection.customer_feedback_date.isoformat() if inspection.customer_feedback_date else None
+        ),
+    }
+
+
+def publish_on_commit(event_type, action, data):
+    # Only announce writes that actually made it to the database.
+    transaction.on_commit(partial(events.publish, event_type, action, data))
+
+
+@receiver(post_save, sender=Inspection)
+def inspection_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit("inspection", "created", inspection_event_data(instance))
+        return
+    # Saved-search counts pick up new rows incrementally; edits need a recount.
+    bump_cache_version(MEMBERSHIP)
+    if getattr(instance, "_feedback_changed", False):
+        publish_on_commit("feedback", "updated", inspection_event_data(instance))
+    else:
+        publish_on_commit("inspection", "updated", inspection_event_data(instance))
+
+
+@receiver(post_delete, sender=Inspection)
+def inspection_deleted(sender, instance, **kwargs):
+    bump_cache_version(MEMBERSHIP)
+    publish_on_commit("inspection", "deleted", {"id": str(instance.pk)})
+
+
+@receiver(post_save, sender=InspectionImage)
+def image_saved(sender, instance, created, **kwargs):
+    if created:
+        media.add_reference(instance.image.name)
+    publish_on_commit("image", "created" if created else "updated", {
+        "id": str(instance.pk),
+        "inspection": str(instance.inspection_id),
+        "caption": instance.caption,
+    })
+
+
+@receiver(post_delete, sender=InspectionImage)
+def image_deleted(sender, instance, **kwargs):
+    media.drop_reference(instance.image.name)
+    publish_on_commit("image", "deleted", {"id": str(instance.pk), "inspection": str(instance.inspection_id)})
+
+
+# --- Parent updated_at --------------------------------------------------------
+# Images and customer emails are part of their parent's representation (and
+# so its ETag, see qc/conditional.py) but are written without saving the
+# parent. Deletes cascading from the parent itself are skipped.
+
+PARENTS = {InspectionImage: (Inspection, "inspection_id"), CustomerEmail: (Customer, "customer_id")}
+
+
+def touch_parent(sender, instance, origin=None, **kwargs):
+    parent, field = PARENTS[sender]
+    if isinstance(origin, parent):
+        return
+    parent.objects.filter(pk=getattr(instance, field)).update(updated_at=timezone.now())
+
+
+for _model in PARENTS:
+    post_save.connect(touch_parent, sender=_model, dispatch_uid=f"qc-touch-save-{_model.__name__}")
+    post_delete.connect(touch_parent, sender=_model, dispatch_uid=f"qc-touch-delete-{_model.__name__}")
+
+
+# --- Cache invalidation -----------------------------------------------------
+# Each write bumps its model's cache version (see qc/cache.py). We bump right
+# away and again on commit, so a reader that filled the cache from pre-commit
+# data between the two is invalidated as well.
+#
+# Measurement and TemplatePOM only hook post_save: a delete receiver would
+# stop Django from fast-deleting them in bulk when the serializers replace
+# them, and those replacements always save the parent (and its version) too.
+
+def bump_cache_version(sender, **kwargs):
+    cache.invalidate(sender)
+    transaction.on_commit(partial(cache.invalidate, sender))
+
+
+for _model in (Customer, CustomerEmail, Template, TemplatePOM, Inspection, Measurement, InspectionImage, FilterPreset):
+    post_save.connect(bump_cache_version, sender=_model, dispatch_uid=f"qc-cache-save-{_model.__name__}")
+for _model in (Customer, CustomerEmail, Template, Inspection, InspectionImage, FilterPreset):
+    post_delete.connect(bump_cache_version, sender=_model, dispatch_uid=f"qc-cache-delete-{_model.__name__}")
+
+
+# --- cached JWT users ------------------------------------------------------------
+# CachedJWTAuthentication keeps User rows in the cache; any save (deactivation,
+# password change, permission flags) or delete evicts the entry. With locmem
+# that only reaches this process; other workers' entries expire within a few
+# seconds (LOCAL_USER_CACHE_TIMEOUT).
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid="qc-auth-user-save")
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid="qc-auth-user-delete")
+def evict_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    # A concurrent request may re-cache the old row before this commits.
+    transaction.on_commit(partial(forget_user, instance.pk))
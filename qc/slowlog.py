@@ -0,0 +1,197 @@
+# qc/slowlog.py
+"""
+Slow-query log with EXPLAIN plans.
+
+SlowQueryMiddleware times every SQL statement a request runs (through
+``connection.execute_wrapper``). Statements slower than QC_SLOW_QUERY_MS are
+appended to QC_SLOW_QUERY_LOG as JSON lines together with the route and
+action that issued them, a normalised fingerprint (literals and IN lists
+collapsed, so ``?decision=Accepted`` and ``?decision=Rejected`` aggregate)
+and the database's EXPLAIN plan.
+
+EXPLAIN runs after the response has been produced, outside the request's
+transaction, at most QC_SLOW_QUERY_MAX_EXPLAINS times per request and once
+per fingerprint every QC_SLOW_QUERY_EXPLAIN_TTL seconds per process.
+Parameters are used for EXPLAIN but never written to the log.
+
+    python manage.py slow_query_report --top 20 --since 24
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .metrics import awrap_queries, route_labels, wrap_queries
+
+SLOW_QUERY_MS = getattr(settings, "QC_SLOW_QUERY_MS", 200)
+SLOW_QUERY_LOG = getattr(settings, "QC_SLOW_QUERY_LOG", None) or os.path.join(
+    tempfile.gettempdir(), "qc-slow-queries.jsonl")
+MAX_EXPLAINS = getattr(settings, "QC_SLOW_QUERY_MAX_EXPLAINS", 3)
+EXPLAIN_TTL = getattr(settings, "QC_SLOW_QUERY_EXPLAIN_TTL", 600)
+MAX_SQL_LENGTH = 4000
+
+logger = logging.getLogger("qc.slow_query")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalise(sql):
+    """SQL with literals and placeholders replaced by ``?`` and IN lists collapsed."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalise(sql).encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+class _ExplainCache:
+    """Fingerprints explained recently in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = {}
+
+    def claim(self, fp):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._seen.get(fp, -EXPLAIN_TTL) < EXPLAIN_TTL:
+                return False
+            self._seen[fp] = now
+            return True
+
+
+_explained = _ExplainCache()
+_write_lock = threading.Lock()
+
+
+def explain(alias, sql, params):
+    """The database's plan for a SELECT, or None if it can't be explained."""
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as exc:
+        return f"EXPLAIN failed: {exc}"
+
+
+def write_entries(entries, path=None):
+    lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+    with _write_lock, open(path or SLOW_QUERY_LOG, "a") as fh:
+        fh.write(lines)
+
+
+def read_entries(path=None, since=None):
+    path = path or SLOW_QUERY_LOG
+    if not os.path.exists(path):
+        return
+    with open(path) as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if since is None or entry["ts"] >= since:
+                yield entry
+
+
+class SlowQueryRecorder:
+    """execute_wrapper collecting statements over the threshold for one request."""
+
+    def __init__(self, request, threshold_ms=None):
+        self.request = request
+        self.threshold = (SLOW_QUERY_MS if threshold_ms is None else threshold_ms) / 1000
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold:
+                route, action = route_labels(self.request)
+                self.slow.append({
+                    "sql": sql, "params": params, "many": many, "ms": elapsed * 1000,
+                    "db": context["connection"].alias, "route": route, "action": action,
+                })
+
+    def flush(self):
+        entries = []
+        explains = 0
+        for query in self.slow:
+            fp = fingerprint(query["sql"])
+            plan = None
+            if not query["many"] and explains < MAX_EXPLAINS and _explained.claim(fp):
+                explains += 1
+                plan = explain(query["db"], query["sql"], query["params"])
+            entries.append({
+                "ts": round(time.time(), 3),
+                "fingerprint": fp,
+                "ms": round(query["ms"], 2),
+                "route": query["route"],
+                "action": query["action"],
+                "method": self.request.method,
+                "db": query["db"],
+                "sql": query["sql"][:MAX_SQL_LENGTH],
+                "plan": plan,
+            })
+            logger.warning("Slow query %.0fms [%s %s] %s", query["ms"], query["route"], fp,
+                           query["sql"][:200])
+        write_entries(entries)
+
+
+class SlowQueryMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = SlowQueryRecorder(request)
+        try:
+            with wrap_queries(recorder):
+                return self.get_response(request)
+        finally:
+            # Also when the view raised: its slow queries are often why.
+            record(recorder)
+
+    async def __acall__(self, request):
+        recorder = SlowQueryRecorder(request)
+        try:
+            async with awrap_queries(recorder):
+                return await self.get_response(request)
+        finally:
+            if recorder.slow:
+                await sync_to_async(record)(recorder)
+
+
+def record(recorder):
+    if recorder.slow:
+        try:
+            recorder.flush()
+        except Exception:
+            logger.exception("Could not record slow queries")
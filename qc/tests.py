@@ -1,3 +1,1037 @@
-from django.test import TestCase
+"""
+Performance regression tests, plus behaviour tests for the qc features.
 
-# Create your tests here.
+Every API action runs against seeded data under a budget (APIBudgetTests): a
+maximum number of SQL queries (catches N+1 regressions, which don't grow
+with a handful of rows in dev but do in production) and a wall-clock limit.
+The expensive internals, PDF rendering and image compression, get
+micro-benchmarks. What the features do (facets, saved searches, bulk
+updates, ...) is checked in their own classes, without budgets.
+
+Wall-clock budgets are generous for a developer laptop; scale them for slow
+CI runners with QC_PERF_BUDGET_SCALE=2 (etc.). Query budgets are exact
+upper bounds and never scale.
+
+    python manage.py test qc
+"""
+import asyncio
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from unittest import mock
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache as django_cache
+from django.core.management import CommandError, call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    Customer, CustomerEmail, FilterPreset, Inspection, InspectionImage, MediaBlob, Measurement, Template,
+    TemplatePOM,
+)
+from .archive import archive_inspections
+from .feedback_import import import_feedback, read_file
+from . import authentication, cache, compression, events, metrics, profiling, routing, slowlog, throttling
+from .executor import ExecutorBusy
+from .filters import InspectionFilter
+from .media import ContentAddressedStorage, collect_garbage
+from .renderers import FastJSONRenderer
+from .savedsearch import MEMBERSHIP
+from .serializers import InspectionListSerializer
+from .views import InspectionViewSet, compress_image, generate_pdf_buffer
+
+User = get_user_model()
+
+BUDGET_SCALE = float(os.getenv("QC_PERF_BUDGET_SCALE", "1"))
+MEDIA_ROOT = tempfile.mkdtemp(prefix="qc-test-media-")
+
+STAGES = [c[0] for c in Inspection.STAGE_CHOICES]
+DECISIONS = [c[0] for c in Inspection.DECISION_CHOICES]
+
+
+def make_photo(width=3000, height=2000, mode="RGB", fmt="JPEG"):
+    """A noisy, photo-sized image so compression does realistic work."""
+    image = Image.effect_noise((width, height), 64).convert(mode)
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def seed_data(inspections=30, measurements=12, images=2):
+    """Enough rows that per-row queries would blow every budget below."""
+    user = User.objects.create_user("inspector", password="secret", is_staff=True)
+    customers = []
+    for c in range(3):
+        customer = Customer.objects.create(name=f"Customer {c}", created_by=user)
+        for e in range(3):
+            CustomerEmail.objects.create(
+                customer=customer, email=f"c{c}e{e}@example.com", email_type="to" if e == 0 else "cc")
+        customers.append(customer)
+    templates = []
+    for t in range(4):
+        template = Template.objects.create(name=f"Template {t}", customer=customers[t % 3], created_by=user)
+        for p in range(measurements):
+            TemplatePOM.objects.create(template=template, name=f"POM {p}", default_tol=0.5, default_std=20, order=p)
+        templates.append(template)
+    photo = ContentFile(make_photo(400, 300), name="seed.jpg")
+    for i in range(inspections):
+        inspection = Inspection.objects.create(
+            style=f"ST-{i:03d}", color="Navy", po_number=f"PO-{i}", stage=STAGES[i % len(STAGES)],
+            decision=DECISIONS[i % len(DECISIONS)], customer=customers[i % 3], template=templates[i % 4],
+            created_by=user, remarks="Seeded " * 20, qa_fit_comments="Fit ok " * 30)
+        Measurement.objects.bulk_create([
+            Measurement(inspection=inspection, pom_name=f"POM {p}", tol=0.5, std=20, s1=20.2, s2=19.4,
+                        s3=20.9, s4=None, s5=20.0, s6=21.0)
+            for p in range(measurements)
+        ])
+        for n in range(images):
+            InspectionImage.objects.create(inspection=inspection, caption=f"Image {n}", image=photo)
+    FilterPreset.objects.create(user=user, name="Rejected", filters={"decision": ["Rejected"]})
+    return user
+
+
+class BudgetMixin:
+    # Conditional GETs (qc/conditional.py) run one aggregate for their ETag and
+    # Last-Modified before the response is built; it is cached afterwards.
+    VALIDATOR_QUERIES = 1
+
+    @contextmanager
+    def budget(self, max_queries, max_seconds):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            yield
+            elapsed = time.perf_counter() - started
+        executed = "\n".join(f"  {q['sql'][:200]}" for q in queries.captured_queries)
+        self.assertLessEqual(
+            len(queries), max_queries, f"{len(queries)} queries > budget of {max_queries}:\n{executed}")
+        limit = max_seconds * BUDGET_SCALE
+        self.assertLessEqual(elapsed, limit, f"took {elapsed:.3f}s > budget of {limit:.3f}s")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class SeededAPITestCase(TestCase):
+    """Seeded data and an authenticated client with an empty cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_data()
+        cls.inspection = Inspection.objects.order_by("created_at").first()
+        cls.customer = Customer.objects.first()
+        cls.template = Template.objects.first()
+        cls.preset = FilterPreset.objects.get()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # Start cold: budgets measure the uncached path.
+        django_cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def measurement_payload(self, count=12):
+        return [{"pom_name": f"POM {p}", "tol": 0.5, "std": 20, "s1": 20.1, "s2": 20.3, "status": "OK"}
+                for p in range(count)]
+
+
+class APIBudgetTests(BudgetMixin, SeededAPITestCase):
+
+    # --- inspections -------------------------------------------------------
+
+    def test_inspection_list(self):
+        with self.budget(max_queries=1 + self.VALIDATOR_QUERIES, max_seconds=0.5):
+            response = self.client.get("/inspections/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 30)
+
+    def test_inspection_list_filtered(self):
+        with self.budget(max_queries=1 + self.VALIDATOR_QUERIES, max_seconds=0.5):
+            response = self.client.get(
+                "/inspections/", {"stage": ["Proto", "Fit"], "decision": "Accepted", "search": "ST-0",
+                                  "ordering": "style"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_inspection_list_fast_path_matches_serializer(self):
+        # Cover NULL relations, missing feedback and microsecond timestamps.
+        Inspection.objects.create(style="NO-USER", stage="Fit", customer_feedback_date=timezone.now())
+        Inspection.objects.filter(style="ST-001").update(customer=None, template=None, color="")
+        for params in ({}, {"ordering": "style", "stage": ["Proto", "Fit"]}):
+            response = self.client.get("/inspections/", params)
+            view = InspectionViewSet(action="list", request=response.wsgi_request, format_kwarg=None)
+            queryset = InspectionFilter(params, view.get_queryset()).qs.order_by(params.get("ordering", "-created_at"))
+            expected = JSONRenderer().render(InspectionListSerializer(queryset, many=True).data)
+            self.assertEqual(response.content, expected)
+
+
+    def test_inspection_facets(self):
+        with self.budget(max_queries=1, max_seconds=0.3):
+            self.client.get("/inspections/facets/", {"stage": ["Fit", "Dev"], "search": "ST-0"})
+        # Cached under a normalised key.
+        with self.budget(max_queries=0, max_seconds=0.1):
+            self.client.get("/inspections/facets/", {"search": "ST-0", "stage": ["Dev", "Fit", "Fit"]})
+
+    def test_style_timeline(self):
+        with self.budget(max_queries=2, max_seconds=0.2):
+            response = self.client.get("/inspections/timeline/", {"style": "ST-001", "color": "Navy"})
+        self.assertEqual(len(response.data["poms"]), 12)
+
+    def test_inspection_retrieve(self):
+        with self.budget(max_queries=2 + self.VALIDATOR_QUERIES, max_seconds=0.3):
+            response = self.client.get(f"/inspections/{self.inspection.pk}/")
+        self.assertEqual(len(response.data["measurements"]), 12)
+
+    def test_inspection_create(self):
+        payload = {"style": "NEW-1", "stage": "Fit", "decision": "Accepted",
+                   "customer": str(self.customer.pk), "measurements": self.measurement_payload()}
+        # customer lookup, insert, one per measurement, then measurements + images for the response
+        with self.budget(max_queries=2 + 12 + 2, max_seconds=0.5):
+            response = self.client.post("/inspections/", payload, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_inspection_update(self):
+        payload = {"style": "UPD-1", "stage": "PPS", "measurements": self.measurement_payload()}
+        # lookup + prefetches, update, delete + recreate measurements
+        with self.budget(max_queries=6 + 12 + 2, max_seconds=0.5):
+            response = self.client.put(f"/inspections/{self.inspection.pk}/", payload, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_inspection_feedback_patch(self):
+        payload = {"customer_decision": "Accepted", "customer_feedback_comments": "Approved"}
+        with self.budget(max_queries=6, max_seconds=0.3):
+            response = self.client.patch(f"/inspections/{self.inspection.pk}/", payload, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertIsNotNone(response.data["customer_feedback_date"])
+
+
+    def test_inspection_history(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/inspections/{self.inspection.pk}/", {"stage": "PPS"}, format="json")
+        with self.budget(max_queries=2, max_seconds=0.2):
+            response = self.client.get(f"/inspections/{self.inspection.pk}/history/")
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_inspection_bulk_update(self):
+        ids = list(Inspection.objects.values_list("pk", flat=True)[:20])
+        # savepoint, select for update, bulk update, release
+        with self.budget(max_queries=4, max_seconds=0.3):
+            response = self.client.post("/inspections/bulk-update/",
+                                        {"ids": [str(pk) for pk in ids], "stage": "PPS"}, format="json")
+        self.assertEqual(response.data["updated"], 20)
+
+    def test_feedback_import(self):
+        rows = [["PO", "Style", "Color", "Stage", "Decision"]] + [
+            [i.po_number, i.style, i.color, i.stage, "Accepted"] for i in Inspection.objects.all()]
+        # savepoint, match, bulk update, release
+        with self.budget(max_queries=4, max_seconds=0.3):
+            report = import_feedback(rows)
+        self.assertEqual(report.updated, 30)
+
+    def test_inspection_destroy(self):
+        # +2: one media refcount decrement per image.
+        with self.budget(max_queries=9, max_seconds=0.3):
+            response = self.client.delete(f"/inspections/{self.inspection.pk}/")
+        self.assertEqual(response.status_code, 204)
+
+    def test_inspection_pdf(self):
+        with self.budget(max_queries=3 + self.VALIDATOR_QUERIES, max_seconds=2.0):
+            response = self.client.get(f"/inspections/{self.inspection.pk}/pdf/")
+            body = b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body.startswith(b"%PDF"))
+
+
+    def test_inspection_not_modified(self):
+        url = f"/inspections/{self.inspection.pk}/"
+        etag = self.client.get(url)["ETag"]
+        # Validators are cached: a current copy costs no query and no rendering.
+        with self.budget(max_queries=0, max_seconds=0.1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_inspection_upload_image(self):
+        upload = SimpleUploadedFile("photo.jpg", make_photo(), content_type="image/jpeg")
+        # +2: media refcount upsert; +1: touches the inspection's updated_at.
+        with self.budget(max_queries=7, max_seconds=4.0):
+            response = self.client.post(
+                f"/inspections/{self.inspection.pk}/upload_image/", {"image": upload, "caption": "Front"})
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_identical_uploads_share_one_file(self):
+        other = Inspection.objects.exclude(pk=self.inspection.pk).first()
+        photo = make_photo(400, 300)
+        names = []
+        for inspection in (self.inspection, other):
+            upload = SimpleUploadedFile("photo.jpg", photo, content_type="image/jpeg")
+            self.client.post(f"/inspections/{inspection.pk}/upload_image/", {"image": upload, "caption": "Same"})
+            names.append(InspectionImage.objects.filter(inspection=inspection, caption="Same").get().image.name)
+        self.assertEqual(names[0], names[1])
+        digest = os.path.splitext(os.path.basename(names[0]))[0]
+        self.assertEqual(names[0], f"inspection_images/{digest[:2]}/{digest[2:4]}/{digest}.webp")
+        self.assertEqual(MediaBlob.objects.get(name=names[0]).refcount, 2)
+        self.client.delete(f"/inspections/{other.pk}/")
+        self.assertEqual(MediaBlob.objects.get(name=names[0]).refcount, 1)
+        self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, names[0])))
+
+    def test_inspection_send_email(self):
+        with self.budget(max_queries=5, max_seconds=2.0):
+            response = self.client.post(f"/inspections/{self.inspection.pk}/send_email/")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(mail.outbox), 1)
+
+    # --- customers ---------------------------------------------------------
+
+    def test_customer_list(self):
+        with self.budget(max_queries=2 + self.VALIDATOR_QUERIES, max_seconds=0.2):
+            response = self.client.get("/customers/")
+        self.assertEqual(len(response.data), 3)
+
+    def test_customer_retrieve(self):
+        with self.budget(max_queries=2 + self.VALIDATOR_QUERIES, max_seconds=0.2):
+            self.client.get(f"/customers/{self.customer.pk}/")
+
+    def test_customer_create_update_destroy(self):
+        with self.budget(max_queries=2, max_seconds=0.2):
+            response = self.client.post("/customers/", {"name": "New"}, format="json")
+        pk = response.data["id"]
+        with self.budget(max_queries=4, max_seconds=0.2):
+            self.client.put(f"/customers/{pk}/", {"name": "Renamed"}, format="json")
+        with self.budget(max_queries=8, max_seconds=0.2):
+            response = self.client.delete(f"/customers/{pk}/")
+        self.assertEqual(response.status_code, 204)
+
+    def test_customer_add_email(self):
+        # +1: touches the customer's updated_at.
+        with self.budget(max_queries=4, max_seconds=0.2):
+            response = self.client.post(
+                f"/customers/{self.customer.pk}/add_email/", {"email": "new@example.com", "email_type": "cc"})
+        self.assertEqual(response.status_code, 201)
+
+    # --- templates ---------------------------------------------------------
+
+    def test_template_list(self):
+        with self.budget(max_queries=2 + self.VALIDATOR_QUERIES, max_seconds=0.3):
+            response = self.client.get("/templates/")
+        self.assertEqual(len(response.data), 4)
+
+    def test_template_list_search(self):
+        with self.budget(max_queries=2 + self.VALIDATOR_QUERIES, max_seconds=0.3):
+            self.client.get("/templates/", {"search": "Customer", "customer": str(self.customer.pk)})
+
+    def test_template_retrieve(self):
+        with self.budget(max_queries=2 + self.VALIDATOR_QUERIES, max_seconds=0.2):
+            response = self.client.get(f"/templates/{self.template.pk}/")
+        self.assertEqual(len(response.data["poms"]), 12)
+
+    def test_template_create_update_destroy(self):
+        poms = [{"name": f"POM {p}", "default_tol": 0.5, "default_std": 10} for p in range(12)]
+        # unique-name check, insert, one per POM, POMs for the response
+        with self.budget(max_queries=2 + 12 + 1, max_seconds=0.3):
+            response = self.client.post("/templates/", {"name": "New", "poms": poms}, format="json")
+        pk = response.data["id"]
+        with self.budget(max_queries=6 + 12, max_seconds=0.3):
+            response = self.client.put(f"/templates/{pk}/", {"name": "New 2", "poms": poms}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        # lookup, POMs, delete POMs, unlink inspections and archived inspections, delete
+        with self.budget(max_queries=6, max_seconds=0.2):
+            response = self.client.delete(f"/templates/{pk}/")
+        self.assertEqual(response.status_code, 204)
+
+    def test_gc_media_deletes_only_orphans(self):
+        # A prefix content hashes can't produce, so other tests' files don't count.
+        prefix = "inspection_images/gc"
+        orphan = default_storage.save(f"{prefix}/orphan.jpg", ContentFile(b"x" * 1000))
+        live = default_storage.save(f"{prefix}/live.jpg", ContentFile(b"y" * 10))
+        InspectionImage.objects.bulk_create([InspectionImage(inspection=self.inspection, image=live)])
+        dry = collect_garbage(grace=timedelta(0), dry_run=True, prefix=prefix)
+        self.assertEqual((dry.scanned, dry.deleted, dry.bytes_reclaimed), (2, 1, 1000))
+        self.assertTrue(default_storage.exists(orphan))
+
+        self.assertEqual(collect_garbage(grace=timedelta(hours=1), prefix=prefix).kept_recent, 1)
+        report = collect_garbage(grace=timedelta(0), prefix=prefix)
+        self.assertEqual((report.orphans, report.deleted, report.bytes_reclaimed), (1, 1, 1000))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(live))
+
+    def test_gc_media_keeps_orphans_reused_by_an_upload(self):
+        storage = ContentAddressedStorage()
+        name = storage.save("inspection_images/gcreuse/photo.jpg", ContentFile(b"z" * 100))
+        stale = time.time() - 2 * 3600
+        os.utime(default_storage.path(name), (stale, stale))
+        # An upload of the same bytes is deduplicated onto the old orphan before its row exists.
+        self.assertEqual(storage.save("inspection_images/gcreuse/again.jpg", ContentFile(b"z" * 100)), name)
+        report = collect_garbage(grace=timedelta(hours=1), prefix="inspection_images/gcreuse")
+        self.assertEqual((report.kept_recent, report.deleted), (1, 0))
+        self.assertTrue(default_storage.exists(name))
+
+        MediaBlob.objects.filter(name=name).update(reused_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(collect_garbage(grace=timedelta(hours=1), prefix="inspection_images/gcreuse").deleted, 1)
+        self.assertFalse(default_storage.exists(name))
+
+    # --- archive -----------------------------------------------------------
+
+    def test_archive_search_and_restore(self):
+        Inspection.objects.filter(style__in=["ST-001", "ST-002"]).update(
+            created_at=timezone.now() - timedelta(days=800))
+        original = Inspection.objects.get(style="ST-001")
+        self.assertEqual(archive_inspections(older_than_days=730), 2)
+        self.assertFalse(Inspection.objects.filter(style="ST-001").exists())
+        self.assertEqual(Measurement.objects.filter(inspection_id=original.pk).count(), 0)
+
+        styles = {row["style"] for row in self.client.get("/inspections/").data}
+        self.assertNotIn("ST-001", styles)
+        with self.budget(max_queries=1, max_seconds=0.5):
+            rows = self.client.get("/inspections/", {"include_archived": 1, "search": "ST-00"}).data
+        self.assertEqual({r["style"]: r["archived"] for r in rows if r["style"] in ("ST-001", "ST-003")},
+                         {"ST-001": True, "ST-003": False})
+        self.assertEqual(len(self.client.get("/archived-inspections/", {"search": "ST-001"}).data), 1)
+        detail = self.client.get(f"/archived-inspections/{original.pk}/").data
+        self.assertEqual((len(detail["measurements"]), len(detail["images"])), (12, 2))
+
+        response = self.client.post(f"/archived-inspections/{original.pk}/restore/")
+        self.assertEqual(response.status_code, 200)
+        restored = Inspection.objects.get(pk=original.pk)
+        self.assertEqual(restored.created_at, original.created_at)
+        self.assertEqual((restored.measurements.count(), restored.images.count()), (12, 2))
+        self.assertEqual(restored.qa_fit_comments, original.qa_fit_comments)
+
+    # --- filter presets ----------------------------------------------------
+
+    def test_filter_preset_counts(self):
+        self.client.get("/filter-presets/counts/")
+        # New rows are added to the cached counts from the live tail, without a recount.
+        Inspection.objects.create(style="ST-NEW", decision="Rejected", stage="Dev", created_by=self.user)
+        with self.budget(max_queries=2, max_seconds=0.2):
+            self.client.get("/filter-presets/counts/")
+
+    def test_filter_preset_crud(self):
+        with self.budget(max_queries=1, max_seconds=0.2):
+            response = self.client.get("/filter-presets/")
+        self.assertEqual(len(response.data), 1)
+        with self.budget(max_queries=1, max_seconds=0.2):
+            response = self.client.post("/filter-presets/", {"name": "Fit", "filters": {"stage": ["Fit"]}},
+                                        format="json")
+        pk = response.data["id"]
+        with self.budget(max_queries=1, max_seconds=0.2):
+            self.client.get(f"/filter-presets/{pk}/")
+        with self.budget(max_queries=2, max_seconds=0.2):
+            self.client.patch(f"/filter-presets/{pk}/", {"description": "Fit stage"}, format="json")
+        with self.budget(max_queries=2, max_seconds=0.2):
+            response = self.client.delete(f"/filter-presets/{pk}/")
+        self.assertEqual(response.status_code, 204)
+
+    # --- dashboard, auth, cache ----------------------------------------------
+
+    def test_dashboard(self):
+        with self.budget(max_queries=9, max_seconds=0.5):
+            response = self.client.get("/dashboard/")
+        self.assertEqual(response.data["total_inspections"], 30)
+
+    def test_cached_responses_skip_the_database(self):
+        self.client.get("/inspections/")
+        self.client.get("/dashboard/")
+        with self.budget(max_queries=0, max_seconds=0.1):
+            self.assertEqual(self.client.get("/inspections/")["X-Cache"], "HIT")
+            self.client.get("/dashboard/")
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_token_obtain(self):
+        self.user.set_password("secret")
+        self.user.save()
+        client = APIClient()
+        with self.budget(max_queries=1, max_seconds=0.3):
+            response = client.post("/api/token/", {"username": "inspector", "password": "secret"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_jwt_user_is_cached_until_the_user_changes(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        client.get("/filter-presets/")
+        with self.budget(max_queries=1, max_seconds=0.1):
+            self.assertEqual(client.get("/filter-presets/").status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(client.get("/filter-presets/").status_code, 401)
+
+
+class FacetTests(SeededAPITestCase):
+
+    def test_disjunctive_counts(self):
+        data = self.client.get("/inspections/facets/", {"stage": ["Fit", "Dev"], "search": "ST-0"}).data
+        base = Inspection.objects.filter(style__icontains="ST-0")
+        self.assertEqual(data["total"], base.filter(stage__in=["Fit", "Dev"]).count())
+        decisions = {row["value"]: row["count"] for row in data["facets"]["decision"]}
+        self.assertEqual(decisions["Rejected"], base.filter(stage__in=["Fit", "Dev"], decision="Rejected").count())
+        # The stage facet ignores its own selection, so other stages keep their counts.
+        stages = {row["value"]: row["count"] for row in data["facets"]["stage"]}
+        self.assertEqual(stages["PPS"], base.filter(stage="PPS").count())
+        self.assertEqual(sum(row["count"] for row in data["facets"]["customer"]), data["total"])
+
+    def test_invalid_filter(self):
+        self.assertEqual(self.client.get("/inspections/facets/", {"stage": "Nope"}).status_code, 400)
+
+
+class SavedSearchTests(SeededAPITestCase):
+
+    def test_counts_and_execute(self):
+        rejected = Inspection.objects.filter(decision="Rejected")
+        self.client.post("/filter-presets/", {"name": "Fit", "filters": {"stage": ["Fit"]}}, format="json")
+        counts = {row["name"]: row for row in self.client.get("/filter-presets/counts/").data}
+        self.assertEqual((counts["Rejected"]["count"], counts["Rejected"]["new"]), (rejected.count(),) * 2)
+        self.assertEqual(counts["Fit"]["count"], Inspection.objects.filter(stage="Fit").count())
+
+        # A new inspection is added to the cached counts without recounting.
+        Inspection.objects.create(style="ST-NEW", decision="Rejected", stage="Dev", created_by=self.user)
+        counts = {row["name"]: row for row in self.client.get("/filter-presets/counts/").data}
+        self.assertEqual(counts["Rejected"]["count"], rejected.count())
+
+        url = f"/filter-presets/{self.preset.pk}/execute/"
+        data = self.client.get(url).data
+        self.assertEqual(len(data["results"]), data["count"])
+        self.assertEqual({row["decision"] for row in data["results"]}, {"Rejected"})
+        counts = {row["name"]: row for row in self.client.get("/filter-presets/counts/").data}
+        self.assertEqual(counts["Rejected"]["new"], 0)
+        # The cached preset list picks up last_viewed_at.
+        listed = {row["name"]: row for row in self.client.get("/filter-presets/").data}
+        self.assertIsNotNone(listed["Rejected"]["last_viewed_at"])
+
+        # Results come a page at a time, newest first.
+        pages, url = [], f"{url}?page_size=2"
+        while url:
+            data = self.client.get(url).data
+            pages.append(data["results"])
+            url = data["next"]
+        self.assertGreater(len(pages), 1)
+        self.assertTrue(all(len(page) <= 2 for page in pages))
+        self.assertEqual([row["id"] for page in pages for row in page],
+                         [str(pk) for pk in rejected.order_by("-created_at", "-id").values_list("pk", flat=True)])
+
+        # Editing an existing row can move it between presets: full recount.
+        self.client.patch(f"/inspections/{self.inspection.pk}/", {"decision": "Rejected"}, format="json")
+        counts = {row["name"]: row for row in self.client.get("/filter-presets/counts/").data}
+        self.assertEqual(counts["Rejected"]["count"], rejected.count())
+
+
+class BulkUpdateTests(SeededAPITestCase):
+
+    def test_bulk_update(self):
+        ids = list(Inspection.objects.order_by("style").values_list("pk", flat=True)[:20])
+        payload = {"ids": [str(pk) for pk in ids] + ["00000000-0000-0000-0000-000000000000"],
+                   "customer_decision": "Accepted", "stage": "PPS"}
+        response = self.client.post("/inspections/bulk-update/", payload, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data["updated"], len(response.data["not_found"])), (20, 1))
+        rows = Inspection.objects.filter(pk__in=ids)
+        self.assertEqual(set(rows.values_list("customer_decision", "stage")), {("Accepted", "PPS")})
+        self.assertEqual(set(rows.values_list("customer_feedback_date", flat=True)),
+                         {response.data["customer_feedback_date"]})
+
+    def test_nothing_to_change(self):
+        response = self.client.post("/inspections/bulk-update/", {"ids": [str(self.inspection.pk)]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class FeedbackImportTests(SeededAPITestCase):
+
+    def test_import_from_file(self):
+        first, second = Inspection.objects.order_by("style")[:2]
+        Inspection.objects.create(style=second.style, color=second.color, po_number=second.po_number,
+                                  stage=second.stage, created_by=self.user)
+        path = os.path.join(MEDIA_ROOT, "feedback.csv")
+        with open(path, "w", newline="") as fh:
+            fh.write("PO #,Style,Colour,Stage,Decision,Comments,Date\n"
+                     f"{first.po_number},{first.style},Navy,{first.stage.upper()},accepted,Bulk OK,2026-03-01\n"
+                     f"{second.po_number},{second.style},Navy,{second.stage},Rejected,,\n"
+                     "PO-X,ST-X,Navy,Fit,Accepted,,\n"
+                     f"{first.po_number},{first.style},Navy,{first.stage},Maybe,,\n")
+        report = import_feedback(read_file(path))
+        self.assertEqual((report.rows, report.matched, report.updated), (4, 1, 1))
+        self.assertEqual([row for row, *_ in report.ambiguous + report.unmatched + report.invalid], [3, 4, 5])
+        first.refresh_from_db()
+        self.assertEqual((first.customer_decision, first.customer_feedback_comments), ("Accepted", "Bulk OK"))
+        self.assertEqual(first.customer_feedback_date.date().isoformat(), "2026-03-01")
+
+    def test_blank_comments_keep_the_current_ones(self):
+        Inspection.objects.filter(pk=self.inspection.pk).update(customer_feedback_comments="Shade approved")
+        i = self.inspection
+        path = os.path.join(MEDIA_ROOT, "feedback-blank.csv")
+        with open(path, "w", newline="") as fh:
+            fh.write(f"PO,Style,Color,Stage,Decision,Comments\n{i.po_number},{i.style},{i.color},{i.stage},Rejected,\n")
+        self.assertEqual(import_feedback(read_file(path)).updated, 1)
+        i.refresh_from_db()
+        self.assertEqual((i.customer_decision, i.customer_feedback_comments), ("Rejected", "Shade approved"))
+
+    def test_sheet_errors_end_the_command_cleanly(self):
+        with self.assertRaises(CommandError):
+            call_command("import_feedback", "--sheet", "missing", "--credentials", "/nonexistent/sa.json",
+                         stdout=io.StringIO())
+
+
+class AuditHistoryTests(SeededAPITestCase):
+
+    def test_history(self):
+        measurements = self.measurement_payload()
+        measurements[0]["s1"] = 25.0
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/inspections/{self.inspection.pk}/",
+                              {"stage": "PPS", "measurements": measurements[:-1]}, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/inspections/bulk-update/",
+                             {"ids": [str(self.inspection.pk)], "decision": "Rejected"}, format="json")
+        data = self.client.get(f"/inspections/{self.inspection.pk}/history/", {"page_size": 1}).data
+        self.assertEqual(data["results"][0]["action"], "bulk_update")
+        self.assertEqual(data["results"][0]["user"], "inspector")
+        data = self.client.get(data["next"]).data
+        changes = data["results"][0]["changes"]
+        self.assertEqual(changes["stage"][1], "PPS")
+        self.assertEqual(changes["measurements"]["POM 0"]["s1"], [20.2, 25.0])
+        self.assertIsNone(changes["measurements"]["POM 11"][1])
+        self.assertIsNone(data["next"])
+
+
+class ReplicaRoutingTests(SeededAPITestCase):
+
+    def test_router(self):
+        router = routing.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Inspection))  # no replica scope outside opted-in views
+        with mock.patch.object(routing, "replica_configured", return_value=True), \
+                mock.patch.object(routing.health, "available", return_value=True):
+            # What ReplicaMiddleware and ReplicaReadMixin set up for a request.
+            tokens = (routing._reads.set(True), routing._wrote.set(False), routing._served.set(False))
+            try:
+                self.assertEqual(router.db_for_read(Inspection), routing.REPLICA_ALIAS)
+                self.assertEqual(router.db_for_write(Inspection), "default")
+                # After a write the rest of the request reads the primary.
+                self.assertIsNone(router.db_for_read(Inspection))
+            finally:
+                for var, token in zip((routing._reads, routing._wrote, routing._served), tokens):
+                    var.reset(token)
+        self.assertFalse(router.allow_migrate(routing.REPLICA_ALIAS, "qc"))
+
+    def test_read_your_writes(self):
+        # A write makes its user sticky to the primary; reads don't.
+        self.client.get("/inspections/")
+        self.assertFalse(routing.is_sticky(self.user))
+        self.client.patch(f"/inspections/{self.inspection.pk}/", {"remarks": "sticky"}, format="json")
+        self.assertTrue(routing.is_sticky(self.user))
+
+    def test_replica_needs_a_shared_cache(self):
+        with mock.patch.object(routing, "replica_configured", return_value=True):
+            with self.assertRaisesMessage(ImproperlyConfigured, "QC_CACHE_BACKEND"):
+                routing.ReplicaMiddleware(lambda request: None)
+            with mock.patch.object(routing.cache, "get_cache", return_value=mock.Mock()):
+                routing.ReplicaMiddleware(lambda request: None)
+
+
+class TimelineTests(SeededAPITestCase):
+
+    def test_stage_order_and_alignment(self):
+        for stage, s1 in (("PPS", 21.5), ("Fit", 20.7), ("Proto", 19.9)):
+            inspection = Inspection.objects.create(style="TL-1", color="Navy", stage=stage, created_by=self.user)
+            Measurement.objects.create(inspection=inspection, pom_name="Chest", tol=0.5, std=20, s1=s1)
+            if stage == "Fit":
+                Measurement.objects.create(inspection=inspection, pom_name="Waist", tol=0.5, std=40, s1=40.1)
+                Measurement.objects.create(inspection=inspection, pom_name="Hem", tol=0.5, std=30, s1=30.2)
+        Inspection.objects.create(style="TL-1", color="Black", stage="Dev", created_by=self.user)
+        data = self.client.get("/inspections/timeline/", {"style": "TL-1", "color": "Navy"}).data
+        self.assertEqual([i["stage"] for i in data["inspections"]], ["Proto", "Fit", "PPS"])
+        self.assertEqual([row["pom_name"] for row in data["poms"]], ["Chest", "Hem", "Waist"])
+        poms = {row["pom_name"]: row["cells"] for row in data["poms"]}
+        self.assertEqual([cell["samples"][0] for cell in poms["Chest"]], [19.9, 20.7, 21.5])
+        self.assertEqual([cell is not None for cell in poms["Hem"]], [False, True, False])
+        self.assertEqual(self.client.get("/inspections/timeline/").status_code, 400)
+
+
+class ThrottlingTests(SeededAPITestCase):
+
+    def test_expensive_actions_are_throttled(self):
+        url = f"/inspections/{self.inspection.pk}/pdf/"
+        with mock.patch.object(throttling, "USER_BURST", 10), mock.patch.object(throttling, "GLOBAL_BURST", 15):
+            for _ in range(2):
+                self.assertEqual(self.client.get(url).status_code, 200)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response["Retry-After"], "10")  # 5 tokens at 30/min
+            # Uncosted actions and other users are unaffected...
+            self.assertEqual(self.client.get("/inspections/").status_code, 200)
+            other = APIClient()
+            other.force_authenticate(User.objects.create_user("qa2", password="x"))
+            self.assertEqual(other.get(url).status_code, 200)
+            # ...until the global bucket runs dry.
+            self.assertEqual(other.get(url).status_code, 429)
+
+
+class ResponseEncodingTests(SeededAPITestCase):
+
+    def test_renderer_matches_json_renderer(self):
+        data = self.client.get(f"/inspections/{self.inspection.pk}/").data
+        data["remarks"] = "line\u2028break\u2029 caf\u00e9"
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # The documented float differences.
+        self.assertEqual(FastJSONRenderer().render([1e16]), b"[1e16]")
+        self.assertEqual(FastJSONRenderer().render([float("nan")]), b"[null]")
+        with self.assertRaises(ValueError):
+            JSONRenderer().render([float("nan")])
+
+    def test_negotiated_compression(self):
+        identity = self.client.get("/inspections/")
+        self.assertGreaterEqual(len(identity.content), compression.MIN_BYTES)
+        self.assertNotIn("Content-Encoding", identity)
+        self.assertIn("Accept-Encoding", identity["Vary"])
+
+        response = self.client.get("/inspections/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["ETag"], f"W/{identity['ETag']}")
+        # The weak tag still validates.
+        self.assertEqual(self.client.get("/inspections/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        refused = self.client.get("/inspections/", HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertNotIn("Content-Encoding", refused)
+        preferred = self.client.get("/inspections/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(preferred["Content-Encoding"], "gzip" if compression.brotli is None else "br")
+
+    def test_small_responses_are_left_alone(self):
+        with mock.patch.object(compression, "MIN_BYTES", 10 ** 9):
+            response = self.client.get("/inspections/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertFalse(response.has_header("Vary") and "Accept-Encoding" in response["Vary"])
+
+
+class JWTUserCacheTests(SeededAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_saving_a_user_evicts_it(self):
+        self.assertEqual(self.client.get("/customers/").status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get("/customers/").status_code, 200)  # served from the cache
+        self.user.refresh_from_db()
+        self.user.save()
+        self.assertEqual(self.client.get("/customers/").status_code, 401)
+
+    def test_per_process_cache_keeps_users_briefly(self):
+        with mock.patch.object(authentication, "USER_CACHE_TIMEOUT", 300):
+            self.assertEqual(authentication.user_cache_timeout(), authentication.LOCAL_USER_CACHE_TIMEOUT)
+            with mock.patch.object(authentication, "get_cache", return_value=mock.Mock()):
+                self.assertEqual(authentication.user_cache_timeout(), 300)
+
+
+class ConditionalGetTests(SeededAPITestCase):
+
+    def test_inspection_validators(self):
+        url = f"/inspections/{self.inspection.pk}/"
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=f"W/{etag}").status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        pdf = self.client.get(f"{url}pdf/")
+        self.assertEqual(self.client.get(f"{url}pdf/", HTTP_IF_NONE_MATCH=pdf["ETag"]).status_code, 304)
+        self.client.patch(url, {"remarks": "changed"}, format="json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(f"{url}pdf/", HTTP_IF_NONE_MATCH=pdf["ETag"]).status_code, 200)
+
+    def test_child_rows_change_their_parent(self):
+        etag = self.client.get("/customers/")["ETag"]
+        self.assertEqual(self.client.get("/customers/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.post(f"/customers/{self.customer.pk}/add_email/", {"email": "new@example.com"})
+        self.assertEqual(self.client.get("/customers/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_tags_follow_the_query(self):
+        etag = self.client.get("/templates/")["ETag"]
+        self.assertEqual(self.client.get("/templates/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get("/templates/", {"search": "x"}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class EventStreamTests(SeededAPITestCase):
+
+    async def test_publish_subscribe_round_trip(self):
+        broker = events.EventBroker(history_size=3)
+        sub = broker.subscribe(types={"inspection"})
+        # Writers publish from their own threads.
+        await asyncio.to_thread(broker.publish, "feedback", "imported", {})
+        published = await asyncio.to_thread(broker.publish, "inspection", "created", {"id": "x"})
+        self.assertEqual(await sub.get(1), published)
+        self.assertTrue(sub.queue.empty())
+        sub.close()
+        self.assertEqual(broker.subscriber_count, 0)
+
+        # Reconnecting clients get what they missed, or a resync once it has left the history.
+        self.assertEqual(await broker.subscribe(last_event_id=1).get(1), published)
+        for _ in range(3):
+            broker.publish("inspection", "updated", {})
+        self.assertEqual((await broker.subscribe(last_event_id=1).get(1))["type"], "resync")
+
+    async def test_event_stream(self):
+        token = AccessToken.for_user(self.user)
+        with mock.patch.object(events, "broker", events.EventBroker()):
+            self.assertEqual((await self.async_client.get("/events/")).status_code, 401)
+            response = await self.async_client.get("/events/", {"token": str(token), "types": "inspection"})
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            stream = aiter(response.streaming_content)
+            self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+            await asyncio.to_thread(events.publish, "inspection", "deleted", {"ids": ["x"]})
+            chunk = (await anext(stream)).decode()
+            await stream.aclose()
+        self.assertTrue(chunk.startswith("id: 1\nevent: inspection\ndata: "))
+        self.assertEqual(json.loads(chunk.split("data: ", 1)[1])["data"], {"ids": ["x"]})
+
+
+class AsyncViewTests(SeededAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.auth = {"AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.pdf_url = f"/async/inspections/{self.inspection.pk}/pdf/"
+
+    @override_settings(DEBUG=True)
+    async def test_middleware_chain_runs_async(self):
+        # With DEBUG, Django logs on django.request whenever it adapts a sync-only middleware.
+        with self.assertNoLogs("django.request", "DEBUG"):
+            response = await self.async_client.get(self.pdf_url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    async def test_upload_and_email(self):
+        url = f"/async/inspections/{self.inspection.pk}/"
+        upload = SimpleUploadedFile("photo.jpg", make_photo(800, 600), content_type="image/jpeg")
+        response = await self.async_client.post(f"{url}upload_image/", {"image": upload, "caption": "Front"},
+                                                headers=self.auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await InspectionImage.objects.filter(inspection=self.inspection, caption="Front").aexists())
+
+        response = await self.async_client.post(f"{url}send_email/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(mail.outbox[0].attachments), 1)
+
+    async def test_posts_need_no_csrf_token(self):
+        client = AsyncClient(enforce_csrf_checks=True)
+        response = await client.post(f"/async/inspections/{self.inspection.pk}/send_email/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+
+    async def test_error_responses(self):
+        response = await self.async_client.get(self.pdf_url, headers={"AUTHORIZATION": "Bearer nonsense"})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(f"/async/inspections/{uuid.uuid4()}/pdf/", headers=self.auth)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual((await self.async_client.post(self.pdf_url, headers=self.auth)).status_code, 405)
+
+        with mock.patch("qc.async_views.run_cpu_bound", side_effect=ExecutorBusy):
+            response = await self.async_client.get(self.pdf_url, headers=self.auth)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+
+        with mock.patch.object(throttling, "USER_BURST", 5):
+            self.assertEqual((await self.async_client.get(self.pdf_url, headers=self.auth)).status_code, 200)
+            response = await self.async_client.get(self.pdf_url, headers=self.auth)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "10")
+
+
+class GenerateScaleDataTests(TestCase):
+
+    def generate(self, *args):
+        call_command("generate_scale_data", "--inspections", "20", "--customers", "3", "--templates", "3",
+                     "--users", "2", "--prefix", "T", *args, stdout=io.StringIO())
+
+    def assertVersionsBumped(self, before):
+        after = cache.get_versions((Inspection, Customer, MEMBERSHIP))
+        for old, new in zip(before, after):
+            self.assertNotEqual(old, new)
+        return after
+
+    def test_generate_and_clear_refresh_the_cache(self):
+        versions = cache.get_versions((Inspection, Customer, MEMBERSHIP))
+        self.generate()
+        self.assertEqual(Inspection.objects.filter(style__startswith="T-").count(), 20)
+        versions = self.assertVersionsBumped(versions)
+
+        with self.assertRaisesMessage(CommandError, "--clear"):
+            self.generate()
+        self.generate("--clear")
+        self.assertFalse(Inspection.objects.filter(style__startswith="T-").exists())
+        self.assertVersionsBumped(versions)
+
+
+class ProfilingTests(SeededAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        for name, value in (("PROFILE_DIR", directory), ("PROFILE_ENABLED", True)):
+            patcher = mock.patch.object(profiling, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_flagged_request_is_profiled(self):
+        response = self.client.get("/inspections/", HTTP_X_QC_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-QC-Profile"]
+        self.assertEqual([p["id"] for p in self.client.get("/profiles/").data], [profile_id])
+        meta = self.client.get(f"/profiles/{profile_id}/").data
+        self.assertEqual((meta["mode"], meta["path"], meta["status"]), ("full", "/inspections/", 200))
+        self.assertEqual(meta["query_count"], len(meta["queries"]))
+        self.assertTrue(meta["queries"])
+        self.assertTrue(meta["top_functions"])
+        download = self.client.get(f"/profiles/{profile_id}/prof/")
+        self.assertEqual(download.status_code, 200)
+        self.assertIn(f"{profile_id}.prof", download["Content-Disposition"])
+        download.close()
+
+        # One per user per cooldown.
+        self.assertEqual(self.client.get("/inspections/", HTTP_X_QC_PROFILE="1")["X-QC-Profile"], "skipped")
+
+    def test_only_staff_and_only_when_enabled(self):
+        with mock.patch.object(profiling, "PROFILE_ENABLED", False):
+            self.assertNotIn("X-QC-Profile", self.client.get("/inspections/", HTTP_X_QC_PROFILE="1"))
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        django_cache.clear()
+        self.assertNotIn("X-QC-Profile", self.client.get("/inspections/", HTTP_X_QC_PROFILE="1"))
+        self.assertEqual(os.listdir(profiling.PROFILE_DIR), [])
+
+
+class MetricsRegistryTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(metrics, "registry", metrics.Registry())
+        self.registry = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.requests = metrics.Counter("t_requests", "Requests.", ("status",))
+        self.latency = metrics.Histogram("t_latency", "Latency.", buckets=(0.1, 1.0))
+        self.requests.inc(status=200)
+        self.requests.inc(2, status=500)
+        self.latency.observe(0.0625)
+        self.latency.observe(3.0)
+
+    def test_render(self):
+        self.assertEqual(self.registry.render(), "\n".join([
+            "# HELP t_latency Latency.",
+            "# TYPE t_latency histogram",
+            't_latency_bucket{le="0.1"} 1',
+            't_latency_bucket{le="1.0"} 1',
+            't_latency_bucket{le="+Inf"} 2',
+            "t_latency_sum 3.0625",
+            "t_latency_count 2",
+            "# HELP t_requests_total Requests.",
+            "# TYPE t_requests_total counter",
+            't_requests_total{status="200"} 1',
+            't_requests_total{status="500"} 2',
+        ]) + "\n")
+
+    def test_render_merges_worker_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with mock.patch.object(metrics, "METRICS_DIR", directory):
+            self.registry.flush()  # our own file is not counted twice
+            with open(os.path.join(directory, "qc-1.json"), "w") as fh:
+                json.dump({"t_requests": {'["200"]': 4, '["404"]': 1}, "t_latency": {"[]": [0, 1, 0, 0.5]},
+                           "t_removed": {"[]": 3}}, fh)
+            with open(os.path.join(directory, "qc-2.json"), "w") as fh:
+                fh.write('{"t_requests": ')  # torn or foreign files are skipped
+            rendered = self.registry.render().splitlines()
+        for line in ['t_requests_total{status="200"} 5', 't_requests_total{status="404"} 1',
+                     't_requests_total{status="500"} 2', 't_latency_bucket{le="0.1"} 1',
+                     't_latency_bucket{le="1.0"} 2', 't_latency_bucket{le="+Inf"} 3',
+                     "t_latency_sum 3.5625", "t_latency_count 3"]:
+            self.assertIn(line, rendered)
+        self.assertFalse(any(line.startswith("t_removed") for line in rendered))
+
+
+class SlowQueryLogTests(TestCase):
+
+    def test_view_that_raises_still_logs_its_slow_queries(self):
+        def view(request):
+            list(Inspection.objects.filter(style="SLOW-1"))
+            raise RuntimeError("boom")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "slow.jsonl")
+            with mock.patch.object(slowlog, "SLOW_QUERY_MS", 0), mock.patch.object(slowlog, "SLOW_QUERY_LOG", path):
+                with self.assertRaises(RuntimeError), self.assertLogs("qc.slow_query", "WARNING"):
+                    slowlog.SlowQueryMiddleware(view)(RequestFactory().get("/inspections/"))
+            entries = list(slowlog.read_entries(path))
+        self.assertEqual(len(entries), 1)
+        self.assertIn('FROM "qc_inspection"', entries[0]["sql"])
+        self.assertEqual((entries[0]["route"], entries[0]["method"]), ("unmatched", "GET"))
+        self.assertIsNotNone(entries[0]["plan"])
+        # Literal values don't split a query shape.
+        self.assertEqual(slowlog.fingerprint("SELECT * FROM t WHERE a = 'x' AND b IN (1, 2)"),
+                         slowlog.fingerprint("SELECT * FROM t WHERE a = 'y' AND b IN (3)"))
+
+
+class MicroBenchmarkTests(BudgetMixin, TestCase):
+    """Budgets for the CPU-heavy internals, outside the request cycle."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_data(inspections=1, measurements=60, images=0)
+        cls.inspection = Inspection.objects.get()
+
+    def test_generate_pdf_buffer_many_measurements(self):
+        inspection = Inspection.objects.select_related("customer").prefetch_related(
+            "measurements", "images").get(pk=self.inspection.pk)
+        with self.budget(max_queries=0, max_seconds=1.0):
+            buffer = generate_pdf_buffer(inspection)
+        self.assertGreater(len(buffer.getvalue()), 1000)
+
+    @override_settings(MEDIA_ROOT=MEDIA_ROOT)
+    def test_generate_pdf_buffer_with_images(self):
+        photo = ContentFile(make_photo(1600, 1200), name="pdf.jpg")
+        for n in range(4):
+            InspectionImage.objects.create(inspection=self.inspection, caption=f"Image {n}", image=photo)
+        inspection = Inspection.objects.select_related("customer").prefetch_related(
+            "measurements", "images").get(pk=self.inspection.pk)
+        with self.budget(max_queries=0, max_seconds=3.0):
+            generate_pdf_buffer(inspection)
+
+    def test_compress_image_photo(self):
+        upload = SimpleUploadedFile("photo.jpg", make_photo(4000, 3000), content_type="image/jpeg")
+        with self.budget(max_queries=0, max_seconds=4.0):
+            compressed = compress_image(upload)
+        with Image.open(compressed) as result:
+            self.assertEqual(result.format, "WEBP")
+            self.assertLessEqual(max(result.size), 1600)
+
+    def test_compress_image_transparent_png(self):
+        upload = SimpleUploadedFile("logo.png", make_photo(2000, 2000, mode="RGBA", fmt="PNG"),
+                                    content_type="image/png")
+        with self.budget(max_queries=0, max_seconds=5.0):
+            compressed = compress_image(upload)
+        with Image.open(compressed) as result:
+            self.assertEqual(result.mode, "RGB")
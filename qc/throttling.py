@@ -0,0 +1,138 @@
+# qc/throttling.py
+"""
+Token-bucket throttling for the expensive inspection actions.
+
+Rendering a PDF, compressing an upload or sending a report email costs far
+more than a list call, so those actions draw tokens from two buckets: one
+per user (per client IP when anonymous) and one global bucket shared by
+everybody. A bucket holds up to *burst* tokens and refills continuously at
+*per_minute* tokens a minute; an action costs QC_THROTTLE_COSTS[action]
+tokens and is refused with ``429 Too Many Requests`` and ``Retry-After``
+when either bucket can't cover it. Actions without a cost (lists,
+retrieves, edits) are never throttled, so a flood of PDF downloads can't
+lock anyone out of normal traffic.
+
+Bucket state lives in the app cache (qc/cache.py), so it is shared between
+gunicorn workers with the db or redis backends; with locmem each worker
+keeps its own buckets. Updates are serialised with a short ``cache.add``
+lock; if the cache is unavailable requests are let through.
+
+DRF views pick this up from DEFAULT_THROTTLE_CLASSES; the ASGI variants in
+qc/async_views.py call check() directly.
+"""
+import logging
+import math
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from . import cache, metrics
+
+logger = logging.getLogger(__name__)
+
+ENABLED = getattr(settings, "QC_THROTTLE_ENABLED", True)
+USER_PER_MINUTE = getattr(settings, "QC_THROTTLE_USER_PER_MINUTE", 30)
+USER_BURST = getattr(settings, "QC_THROTTLE_USER_BURST", 30)
+GLOBAL_PER_MINUTE = getattr(settings, "QC_THROTTLE_GLOBAL_PER_MINUTE", 240)
+GLOBAL_BURST = getattr(settings, "QC_THROTTLE_GLOBAL_BURST", 120)
+COSTS = getattr(settings, "QC_THROTTLE_COSTS", {"pdf": 5, "upload_image": 3, "send_email": 10})
+LOCK_SECONDS = 2
+LOCK_ATTEMPTS = 20
+
+
+class Bucket:
+    def __init__(self, key, per_minute, burst):
+        self.key = f"qc:throttle:{key}"
+        self.rate = per_minute / 60.0
+        self.burst = burst
+
+    def level(self, state, now):
+        """Tokens in the bucket at ``now`` given its stored (tokens, stamp) state."""
+        if state is None:
+            return self.burst
+        tokens, stamp = state
+        return min(self.burst, tokens + max(0.0, now - stamp) * self.rate)
+
+    def wait(self, tokens, cost):
+        return (cost - tokens) / self.rate
+
+    @property
+    def timeout(self):
+        # Long enough to refill completely; a missing bucket is a full one.
+        return math.ceil(self.burst / self.rate) + 1
+
+
+def _lock(store, keys):
+    held = []
+    for key in keys:
+        for _ in range(LOCK_ATTEMPTS):
+            if store.add(f"{key}:lock", 1, LOCK_SECONDS):
+                held.append(f"{key}:lock")
+                break
+            time.sleep(0.005)
+        # A lock we couldn't get within ~0.1s belongs to a stuck worker; go ahead without it.
+    return held
+
+
+def consume(buckets, cost):
+    """Take ``cost`` tokens from every bucket or from none; returns 0 or the seconds to wait."""
+    store = cache.get_cache()
+    keys = [bucket.key for bucket in buckets]
+    held = _lock(store, keys)
+    try:
+        now = time.time()
+        states = store.get_many(keys)
+        levels = [bucket.level(states.get(bucket.key), now) for bucket in buckets]
+        # A cost above a bucket's burst could never be paid; cap it at a full bucket.
+        short = [bucket.wait(tokens, min(cost, bucket.burst))
+                 for bucket, tokens in zip(buckets, levels) if tokens < min(cost, bucket.burst)]
+        if short:
+            return max(short)
+        for bucket, tokens in zip(buckets, levels):
+            store.set(bucket.key, (tokens - min(cost, bucket.burst), now), bucket.timeout)
+        return 0
+    finally:
+        if held:
+            store.delete_many(held)
+
+
+def buckets_for(ident):
+    return [
+        Bucket(f"user:{ident}", USER_PER_MINUTE, USER_BURST),
+        Bucket("global", GLOBAL_PER_MINUTE, GLOBAL_BURST),
+    ]
+
+
+def identity(request):
+    """Bucket key for the requester: the user id, or the client IP when anonymous."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return BaseThrottle().get_ident(request)
+
+
+def check(action, request):
+    """Charge ``action`` to the requester; returns 0 when allowed, else the seconds until it would be."""
+    cost = COSTS.get(action, 0)
+    if not (ENABLED and cost):
+        return 0
+    try:
+        delay = consume(buckets_for(identity(request)), cost)
+    except Exception:
+        logger.warning("Throttle cache unavailable; letting %s through", action, exc_info=True)
+        return 0
+    if delay:
+        metrics.THROTTLED.inc(action=action)
+    return delay
+
+
+class CostThrottle(BaseThrottle):
+    """DEFAULT_THROTTLE_CLASSES entry: charges the viewset action its QC_THROTTLE_COSTS weight."""
+
+    def allow_request(self, request, view):
+        self.delay = check(getattr(view, "action", None), request)
+        return not self.delay
+
+    def wait(self):
+        return self.delay
@@ -0,0 +1,58 @@
+# qc/timeline.py
+"""
+Lifecycle of one style across stages, with measurements aligned by POM.
+
+Fetches every inspection of the style (optionally one color/customer)
+through the (style, color) index, with their measurements in one prefetch
+query, and lays them out as a matrix: one column per inspection in stage
+order (Dev → Proto → Fit → SMS → Size Set → PPS → Shipment Sample,
+resubmissions by date), one row per POM in order of first appearance
+(alphabetical within an inspection; measurements keep no sheet position),
+and a cell per (POM, inspection) or null where that stage didn't measure it.
+
+    GET /inspections/timeline/?style=ST-1001&color=Navy
+    {"style": "ST-1001",
+     "inspections": [{"id", "stage", "color", "po_number", "decision", "customer", "created_at"}, ...],
+     "poms": [{"pom_name": "Chest", "cells": [{"std": 20, "tol": 0.5, "samples": [20.1, ...], "status": "OK"}, null, ...]}]}
+"""
+from django.db.models import Prefetch
+
+from .models import Inspection, Measurement
+
+STAGE_ORDER = {value: index for index, (value, _) in enumerate(Inspection.STAGE_CHOICES)}
+SAMPLE_FIELDS = ("s1", "s2", "s3", "s4", "s5", "s6")
+COLUMN_FIELDS = ("id", "style", "color", "po_number", "stage", "decision", "customer_id", "created_at")
+
+
+def style_timeline(style, color=None, customer=None):
+    queryset = Inspection.objects.filter(style=style)
+    if color is not None:
+        queryset = queryset.filter(color=color)
+    if customer is not None:
+        queryset = queryset.filter(customer_id=customer)
+    measurements = Measurement.objects.only(
+        "inspection", "pom_name", "tol", "std", "status", *SAMPLE_FIELDS).order_by("pom_name", "id")
+    inspections = sorted(
+        queryset.only(*COLUMN_FIELDS).prefetch_related(Prefetch("measurements", queryset=measurements)),
+        key=lambda i: (STAGE_ORDER.get(i.stage, len(STAGE_ORDER)), i.created_at),
+    )
+
+    rows = {}
+    for column, inspection in enumerate(inspections):
+        for m in inspection.measurements.all():
+            cells = rows.setdefault(m.pom_name, [None] * len(inspections))
+            cells[column] = {
+                "std": m.std,
+                "tol": m.tol,
+                "samples": [getattr(m, name) for name in SAMPLE_FIELDS],
+                "status": m.status,
+            }
+    return {
+        "style": style,
+        "inspections": [
+            {"id": i.pk, "stage": i.stage, "color": i.color, "po_number": i.po_number, "decision": i.decision,
+             "customer": i.customer_id, "created_at": i.created_at}
+            for i in inspections
+        ],
+        "poms": [{"pom_name": name, "cells": cells} for name, cells in rows.items()],
+    }
@@ -2,29 +2,43 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.core.mail import EmailMessage
 from django.conf import settings
 from django.http import FileResponse
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.utils import ImageReader
-from PIL import Image as PILImage
-from .models import Customer, CustomerEmail, Template, Inspection, InspectionImage, Measurement, FilterPreset
+import os
+import pstats
+import uuid
+from .models import Customer, CustomerEmail, Template, TemplatePOM, Inspection, InspectionImage, Measurement, FilterPreset, ArchivedInspection, AuditEntry, User
 from .serializers import (
     CustomerSerializer, CustomerEmailSerializer, TemplateSerializer, 
     InspectionSerializer, InspectionListSerializer, CustomTokenObtainPairSerializer,
-    InspectionCopySerializer, FilterPresetSerializer
+    InspectionCopySerializer, FilterPresetSerializer, ArchivedInspectionListSerializer,
+    InspectionBulkUpdateSerializer
 )
-from django.db.models import Prefetch
-from .filters import InspectionFilter
+from .filters import InspectionFilter, ArchivedInspectionFilter
+from . import archive, audit, bulk, cache, facets, metrics, profiling, savedsearch, timeline
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .fastpath import FastListMixin, values_serializer
+from .routing import ReplicaReadMixin
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
+# reportlab, PIL and django.core.mail are imported inside the functions that use
+# them, so a cold start serving list/retrieve traffic never pays for loading
+# them. qc/warmup.py can preload them ahead of the first request instead.
+
 def generate_pdf_buffer(inspection):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from PIL import Image as PILImage
+
+    stages = metrics.StageTimer(metrics.PDF_STAGE_SECONDS)
     buffer = io.BytesIO()
     p = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
@@ -83,6 +97,7 @@ def generate_pdf_buffer(inspection):
     y_pos -= 2
     p.line(50, y_pos, 550, y_pos)
     y_pos -= 12
+    stages.mark("header")
 
     # Measurements Table
     p.setFont("Helvetica", 8)
@@ -119,6 +134,7 @@ def generate_pdf_buffer(inspection):
             y_pos = height - 50
 
     p.setFillColorRGB(0, 0, 0)
+    stages.mark("measurements")
     
     # --- Comment Sections ---
     y_pos -= 30
@@ -180,6 +196,7 @@ def generate_pdf_buffer(inspection):
 
     # 4. Final Remarks
     draw_text_block("Final Remarks:", inspection.remarks)
+    stages.mark("comments")
 
     # --- Page 2: Images ---
     images = inspection.images.all()
@@ -197,7 +214,8 @@ def generate_pdf_buffer(inspection):
             if i >= 4: break
             x, y = positions[i]
             try:
-                with PILImage.open(img_obj.image.path) as pil_img:
+                # open() rather than .path: works with remote storage (GCS) too.
+                with img_obj.image.open("rb") as fh, PILImage.open(fh) as pil_img:
                     if pil_img.mode in ("RGBA", "P"): pil_img = pil_img.convert("RGB")
                     pil_img.thumbnail((800, 800))
                     img_buffer = io.BytesIO()
@@ -213,14 +231,92 @@ def generate_pdf_buffer(inspection):
                 p.drawCentredString(x + 125, y - 15, caption)
             except Exception as e:
                 p.drawString(x, y, "Error loading image")
+    stages.mark("images")
 
     p.save()
     buffer.seek(0)
+    stages.mark("save")
+    metrics.PDFS_RENDERED.inc()
     return buffer
 
-class InspectionViewSet(viewsets.ModelViewSet):
+def compress_image(image_file):
+    """Normalise an uploaded photo to an RGB WebP (max 1600px) ready for storage."""
+    from PIL import Image as PILImage
+    from django.core.files.base import ContentFile
+
+    stages = metrics.StageTimer(metrics.IMAGE_STAGE_SECONDS)
+    with PILImage.open(image_file) as img:
+        img.load()
+        stages.mark("decode")
+
+        # Convert RGBA/P to RGB for WebP compatibility
+        if img.mode in ("RGBA", "P", "LA"):
+            # Create white background for transparency
+            rgb_img = PILImage.new("RGB", img.size, (255, 255, 255))
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
+            img = rgb_img
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        stages.mark("convert")
+        
+        # Resize to max 1600x1600 (maintains aspect ratio)
+        img.thumbnail((1600, 1600), PILImage.Resampling.LANCZOS)
+        stages.mark("resize")
+        
+        # Save as WebP with quality 85
+        compressed_buffer = io.BytesIO()
+        img.save(compressed_buffer, format='WEBP', quality=85, method=6)
+        compressed_buffer.seek(0)
+        stages.mark("encode")
+        
+        # Create filename with .webp extension
+        original_name = image_file.name.rsplit('.', 1)[0] if '.' in image_file.name else image_file.name
+        webp_filename = f"{original_name}.webp"
+        
+        # Create Django File object
+        return ContentFile(compressed_buffer.read(), name=webp_filename)
+
+NO_RECIPIENTS_ERROR = "No 'To' recipients found. Add at least one 'To' email to the Customer first."
+
+def build_inspection_email(inspection):
+    """Build the report email (without the PDF). Returns None if there is no 'To' recipient."""
+    from django.core.mail import EmailMessage
+
+    # Separate emails by type (To/CC)
+    if inspection.customer:
+        to_emails = list(inspection.customer.emails.filter(email_type='to').values_list('email', flat=True))
+        cc_emails = list(inspection.customer.emails.filter(email_type='cc').values_list('email', flat=True))
+    else:
+        to_emails = []
+        cc_emails = []
+        
+    if not to_emails:
+        return None
+
+    # Updated Subject and Body
+    date_str = inspection.created_at.strftime('%Y-%m-%d')
+    subject = f"{inspection.customer.name if inspection.customer else 'N/A'} - PO: {inspection.po_number} - Style: {inspection.style} - Color: {inspection.color or 'N/A'} - {date_str} - Decision: {inspection.decision}"
+    
+    body = (
+        f"Dear Team,\n\n"
+        f"Please find attached the sample evaluation report against the titled style.\n\n"
+        f"Style: {inspection.style}\n"
+        f"PO Number: {inspection.po_number}\n"
+        f"Stage: {inspection.stage}\n"
+        f"Decision: {inspection.decision}\n\n"
+        f"Thank you."
+    )
+    return EmailMessage(subject, body, settings.EMAIL_HOST_USER, to_emails, cc=cc_emails)
+
+class InspectionViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Inspection.objects.all()
     serializer_class = InspectionSerializer
+    cache_models = (Inspection, Measurement, InspectionImage, Customer)
+    conditional_actions = ("list", "retrieve", "pdf")
+    conditional_related = ("customer",)  # the PDF prints the customer's name
+    replica_actions = ("list", "retrieve", "pdf", "facets", "history", "timeline")
     
     # Use django-filter for advanced filtering + ordering
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -230,13 +326,22 @@ class InspectionViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         queryset = Inspection.objects.select_related('customer', 'template', 'created_by').order_by("-created_at")
-        if self.action != 'list' or self.action == 'retrieve':
-            queryset = queryset.prefetch_related(
-                'measurements', 
-                Prefetch('images', queryset=InspectionImage.objects.only('id', 'caption'))
-            )
+        if self.action == 'retrieve':
+            # InspectionCopySerializer doesn't render images
+            queryset = queryset.prefetch_related('measurements')
+        elif self.action != 'list':
+            # Full image rows: a deferred Prefetch here cost one query per image
+            queryset = queryset.prefetch_related('measurements', 'images')
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # ?include_archived=1 adds matching rows from the archive (qc/archive.py)
+        if archive.include_archived(request):
+            return self.cached_response(
+                lambda request, *args, **kwargs: Response(archive.list_with_archived(self, request)),
+                request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.action == 'list':
             return InspectionListSerializer
@@ -248,8 +353,61 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Save the user who created this report
         serializer.save(created_by=self.request.user)
 
+    @action(detail=False, methods=["post"], url_path="bulk-update")
+    def bulk_update(self, request):
+        """Set decision/stage/customer feedback on many inspections at once (qc/bulk.py)."""
+        serializer = InspectionBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        ids = changes.pop("ids")
+        updated, not_found, feedback_date = bulk.bulk_update_inspections(ids, changes, request.user)
+        return Response({"updated": updated, "not_found": not_found, "customer_feedback_date": feedback_date})
+
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """Field-level change history, newest first (qc/audit.py). Kept after the inspection is deleted."""
+        try:
+            inspection_id = uuid.UUID(str(pk))
+        except ValueError:
+            return Response({"error": "Invalid inspection id"}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = audit.HistoryPagination()
+        entries = paginator.paginate_queryset(
+            AuditEntry.objects.filter(inspection_id=inspection_id), request, view=self)
+        users = dict(User.objects.filter(pk__in={e.user_id for e in entries if e.user_id})
+                     .values_list("pk", "username"))
+        return paginator.get_paginated_response([
+            {"id": e.id, "at": e.created_at, "user": users.get(e.user_id), "action": e.action,
+             "changes": e.changes}
+            for e in entries
+        ])
+
+    @action(detail=False, methods=["get"])
+    def timeline(self, request):
+        """One style's inspections in stage order with measurements aligned by POM (qc/timeline.py)."""
+        style = request.query_params.get("style", "").strip()
+        if not style:
+            return Response({"error": "style is required"}, status=status.HTTP_400_BAD_REQUEST)
+        color = request.query_params.get("color")
+        customer = request.query_params.get("customer") or None
+        if customer is not None:
+            try:
+                customer = uuid.UUID(customer)
+            except ValueError:
+                return Response({"error": "Invalid customer id"}, status=status.HTTP_400_BAD_REQUEST)
+        data = cache.get_or_set("style-timeline", (Inspection, Measurement, Customer), (style, color, customer),
+                                lambda: timeline.style_timeline(style, color, customer))
+        return Response(data)
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """Counts per decision, stage, customer and customer decision under the current filters."""
+        return Response(facets.facet_counts(request.query_params))
+
     @action(detail=True, methods=["get"])
     def pdf(self, request, pk=None):
+        return self.conditional_response(self.render_pdf, request, pk=pk)
+
+    def render_pdf(self, request, pk=None):
         inspection = self.get_object()
         buffer = generate_pdf_buffer(inspection)
         return FileResponse(buffer, filename=f"{inspection.style}_Report.pdf", content_type="application/pdf")
@@ -264,83 +422,75 @@ class InspectionViewSet(viewsets.ModelViewSet):
             return Response({"error": "No image provided"}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Open and compress the image
-            with PILImage.open(image_file) as img:
-                # Convert RGBA/P to RGB for WebP compatibility
-                if img.mode in ("RGBA", "P", "LA"):
-                    # Create white background for transparency
-                    rgb_img = PILImage.new("RGB", img.size, (255, 255, 255))
-                    if img.mode == "P":
-                        img = img.convert("RGBA")
-                    rgb_img.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
-                    img = rgb_img
-                elif img.mode != "RGB":
-                    img = img.convert("RGB")
-                
-                # Resize to max 1600x1600 (maintains aspect ratio)
-                img.thumbnail((1600, 1600), PILImage.Resampling.LANCZOS)
-                
-                # Save as WebP with quality 85
-                compressed_buffer = io.BytesIO()
-                img.save(compressed_buffer, format='WEBP', quality=85, method=6)
-                compressed_buffer.seek(0)
-                
-                # Create filename with .webp extension
-                original_name = image_file.name.rsplit('.', 1)[0] if '.' in image_file.name else image_file.name
-                webp_filename = f"{original_name}.webp"
-                
-                # Create Django File object
-                from django.core.files.base import ContentFile
-                compressed_file = ContentFile(compressed_buffer.read(), name=webp_filename)
-                
+            compressed_file = compress_image(image_file)
+            with metrics.IMAGE_STAGE_SECONDS.time(stage="store"):
                 InspectionImage.objects.create(
                     inspection=inspection,
                     image=compressed_file,
                     caption=caption
                 )
-                return Response({"status": "Image uploaded and compressed"}, status=status.HTTP_201_CREATED)
+            metrics.IMAGES_PROCESSED.inc(result="ok")
+            return Response({"status": "Image uploaded and compressed"}, status=status.HTTP_201_CREATED)
                 
         except Exception as e:
+            metrics.IMAGES_PROCESSED.inc(result="error")
             return Response({"error": f"Image processing failed: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=["post"])
     def send_email(self, request, pk=None):
         inspection = self.get_object()
         
-        # Separate emails by type (To/CC)
-        if inspection.customer:
-            to_emails = list(inspection.customer.emails.filter(email_type='to').values_list('email', flat=True))
-            cc_emails = list(inspection.customer.emails.filter(email_type='cc').values_list('email', flat=True))
-        else:
-            to_emails = []
-            cc_emails = []
-            
-        if not to_emails:
-             return Response({"error": "No 'To' recipients found. Add at least one 'To' email to the Customer first."}, status=status.HTTP_400_BAD_REQUEST)
+        stages = metrics.StageTimer(metrics.EMAIL_STAGE_SECONDS)
+        email = build_inspection_email(inspection)
+        stages.mark("build")
+        if email is None:
+            metrics.EMAILS_SENT.inc(result="no_recipients")
+            return Response({"error": NO_RECIPIENTS_ERROR}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Updated Subject and Body
-        date_str = inspection.created_at.strftime('%Y-%m-%d')
-        subject = f"{inspection.customer.name if inspection.customer else 'N/A'} - PO: {inspection.po_number} - Style: {inspection.style} - Color: {inspection.color or 'N/A'} - {date_str} - Decision: {inspection.decision}"
-        
-        body = (
-            f"Dear Team,\n\n"
-            f"Please find attached the sample evaluation report against the titled style.\n\n"
-            f"Style: {inspection.style}\n"
-            f"PO Number: {inspection.po_number}\n"
-            f"Stage: {inspection.stage}\n"
-            f"Decision: {inspection.decision}\n\n"
-            f"Thank you."
-        )
-        
         buffer = generate_pdf_buffer(inspection)
-        email = EmailMessage(subject, body, settings.EMAIL_HOST_USER, to_emails, cc=cc_emails if cc_emails else None)
         email.attach(f"{inspection.style}_{inspection.po_number}_Report.pdf", buffer.getvalue(), "application/pdf")
-        email.send(fail_silently=False)
-        return Response({"sent": True, "to": to_emails, "cc": cc_emails})
+        stages.mark("pdf")
+        try:
+            email.send(fail_silently=False)
+        except Exception:
+            metrics.EMAILS_SENT.inc(result="error")
+            raise
+        stages.mark("smtp")
+        metrics.EMAILS_SENT.inc(result="sent")
+        return Response({"sent": True, "to": email.to, "cc": email.cc})
+
+class ArchivedInspectionViewSet(ReplicaReadMixin, CachedResponseMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
+    """Search archived inspections, read their full content and restore them."""
+    queryset = ArchivedInspection.objects.all()
+    serializer_class = ArchivedInspectionListSerializer
+    cache_models = (ArchivedInspection, Customer)
+
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = ArchivedInspectionFilter
+    ordering_fields = ['created_at', 'style', 'decision', 'stage', 'archived_at']
+    ordering = ['-created_at']
+
+    def get_permissions(self):
+        if self.action == 'restore':
+            return [IsAdminUser()]
+        return super().get_permissions()
 
-class CustomerViewSet(viewsets.ModelViewSet):
-    queryset = Customer.objects.all()
+    def retrieve(self, request, *args, **kwargs):
+        archived = self.get_object()
+        document = archive.decode_payload(archived.payload)
+        return Response(dict(document, archived_at=archived.archived_at))
+
+    @action(detail=True, methods=["post"])
+    def restore(self, request, pk=None):
+        archived = self.get_object()
+        archive.restore_inspections([archived.pk])
+        return Response({"restored": str(archived.pk)})
+
+class CustomerViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Customer.objects.prefetch_related('emails')
     serializer_class = CustomerSerializer
+    cache_models = (Customer, CustomerEmail)
+
     @action(detail=True, methods=["post"])
     def add_email(self, request, pk=None):
         customer = self.get_object()
@@ -350,23 +500,26 @@ class CustomerViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class TemplateViewSet(viewsets.ModelViewSet):
+class TemplateViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Template.objects.all()
     serializer_class = TemplateSerializer
+    cache_models = (Template, TemplatePOM, Customer)
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'customer__name']
 
     def get_queryset(self):
-        queryset = Template.objects.all()
+        queryset = Template.objects.prefetch_related('poms')
         customer_id = self.request.query_params.get('customer')
         if customer_id:
             queryset = queryset.filter(customer_id=customer_id)
         return queryset
 
 
-class FilterPresetViewSet(viewsets.ModelViewSet):
+class FilterPresetViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """ViewSet for managing user filter presets"""
     serializer_class = FilterPresetSerializer
+    cache_models = (FilterPreset,)
+    cache_per_user = True
     
     def get_queryset(self):
         # Only return presets for the current user
@@ -376,19 +529,36 @@ class FilterPresetViewSet(viewsets.ModelViewSet):
         # Auto-assign the current user when creating a preset
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["get"])
+    def counts(self, request):
+        """Result and new-since-viewed counts for every preset (qc/savedsearch.py)."""
+        return Response(savedsearch.preset_counts(request.user))
+
+    @action(detail=True, methods=["get"])
+    def execute(self, request, pk=None):
+        """Run the preset's filters server-side, a page at a time; the first page marks it viewed."""
+        result = savedsearch.execute_preset(self.get_object(), request, view=self)
+        if result is None:
+            return Response({"error": "This preset's filters are no longer valid"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
 from django.db.models import Count
 from django.db.models.functions import TruncMonth
 
-class DashboardView(APIView):
+class DashboardView(ReplicaReadMixin, APIView):
+    replica_actions = None
+
     def get(self, request):
+        data = cache.get_or_set("dashboard", (Inspection, Customer), (), self.build_dashboard)
+        return Response(data)
+
+    def build_dashboard(self):
         total_inspections = Inspection.objects.count()
         pass_count = Inspection.objects.filter(decision="Accepted").count()
         fail_count = Inspection.objects.exclude(decision="Accepted").count()
         pass_rate = (pass_count / total_inspections * 100) if total_inspections > 0 else 0
         
-        recent_inspections = Inspection.objects.select_related('customer', 'template') \
-                                               .order_by("-created_at")[:5]
-        recent_serializer = InspectionListSerializer(recent_inspections, many=True)
+        recent_inspections = Inspection.objects.order_by("-created_at")[:5]
 
         # 1. Inspections by Stage
         inspections_by_stage = Inspection.objects.values('stage').annotate(count=Count('id')).order_by('-count')
@@ -405,15 +575,76 @@ class DashboardView(APIView):
         internal_decisions = Inspection.objects.values('decision').annotate(count=Count('id'))
         customer_decisions = Inspection.objects.values('customer_decision').annotate(count=Count('id'))
 
-        return Response({
+        return {
             "total_inspections": total_inspections,
             "pass_count": pass_count,
             "fail_count": fail_count,
             "pass_rate": round(pass_rate, 1),
-            "recent_inspections": recent_serializer.data,
+            "recent_inspections": values_serializer(InspectionListSerializer).serialize(recent_inspections),
             "inspections_by_stage": list(inspections_by_stage),
             "inspections_by_customer": list(inspections_by_customer),
             "monthly_trend": list(monthly_trend),
             "internal_decisions": list(internal_decisions),
             "customer_decisions": list(customer_decisions),
-        })
\ No newline at end of file
+        }
+
+
+class WarmupView(APIView):
+    """Startup-probe target: preloads the lazily imported PDF/image/mail modules."""
+    authentication_classes = []
+
+    def get(self, request):
+        from .warmup import warm_up
+        return Response({"warmed": True, "seconds": round(warm_up(), 3)})
+
+
+class CacheStatsView(APIView):
+    """Hit/miss counters of the qc cache for this process (admin only)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(dict(cache.stats.snapshot(), alias=cache.CACHE_ALIAS, timeout=cache.DEFAULT_TIMEOUT))
+
+class ProfileListView(APIView):
+    """Stored request profiles, newest first (admin only). See qc/profiling.py."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(profiling.list_profiles())
+
+
+class ProfileDetailView(APIView):
+    """One profile's metadata, captured SQL and top functions by cumulative time."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        try:
+            meta = profiling.load_profile(profile_id)
+        except (ValueError, FileNotFoundError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        limit = request.query_params.get("limit", "40")
+        limit = int(limit) if limit.isdigit() else 40
+        if meta["mode"] == "full":
+            stats = pstats.Stats(profiling.profile_path(profile_id, "prof"))
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            meta["top_functions"] = [
+                {"function": f"{func[2]} ({func[0]}:{func[1]})", "calls": nc, "tottime": round(tt, 4),
+                 "cumtime": round(ct, 4)}
+                for func, (cc, nc, tt, ct, callers) in rows[:limit]
+            ]
+        return Response(meta)
+
+
+class ProfileDownloadView(APIView):
+    """Download a profile artifact: prof (pstats), collapsed (flamegraph) or json."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id, kind):
+        try:
+            path = profiling.profile_path(profile_id, kind)
+            handle = open(path, "rb")
+        except (ValueError, FileNotFoundError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(handle, as_attachment=True, filename=os.path.basename(path),
+                            content_type=profiling.ARTIFACTS[kind])
@@ -0,0 +1,62 @@
+# qc/warmup.py
+"""
+Optional warm-up for cold starts.
+
+The views import reportlab, PIL and the mail machinery lazily, so the first
+PDF/upload/email request on a fresh instance pays for loading them. Setting
+QC_WARMUP=background loads them (and opens the DB connection) on a daemon
+thread as soon as the WSGI/ASGI application is built, while the instance
+already accepts list traffic. Alternatively point a Cloud Run startup probe
+at /warmup/, which does the same work synchronously.
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = (
+    "reportlab.pdfgen.canvas",
+    "reportlab.lib.pagesizes",
+    "reportlab.lib.utils",
+    "PIL.Image",
+    "PIL.WebPImagePlugin",
+    "django.core.mail",
+    "qc.serializers",
+)
+
+
+def warm_up():
+    """Import the heavy modules and connect to the database. Returns seconds spent."""
+    started = time.perf_counter()
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            logger.warning("warm-up: could not import %s", name)
+    try:
+        connection.ensure_connection()
+    finally:
+        # This thread's connection is useless to request threads; don't leak it.
+        connection.close()
+    return time.perf_counter() - started
+
+
+def maybe_start_warmup():
+    """Called from wsgi.py/asgi.py; starts a background warm-up if QC_WARMUP=background."""
+    if os.getenv("QC_WARMUP", "off").lower() != "background":
+        return None
+
+    def run():
+        try:
+            logger.info("warm-up finished in %.3fs", warm_up())
+        except Exception:
+            logger.exception("warm-up failed")
+
+    thread = threading.Thread(target=run, name="qc-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -3,6 +3,12 @@ ASGI config for quality_check project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Besides the regular API, this entry point serves the live ``/events/``
+Server-Sent Events stream (see qc/events.py). Run it with a single uvicorn
+worker so all connections share the in-process event broker:
+
+    uvicorn quality_check.asgi:application --host 0.0.0.0 --port 8000
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -14,3 +20,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quality_check.settings')
 
 application = get_asgi_application()
+
+# Optional cold-start warm-up (QC_WARMUP=background); see qc/warmup.py
+from qc.warmup import maybe_start_warmup  # noqa: E402
+
+maybe_start_warmup()
@@ -49,6 +49,10 @@ TEMPLATES = [
 WSGI_APPLICATION = "quality_check.wsgi.application"
 
 MIDDLEWARE = [
+    "qc.metrics.MetricsMiddleware",
+    "qc.slowlog.SlowQueryMiddleware",
+    "qc.compression.CompressionMiddleware",
+    "qc.routing.ReplicaMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -57,17 +61,33 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "qc.audit.AuditMiddleware",
+    "qc.profiling.ProfilingMiddleware",
 ]
 
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173,http://192.168.10.107:5173,http://192.168.137.1:5173").split(",")
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "qc.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
     ),
+    # orjson-backed when installed, DRF's JSON otherwise (qc/renderers.py)
+    "DEFAULT_RENDERER_CLASSES": (
+        "qc.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "qc.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Token buckets for pdf/upload_image/send_email (qc/throttling.py)
+    "DEFAULT_THROTTLE_CLASSES": (
+        "qc.throttling.CostThrottle",
+    ),
 }
 
 SIMPLE_JWT = {
@@ -84,6 +104,44 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+# Optional read replica for list/dashboard/export reads; see qc/routing.py. Needs a
+# shared cache (QC_CACHE_BACKEND=db or redis). Locally, point QC_DB_REPLICA_SQLITE
+# at a copy of db.sqlite3 to exercise the routing.
+if os.getenv("QC_DB_REPLICA_SQLITE"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("QC_DB_REPLICA_SQLITE"),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["qc.routing.ReplicaRouter"]
+QC_DB_REPLICA_STICKY_SECONDS = int(os.getenv("QC_DB_REPLICA_STICKY_SECONDS", 15))
+QC_DB_REPLICA_RETRY_SECONDS = int(os.getenv("QC_DB_REPLICA_RETRY_SECONDS", 30))
+
+# Cache
+# QC_CACHE_BACKEND: "locmem" (per process, default), "db" (shared; run
+# `python manage.py createcachetable` once) or "redis" (shared; set QC_CACHE_LOCATION)
+QC_CACHE_BACKEND = os.getenv("QC_CACHE_BACKEND", "locmem")
+if QC_CACHE_BACKEND == "redis":
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("QC_CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    }}
+elif QC_CACHE_BACKEND == "db":
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.getenv("QC_CACHE_LOCATION", "qc_cache"),
+    }}
+else:
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "qc",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }}
+QC_CACHE_ALIAS = "default"
+QC_CACHE_TIMEOUT = int(os.getenv("QC_CACHE_TIMEOUT", 30 if QC_CACHE_BACKEND == "locmem" else 300))
+# JWT users are resolved from the cache; saving a User evicts it (qc/authentication.py).
+# Per process with locmem, so there it is capped at 5s whatever this says.
+QC_AUTH_USER_CACHE_TIMEOUT = int(os.getenv("QC_AUTH_USER_CACHE_TIMEOUT", 5 if QC_CACHE_BACKEND == "locmem" else 300))
 
 # Static & Media
 STATIC_URL = "/static/"
@@ -91,7 +149,7 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 # Email (dev; put real creds in env)
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
 EMAIL_USE_TLS = True
@@ -99,3 +157,44 @@ EMAIL_HOST_USER = os.getenv("EMAIL_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
 
 # File storage - use S3 in prod if you want (configure django-storages)
+
+# Bounded pools for CPU-bound work and blocking I/O in the async (ASGI) views; see qc/executor.py
+QC_CPU_WORKERS = int(os.getenv("QC_CPU_WORKERS", 0)) or None
+QC_CPU_QUEUE = int(os.getenv("QC_CPU_QUEUE", 0)) or None
+QC_IO_WORKERS = int(os.getenv("QC_IO_WORKERS", 0)) or None
+
+# Prometheus metrics at /metrics; see qc/metrics.py. Set QC_METRICS_DIR to a
+# per-container directory when running several gunicorn workers.
+QC_METRICS_DIR = os.getenv("QC_METRICS_DIR") or None
+QC_METRICS_TOKEN = os.getenv("QC_METRICS_TOKEN") or None
+
+# Staff-only request profiling (X-QC-Profile: 1), off by default; see qc/profiling.py.
+# Profiles are files: with several instances (Cloud Run) point QC_PROFILE_DIR at
+# storage they all mount, or /profiles/ only lists the answering instance's own.
+QC_PROFILE_DIR = os.getenv("QC_PROFILE_DIR") or None  # default: <tmp>/qc-profiles
+QC_PROFILE_ENABLED = os.getenv("QC_PROFILE_ENABLED", "0") == "1"
+
+# Slow-query log with EXPLAIN plans; see qc/slowlog.py and `manage.py slow_query_report`
+QC_SLOW_QUERY_MS = int(os.getenv("QC_SLOW_QUERY_MS", 200))
+QC_SLOW_QUERY_LOG = os.getenv("QC_SLOW_QUERY_LOG") or None  # default: <tmp>/qc-slow-queries.jsonl
+
+# Response compression above QC_COMPRESS_MIN_BYTES (brotli if installed, else gzip); see qc/compression.py
+QC_COMPRESS_MIN_BYTES = int(os.getenv("QC_COMPRESS_MIN_BYTES", 1024))
+
+# Facet counts for the inspection filter UI are cached this many seconds; see qc/facets.py
+QC_FACETS_TIMEOUT = int(os.getenv("QC_FACETS_TIMEOUT", 15))
+
+# Saved-search counts: rows newer than the lag stay in the live tail; see qc/savedsearch.py
+QC_SAVED_SEARCH_LAG = int(os.getenv("QC_SAVED_SEARCH_LAG", 60))
+QC_SAVED_SEARCH_TIMEOUT = int(os.getenv("QC_SAVED_SEARCH_TIMEOUT", 60 * 60 * 24))
+
+# Service account JSON for `manage.py import_feedback --sheet`; see qc/feedback_import.py
+QC_GSPREAD_CREDENTIALS = os.getenv("QC_GSPREAD_CREDENTIALS") or None
+
+# Token-bucket limits for the expensive inspection actions, in tokens (a PDF costs 5,
+# an upload 3, an email 10); see qc/throttling.py
+QC_THROTTLE_ENABLED = os.getenv("QC_THROTTLE_ENABLED", "1") == "1"
+QC_THROTTLE_USER_PER_MINUTE = int(os.getenv("QC_THROTTLE_USER_PER_MINUTE", 30))
+QC_THROTTLE_USER_BURST = int(os.getenv("QC_THROTTLE_USER_BURST", 30))
+QC_THROTTLE_GLOBAL_PER_MINUTE = int(os.getenv("QC_THROTTLE_GLOBAL_PER_MINUTE", 240))
+QC_THROTTLE_GLOBAL_BURST = int(os.getenv("QC_THROTTLE_GLOBAL_BURST", 120))
@@ -2,7 +2,10 @@
 from rest_framework import routers
 from django.contrib import admin
 from django.urls import path, include
-from qc.views import CustomerViewSet, TemplateViewSet, InspectionViewSet, DashboardView, CustomTokenObtainPairView, FilterPresetViewSet
+from qc.views import ArchivedInspectionViewSet, CustomerViewSet, TemplateViewSet, InspectionViewSet, DashboardView, CustomTokenObtainPairView, FilterPresetViewSet, CacheStatsView, WarmupView, ProfileListView, ProfileDetailView, ProfileDownloadView
+from qc.events import event_stream
+from qc.metrics import metrics_view
+from qc.async_views import inspection_pdf, inspection_upload_image, inspection_send_email
 from rest_framework_simplejwt.views import TokenRefreshView
 
 
@@ -10,12 +13,24 @@ router = routers.DefaultRouter()
 router.register(r"customers", CustomerViewSet)
 router.register(r"templates", TemplateViewSet)
 router.register(r"inspections", InspectionViewSet)
+router.register(r"archived-inspections", ArchivedInspectionViewSet)
 router.register(r'filter-presets', FilterPresetViewSet, basename='filterpreset')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("", include(router.urls)),
     path("dashboard/", DashboardView.as_view(), name="dashboard"),
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path("warmup/", WarmupView.as_view(), name="warmup"),
+    path("profiles/", ProfileListView.as_view(), name="profile-list"),
+    path("profiles/<str:profile_id>/", ProfileDetailView.as_view(), name="profile-detail"),
+    path("profiles/<str:profile_id>/<str:kind>/", ProfileDownloadView.as_view(), name="profile-download"),
+    path("events/", event_stream, name="events"),
+    path("metrics", metrics_view, name="metrics"),
+    # Async (ASGI) variants of the slow inspection actions
+    path("async/inspections/<uuid:pk>/pdf/", inspection_pdf, name="async-inspection-pdf"),
+    path("async/inspections/<uuid:pk>/upload_image/", inspection_upload_image, name="async-inspection-upload-image"),
+    path("async/inspections/<uuid:pk>/send_email/", inspection_send_email, name="async-inspection-send-email"),
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
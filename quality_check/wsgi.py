@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quality_check.settings')
 
 application = get_wsgi_application()
+
+# Optional cold-start warm-up (QC_WARMUP=background); see qc/warmup.py
+from qc.warmup import maybe_start_warmup  # noqa: E402
+
+maybe_start_warmup()